@@ -0,0 +1,150 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from threading import Lock
+
+import random
+import time
+
+# Circuit states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker():
+    """
+    A thread-safe circuit breaker guarding calls to a remote endpoint
+    that might be down for extended periods of time.
+
+    * CLOSED: Calls go through. Consecutive failures are counted.
+    * OPEN: After failure_threshold consecutive failures, calls are refused
+      without contacting the endpoint until a backoff period has elapsed.
+    * HALF_OPEN: Once the backoff period has elapsed, exactly one caller is
+      let through as a probe. Success closes the circuit, failure re-opens it
+      with the backoff doubled (up to a maximum) and randomly jittered so
+      that many replicas do not all probe a recovering endpoint at once.
+
+    The check done while the circuit is open is a single comparison
+    against the clock and does not take a lock.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, failure_threshold: int = 32,
+                 initial_backoff_seconds: float = 1.0,
+                 max_backoff_seconds: float = 300.0,
+                 jitter_fraction: float = 0.2):
+        """
+        Constructor
+
+        :param failure_threshold: Number of consecutive failures
+                    after which the circuit opens. Default is 32.
+        :param initial_backoff_seconds: Time the circuit stays open
+                    after first opening. Default is 1 second.
+        :param max_backoff_seconds: Maximum time the circuit stays open
+                    between probes. Default is 5 minutes.
+        :param jitter_fraction: Fraction of the backoff by which the actual
+                    time the circuit stays open is randomized either way.
+                    Default is 0.2.
+        """
+        self.failure_threshold: int = max(1, int(failure_threshold))
+        self.initial_backoff_seconds: float = initial_backoff_seconds
+        self.max_backoff_seconds: float = max_backoff_seconds
+        self.jitter_fraction: float = jitter_fraction
+
+        self._lock = Lock()
+        self._state: str = CLOSED
+        self._fail_count: int = 0
+        self._open_count: int = 0
+        self._next_probe_time: float = 0.0
+
+    def allow_request(self) -> bool:
+        """
+        :return: True if the caller should attempt the call.
+                When True is returned, the caller must report the outcome
+                via record_success() or record_failure().
+        """
+        # Fast paths without the lock
+        state = self._state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN or time.monotonic() < self._next_probe_time:
+            return False
+
+        # Time to probe. Only let one caller through.
+        with self._lock:
+            if self._state != OPEN:
+                return self._state == CLOSED
+            self._state = HALF_OPEN
+            return True
+
+    def record_success(self) -> bool:
+        """
+        Report a successful call.
+
+        :return: True if this success closed a circuit that was not closed
+        """
+        with self._lock:
+            recovered = self._state != CLOSED
+            self._state = CLOSED
+            self._fail_count = 0
+            self._open_count = 0
+            return recovered
+
+    def record_failure(self) -> bool:
+        """
+        Report a failed call.
+
+        :return: True if this failure (re-)opened the circuit
+        """
+        with self._lock:
+            self._fail_count += 1
+            # Calls let through before the circuit opened can still be failing.
+            # Only a failed probe backs off further.
+            if self._state == OPEN or \
+                    (self._state == CLOSED and self._fail_count < self.failure_threshold):
+                return False
+
+            # Cap the exponent so the doubling cannot overflow
+            exponent = min(self._open_count, 32)
+            backoff = min(self.max_backoff_seconds,
+                          self.initial_backoff_seconds * (2 ** exponent))
+            jitter = backoff * self.jitter_fraction * random.uniform(-1.0, 1.0)
+            self._open_count += 1
+            self._next_probe_time = time.monotonic() + max(0.0, backoff + jitter)
+            self._state = OPEN
+            return True
+
+    def get_state(self) -> str:
+        """
+        :return: The current state of the circuit: CLOSED, OPEN or HALF_OPEN
+        """
+        return self._state
+
+    def get_fail_count(self) -> int:
+        """
+        :return: The number of consecutive failures seen
+        """
+        return self._fail_count
+
+    def get_seconds_until_probe(self) -> float:
+        """
+        :return: The number of seconds until the next probe is allowed
+                when the circuit is open, otherwise 0.
+        """
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._next_probe_time - time.monotonic())
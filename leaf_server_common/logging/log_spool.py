@@ -0,0 +1,423 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import json
+import os
+import random
+import re
+import threading
+import time
+
+# Values for the fsync policy of a LogSpool
+FSYNC_ALWAYS = "always"
+FSYNC_INTERVAL = "interval"
+FSYNC_NEVER = "never"
+
+CHECKPOINT_FILE_NAME = "checkpoint.json"
+_SEGMENT_PATTERN = re.compile(r"^segment-(\d{12})\.log$")
+
+# Amount of a segment read at once when reading a batch.
+# Records bigger than this are read in more than one go.
+_READ_CHUNK_BYTES = 1024 * 1024
+
+# A position in the spool: (segment sequence number, byte offset in segment)
+SpoolPosition = Tuple[int, int]
+
+
+class LogSpool():
+    """
+    Durable, append-only, on-disk queue of log records.
+
+    Records are dictionaries, stored one JSON document per line
+    in a sequence of size-capped segment files. Consumers read batches
+    starting from the last acknowledged position, which is kept in a
+    checkpoint file in the same directory, so that shipping resumes where
+    it left off after a process restart. Fully acknowledged segments
+    are deleted.
+
+    Each process appends to a fresh segment, so a line partially written
+    when a previous process died never has anything appended after it.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments,too-many-positional-arguments
+    def __init__(self, spool_dir: str,
+                 max_segment_bytes: int = 16 * 1024 * 1024,
+                 max_total_bytes: int = 1024 * 1024 * 1024,
+                 fsync_policy: str = FSYNC_INTERVAL,
+                 fsync_interval_seconds: float = 1.0):
+        """
+        Constructor
+
+        :param spool_dir: The directory in which to keep spool files.
+                    It is created if it does not exist.
+        :param max_segment_bytes: Size at which a new segment file is started.
+                    Default is 16MB.
+        :param max_total_bytes: Maximum size of all unacknowledged segments.
+                    Records appended beyond this are dropped. Default is 1GB.
+        :param fsync_policy: One of FSYNC_ALWAYS (after every record),
+                    FSYNC_INTERVAL (at most every fsync_interval_seconds)
+                    or FSYNC_NEVER (leave it to the OS). Default is FSYNC_INTERVAL.
+        :param fsync_interval_seconds: Time between fsyncs for FSYNC_INTERVAL.
+                    Default is 1 second.
+        """
+        if fsync_policy not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy {fsync_policy}")
+
+        self.spool_dir: str = spool_dir
+        self.max_segment_bytes: int = max_segment_bytes
+        self.max_total_bytes: int = max_total_bytes
+        self.fsync_policy: str = fsync_policy
+        self.fsync_interval_seconds: float = fsync_interval_seconds
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._total_bytes: int = 0
+        self._last_fsync_time: float = time.monotonic()
+        self.dropped_count: int = 0
+
+        existing: List[int] = self._list_segments()
+        for seq in existing:
+            self._total_bytes += os.path.getsize(self._segment_path(seq))
+
+        self._checkpoint: SpoolPosition = self._read_checkpoint(existing)
+
+        # Always start writing a brand new segment
+        self._write_seq: int = 0
+        if existing:
+            self._write_seq = existing[-1] + 1
+        self._write_bytes: int = 0
+        self._write_file = None
+        self._open_write_segment()
+
+    def append(self, record_dict: Dict[str, Any]) -> bool:
+        """
+        Append a record to the spool.
+
+        :param record_dict: A JSON-serializable dictionary
+        :return: True if the record was stored. False if the spool is full
+                or closed.
+        """
+        line: bytes = (json.dumps(record_dict, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._write_file is None or \
+                    self._total_bytes + len(line) > self.max_total_bytes:
+                self.dropped_count += 1
+                return False
+
+            if self._write_bytes > 0 and self._write_bytes + len(line) > self.max_segment_bytes:
+                self._roll_segment()
+
+            # Unbuffered file, so this is a single write() of the whole line
+            self._write_file.write(line)
+            self._write_bytes += len(line)
+            self._total_bytes += len(line)
+            self._maybe_fsync()
+        return True
+
+    def read_batch(self, max_records: int) -> Tuple[List[Dict[str, Any]], SpoolPosition]:
+        """
+        Read records starting at the last acknowledged position.
+        Reading does not move the acknowledged position.
+
+        :param max_records: The maximum number of records to read
+        :return: A tuple of the list of records read and the position
+                just after the last of them, to be given to acknowledge()
+                once the records have been dealt with.
+        """
+        seq, offset = self._checkpoint
+        records: List[Dict[str, Any]] = []
+
+        while len(records) < max_records:
+            with self._lock:
+                write_seq = self._write_seq
+
+            path = self._segment_path(seq)
+            data = b""
+            if os.path.exists(path):
+                with open(path, "rb") as segment:
+                    segment.seek(offset)
+                    chunks: List[bytes] = [segment.read(_READ_CHUNK_BYTES)]
+                    # A record bigger than a chunk takes more than one read
+                    while len(chunks[-1]) == _READ_CHUNK_BYTES and b"\n" not in chunks[-1]:
+                        chunks.append(segment.read(_READ_CHUNK_BYTES))
+                    data = b"".join(chunks)
+
+            end = data.rfind(b"\n")
+            if end < 0:
+                # Nothing complete left to read in this segment
+                if seq >= write_seq:
+                    break
+                # Anything after the last newline of an old segment is
+                # a partial write from a process that died. Move on.
+                seq = self._next_segment_after(seq, write_seq)
+                offset = 0
+                continue
+
+            consumed = 0
+            for line in data[:end + 1].splitlines(keepends=True):
+                if len(records) >= max_records:
+                    break
+                consumed += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Corrupted line. Skip it.
+                    continue
+            offset += consumed
+
+        return records, (seq, offset)
+
+    def acknowledge(self, position: SpoolPosition):
+        """
+        Record that everything before the given position has been dealt with.
+        Segments entirely before the position are deleted.
+
+        :param position: A position returned by read_batch()
+        """
+        if position == self._checkpoint:
+            return
+        self._write_checkpoint(position)
+        self._checkpoint = position
+
+        for seq in self._list_segments():
+            if seq >= position[0]:
+                break
+            path = self._segment_path(seq)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            with self._lock:
+                self._total_bytes -= size
+
+    def get_total_bytes(self) -> int:
+        """
+        :return: The number of bytes in segments not yet deleted
+        """
+        return self._total_bytes
+
+    def flush(self):
+        """
+        Force anything written so far to disk.
+        """
+        with self._lock:
+            if self._write_file is not None:
+                os.fsync(self._write_file.fileno())
+                self._last_fsync_time = time.monotonic()
+
+    def close(self):
+        """
+        Flush and close the spool. Further appends are dropped.
+        """
+        with self._lock:
+            if self._write_file is not None:
+                os.fsync(self._write_file.fileno())
+                self._write_file.close()
+                self._write_file = None
+
+    def _maybe_fsync(self):
+        """
+        Called while holding the lock after each append.
+        """
+        if self.fsync_policy == FSYNC_NEVER:
+            return
+        now = time.monotonic()
+        if self.fsync_policy == FSYNC_ALWAYS or \
+                now - self._last_fsync_time >= self.fsync_interval_seconds:
+            os.fsync(self._write_file.fileno())
+            self._last_fsync_time = now
+
+    def _roll_segment(self):
+        """
+        Called while holding the lock to start a new segment.
+        """
+        if self.fsync_policy != FSYNC_NEVER:
+            os.fsync(self._write_file.fileno())
+        self._write_file.close()
+        self._write_seq += 1
+        self._open_write_segment()
+
+    def _open_write_segment(self):
+        # pylint: disable=consider-using-with
+        self._write_file = open(self._segment_path(self._write_seq), "ab", buffering=0)
+        self._write_bytes = 0
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.spool_dir, f"segment-{seq:012d}.log")
+
+    def _list_segments(self) -> List[int]:
+        """
+        :return: A sorted list of the sequence numbers of existing segments
+        """
+        segments: List[int] = []
+        for name in os.listdir(self.spool_dir):
+            match = _SEGMENT_PATTERN.match(name)
+            if match is not None:
+                segments.append(int(match.group(1)))
+        segments.sort()
+        return segments
+
+    def _next_segment_after(self, seq: int, write_seq: int) -> int:
+        """
+        :return: The sequence number of the first existing segment after seq,
+                or the segment currently being written if there is none.
+        """
+        for other in self._list_segments():
+            if other > seq:
+                return other
+        return write_seq
+
+    def _read_checkpoint(self, existing: List[int]) -> SpoolPosition:
+        """
+        :param existing: The list of existing segments
+        :return: The last acknowledged position from a previous process,
+                or the start of the oldest segment if there is none.
+        """
+        default: SpoolPosition = (0, 0)
+        if existing:
+            default = (existing[0], 0)
+
+        path = os.path.join(self.spool_dir, CHECKPOINT_FILE_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            return int(checkpoint["segment"]), int(checkpoint["offset"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return default
+
+    def _write_checkpoint(self, position: SpoolPosition):
+        """
+        Atomically replace the checkpoint file.
+        """
+        path = os.path.join(self.spool_dir, CHECKPOINT_FILE_NAME)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"segment": position[0], "offset": position[1]}, checkpoint_file)
+            checkpoint_file.flush()
+            if self.fsync_policy != FSYNC_NEVER:
+                os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, path)
+
+
+class LogSpoolShipper():
+    """
+    Background thread which drains a LogSpool in batches through
+    a given export function, acknowledging each batch only once it has
+    been exported. Failed exports are retried with exponential backoff.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments,too-many-positional-arguments
+    def __init__(self, spool: LogSpool,
+                 export_batch: Callable[[List[Dict[str, Any]]], None],
+                 batch_size: int = 512,
+                 poll_interval_seconds: float = 1.0,
+                 max_backoff_seconds: float = 60.0):
+        """
+        Constructor
+
+        :param spool: The LogSpool to drain
+        :param export_batch: A function taking a list of spooled records
+                    which raises an exception if they could not be exported
+        :param batch_size: Maximum number of records per export. Default is 512.
+        :param poll_interval_seconds: Time to wait for new records when the
+                    spool has been drained. Default is 1 second.
+        :param max_backoff_seconds: Maximum time to wait before retrying
+                    a failed export. Default is 1 minute.
+        """
+        self.spool: LogSpool = spool
+        self.export_batch = export_batch
+        self.batch_size: int = batch_size
+        self.poll_interval_seconds: float = poll_interval_seconds
+        self.max_backoff_seconds: float = max_backoff_seconds
+
+        self.shipped_count: int = 0
+        self.failed_count: int = 0
+
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="LogSpoolShipper", daemon=True)
+
+    def start(self):
+        """
+        Start shipping in the background.
+        """
+        self._thread.start()
+
+    def wake(self):
+        """
+        Let the shipper know there are new records without waiting
+        for the poll interval.
+        """
+        self._wakeup.set()
+
+    def stop(self, timeout_seconds: float = 5.0):
+        """
+        Stop shipping, making a last attempt to drain the spool
+        within the given time.
+
+        :param timeout_seconds: Maximum time to wait for the drain
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout_seconds)
+
+    def ship_once(self) -> int:
+        """
+        Export and acknowledge a single batch from the spool.
+
+        :return: The number of records shipped. An exception is raised
+                if the export failed.
+        """
+        records, position = self.spool.read_batch(self.batch_size)
+        if records:
+            self.export_batch(records)
+            self.shipped_count += len(records)
+        self.spool.acknowledge(position)
+        return len(records)
+
+    def _run(self):
+        backoff: float = 0.0
+        while True:
+            try:
+                num_shipped = self.ship_once()
+                backoff = 0.0
+            # pylint: disable=broad-except
+            except Exception:
+                self.failed_count += 1
+                num_shipped = 0
+                backoff = min(self.max_backoff_seconds, max(0.5, backoff * 2.0))
+
+            if self._stopping and (num_shipped == 0 or backoff > 0.0):
+                return
+
+            if num_shipped >= self.batch_size:
+                # Likely more to read right away
+                continue
+
+            wait_seconds = self.poll_interval_seconds
+            if backoff > 0.0:
+                wait_seconds = backoff * random.uniform(0.8, 1.2)
+            self._wakeup.wait(wait_seconds)
+            self._wakeup.clear()
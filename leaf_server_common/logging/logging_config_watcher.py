@@ -0,0 +1,187 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+from typing import Tuple
+
+import copy
+import logging
+import logging.config
+import os
+
+
+class LoggingConfigWatcher():
+    """
+    Notices changes to the logging config file a LoggingSetup read at
+    startup and applies the new config without restarting the service,
+    so that things like turning on DEBUG do not lose the warm state
+    of the service.
+
+    Checking is just a stat() of the file, meant to be called every few
+    seconds, for instance by ServerLifetime.watch_logging_config().
+    As with kubernetes ConfigMaps, the file can be replaced through
+    a symbolic link.
+
+    A changed file is read and checked before anything is touched, so that
+    a config with mistakes in it leaves the current logging alone.
+    The new config is applied with logging.config.dictConfig(), which
+    flushes and closes the handlers it replaces. That gives handlers with
+    queued records, like the OpenTelemetryLoggingHandler, the chance to
+    send them. The log record factories set up for StructuredLogRecord
+    and ServiceLogRecord are kept as they are.
+
+    Unlike at startup, loggers not mentioned in the new config are left
+    enabled unless the config says "disable_existing_loggers": true.
+    """
+
+    def __init__(self, logging_setup, logger: logging.Logger = None):
+        """
+        Constructor
+
+        :param logging_setup: The leaf_common LoggingSetup that set up logging
+                    at startup. Its file path, environment variable override
+                    and log file override are all respected.
+        :param logger: The logger to report reloads to.
+                    Default of None means a logger for this module.
+        """
+        self.logging_setup = logging_setup
+        self.logger: logging.Logger = logger
+        if self.logger is None:
+            self.logger = logging.getLogger(__name__)
+
+        self.config_file_path: str = logging_setup.determine_log_config_file_path()
+        self.num_reloads: int = 0
+        self._last_signature: Tuple[int, int] = self._get_signature()
+
+    def check(self) -> bool:
+        """
+        Reloads the config if the file changed since the last check
+
+        :return: True if a new config was applied
+        """
+        signature = self._get_signature()
+        if signature == self._last_signature:
+            return False
+        # Remember this version even if it is no good, so that a bad file
+        # is complained about once rather than on every check
+        self._last_signature = signature
+        if signature is None:
+            self.logger.warning("Logging config %s has gone away. Keeping current logging.",
+                                self.config_file_path)
+            return False
+        return self.reload()
+
+    def reload(self) -> bool:
+        """
+        Reads and applies the config file
+
+        :return: True if the new config was applied
+        """
+        try:
+            config = self._read_config()
+            self._validate(config)
+        # Mistakes in the file could show up as any number of exceptions
+        except Exception as exception:      # pylint: disable=broad-exception-caught
+            self.logger.error("Not applying logging config %s: %s", self.config_file_path, str(exception))
+            return False
+
+        config = self.logging_setup.replace_log_file(config)
+        config.setdefault("disable_existing_loggers", False)
+
+        # Push out whatever the current handlers have before they are closed
+        self._flush_handlers()
+
+        record_factory = logging.getLogRecordFactory()
+        try:
+            logging.config.dictConfig(config)
+        except (ValueError, TypeError, AttributeError, ImportError) as exception:
+            self.logger.error("Failed to apply logging config %s: %s", self.config_file_path, str(exception))
+            return False
+        finally:
+            logging.setLogRecordFactory(record_factory)
+
+        self.num_reloads += 1
+        self.logger.info("Applied changed logging config %s", self.config_file_path)
+        return True
+
+    @staticmethod
+    def _flush_handlers():
+        """
+        Flushes the handlers of every logger
+        """
+        loggers = [logging.getLogger()]
+        loggers.extend(logger for logger in list(logging.Logger.manager.loggerDict.values())
+                       if isinstance(logger, logging.Logger))
+        for logger in loggers:
+            for handler in list(logger.handlers):
+                handler.flush()
+
+    def _get_signature(self) -> Tuple[int, int]:
+        """
+        :return: The modification time and size of the config file,
+                or None if there is no file
+        """
+        if self.config_file_path is None:
+            return None
+        try:
+            stat = os.stat(self.config_file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_config(self) -> Dict[str, Any]:
+        """
+        :return: The config in the file
+        """
+        # pylint: disable=import-outside-toplevel
+        from leaf_common.config.config_handler import ConfigHandler
+
+        config = ConfigHandler().import_config(self.config_file_path)
+        if not isinstance(config, dict):
+            raise ValueError("Logging config is not a dictionary")
+        return copy.deepcopy(config)
+
+    @staticmethod
+    def _validate(config: Dict[str, Any]):
+        """
+        Checks the parts of a config that commonly go wrong before any of it
+        is applied, as dictConfig() can leave logging half set up when it fails.
+        Raises ValueError or ImportError when there is a problem.
+        """
+        if config.get("version") != 1:
+            raise ValueError("Logging config needs \"version\": 1")
+
+        # Resolves class names the same way dictConfig() does
+        configurator = logging.config.BaseConfigurator({})
+        for section in ("handlers", "formatters", "filters"):
+            for name, item in config.get(section, {}).items():
+                class_name = item.get("()", item.get("class"))
+                if isinstance(class_name, str):
+                    try:
+                        configurator.resolve(class_name)
+                    except ValueError as exception:
+                        raise ValueError(f"{section} {name}: {exception}") from exception
+
+        levels = [item.get("level") for section in ("handlers", "loggers")
+                  for item in config.get(section, {}).values()]
+        levels.append(config.get("root", {}).get("level"))
+        for level in levels:
+            if level is None or isinstance(level, int):
+                continue
+            # Like dictConfig(), level names have to be upper case
+            if not isinstance(logging.getLevelName(str(level)), int):
+                raise ValueError(f"Unknown log level {level}")
@@ -19,7 +19,6 @@ from threading import current_thread
 from typing import Any
 from typing import Dict
 
-from leaf_common.logging.logging_setup import LoggingSetup
 from leaf_server_common.logging.service_log_record import ServiceLogRecord
 from leaf_server_common.logging.structured_log_record import StructuredLogRecord
 
@@ -32,6 +31,7 @@ def setup_extra_logging_fields(metadata_dict: Dict[str, Any] = None,
 
     :param metadata_dict: Metadata dictionary. Default is None
     :param extra_logging_fields: Additional fields dictionary. Default is None
+    :return: The dictionary of logging fields set up for the thread
     """
 
     # Assumes ServiceLogRecord.set_up_record_factory() has already been called once
@@ -65,6 +65,7 @@ def setup_extra_logging_fields(metadata_dict: Dict[str, Any] = None,
     # In doing so like this, we actually are setting up global variables.
     service_log_record = ServiceLogRecord()
     service_log_record.set_logging_fields_dict(extra)
+    return extra
 
 
 # pylint: disable=too-many-arguments,too-many-positional-arguments
@@ -76,6 +77,10 @@ def setup_logging(server_name_for_logs: str,
                   logging_config: Dict[str, Any] = None):
     """
     Setup logging to be used by ServerLifeTime
+
+    :return: A LoggingConfigWatcher for the logging config file, which can be
+            given to ServerLifetime.watch_logging_config() to have changes
+            to the file applied while the service is running
     """
     default_extra_logging_fields = {
         "source": server_name_for_logs,
@@ -91,6 +96,10 @@ def setup_logging(server_name_for_logs: str,
     if extras is None:
         extras = default_extra_logging_fields
 
+    # Only services that set up logging this way need the config file machinery
+    # pylint: disable=import-outside-toplevel
+    from leaf_common.logging.logging_setup import LoggingSetup
+
     logging_setup = LoggingSetup(default_log_config_dir=default_log_dir,
                                  default_log_config_file="logging.json",
                                  default_log_level="DEBUG",
@@ -105,3 +114,7 @@ def setup_logging(server_name_for_logs: str,
     # Enable thread-local information to go into log messages
     ServiceLogRecord.set_up_record_factory(extras)
     setup_extra_logging_fields(extra_logging_fields=extras)
+
+    # pylint: disable=import-outside-toplevel
+    from leaf_server_common.logging.logging_config_watcher import LoggingConfigWatcher
+    return LoggingConfigWatcher(logging_setup)
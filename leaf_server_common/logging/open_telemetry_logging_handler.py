@@ -15,23 +15,82 @@
 #
 # END COPYRIGHT
 
+from collections import deque
+from functools import lru_cache
+from hashlib import blake2b
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import List
+
 import logging
+import os
+import threading
+import uuid
+
+from leaf_server_common.logging.circuit_breaker import CircuitBreaker
+from leaf_server_common.logging.log_spool import FSYNC_INTERVAL
+from leaf_server_common.logging.log_spool import LogSpool
+from leaf_server_common.logging.log_spool import LogSpoolShipper
+from leaf_server_common.logging.message_types import API
+from leaf_server_common.logging.message_types import METRICS
+from leaf_server_common.logging.service_log_record import ServiceLogRecord
+from leaf_server_common.logging.trace_context import SPAN_ID_FIELD
+from leaf_server_common.logging.trace_context import TRACE_ID_FIELD
 
-from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter
-from opentelemetry.sdk._logs._internal import LogRecord
-from opentelemetry.sdk._logs._internal import ReadableLogRecord
-from opentelemetry.sdk.resources import _DEFAULT_RESOURCE
-from opentelemetry.sdk.util.instrumentation import InstrumentationScope
-from opentelemetry._logs.severity import SeverityNumber
+# The OpenTelemetry SDK and exporters take a good fraction of a second to import,
+# so they are only imported once a handler is actually created, and then only
+# the exporter for the configured protocol.
+if TYPE_CHECKING:
+    from opentelemetry.sdk._logs._internal import ReadableLogRecord
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry._logs.severity import SeverityNumber
 
 OTLP_TRACE_ID_KEY = "trace_id_key"
 OTLP_SPAN_ID_KEY = "span_id_key"
 
+# In OpenTelemetryLoggingHandler configuration parameters,
+# this key specifies the service.name resource attribute sent along
+# with every record. When omitted, the "source" logging field is used.
+OTLP_SERVICE_NAME_KEY = "service_name"
+
+# LogRecord field whose value names the service, when no explicit
+# service name is configured.
+SOURCE_FIELD = "source"
+
+# Name of the InstrumentationScope sent along with every record
+INSTRUMENTATION_SCOPE_NAME = "leaf_server_common"
+
+# Number of recent string -> trace_id/span_id conversions to remember.
+# Within a single request the same run_id/request_id string shows up
+# on every record, so even a small cache has a very high hit rate.
+ID_CACHE_SIZE: int = 1024
+
+_MAX_TRACE_ID = (1 << 128) - 1
+_MAX_SPAN_ID = (1 << 64) - 1
+
 # In OpenTelemetryLoggingHandler configuration parameters,
 # this key specifies OpenTelemetry collector endpoint
 # to be used for exporting logs.
 OTLP_ENDPOINT_KEY = "endpoint"
 
+# In OpenTelemetryLoggingHandler configuration parameters,
+# this key specifies the OTLP transport: "http" (HTTP/protobuf, the default)
+# or "grpc", which keeps a single persistent HTTP/2 connection
+# to the collector and has lower per-export overhead.
+OTLP_PROTOCOL_KEY = "protocol"
+PROTOCOL_HTTP = "http"
+PROTOCOL_GRPC = "grpc"
+# Alias as spelled by the OTEL_EXPORTER_OTLP_PROTOCOL environment variable
+PROTOCOL_HTTP_PROTOBUF = "http/protobuf"
+
+# In OpenTelemetryLoggingHandler configuration parameters,
+# this key specifies the compression of exported data: "gzip" or "none" (the default).
+OTLP_COMPRESSION_KEY = "compression"
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_NONE = "none"
+
 # In OpenTelemetryLoggingHandler configuration parameters,
 # this key specifies a path to certificate file to be used
 # if our connection to OpenTelemetry collector is TLS encrypted.
@@ -41,11 +100,54 @@ OTLP_CERTIFICATE_KEY = "certificate_file"
 # In logging setups where Open-telemetry logger will not work at all
 # (for example local setup or when open-telemetry collector
 # is not configured correctly),
-# we want to reduce amount of output dumping.
-# So this LoggerHandler will be disabled
-# after MAX_SEND_FAILED_COUNT of consecutive failed attempts to send log data.
+# we want to reduce amount of output dumping and not block request threads
+# on export timeouts. So this LoggerHandler stops attempting exports
+# after MAX_SEND_FAILED_COUNT of consecutive failed attempts to send log data,
+# and only probes the collector every so often (with exponential backoff)
+# until it comes back.
 MAX_SEND_FAILED_COUNT: int = 32
 
+# In OpenTelemetryLoggingHandler configuration parameters,
+# these keys tune the circuit breaker guarding exports.
+OTLP_FAILURE_THRESHOLD_KEY = "failure_threshold"
+OTLP_INITIAL_BACKOFF_KEY = "initial_backoff_seconds"
+OTLP_MAX_BACKOFF_KEY = "max_backoff_seconds"
+
+# In OpenTelemetryLoggingHandler configuration parameters,
+# this key specifies the timeout in seconds for a single export attempt.
+OTLP_TIMEOUT_KEY = "timeout"
+
+# In OpenTelemetryLoggingHandler configuration parameters,
+# this key specifies the maximum number of records kept in memory
+# while the collector is unreachable. These are sent once it recovers.
+# Default is 0, meaning records are dropped while the collector is unreachable.
+OTLP_SPILL_BUFFER_SIZE_KEY = "spill_buffer_size"
+
+# In OpenTelemetryLoggingHandler configuration parameters,
+# this key specifies a local file to which formatted records are appended
+# while the collector is unreachable, up to OTLP_SPILL_FILE_MAX_BYTES_KEY bytes.
+OTLP_SPILL_FILE_KEY = "spill_file"
+OTLP_SPILL_FILE_MAX_BYTES_KEY = "spill_file_max_bytes"
+DEFAULT_SPILL_FILE_MAX_BYTES: int = 100 * 1024 * 1024
+
+# Maximum number of spilled records sent in one export once the collector recovers
+SPILL_EXPORT_BATCH_SIZE: int = 512
+
+# In OpenTelemetryLoggingHandler configuration parameters,
+# this key turns on spool mode: records are appended to files in this
+# local directory and a background thread ships them to the collector,
+# so nothing is lost while the collector is unreachable and request
+# threads never wait on the network. Shipping resumes from the last
+# acknowledged record after a restart.
+OTLP_SPOOL_DIR_KEY = "spool_dir"
+
+# In OpenTelemetryLoggingHandler configuration parameters,
+# these keys tune spool mode. See LogSpool for details.
+OTLP_SPOOL_FSYNC_KEY = "spool_fsync"
+OTLP_SPOOL_SEGMENT_BYTES_KEY = "spool_segment_bytes"
+OTLP_SPOOL_MAX_BYTES_KEY = "spool_max_bytes"
+OTLP_SPOOL_BATCH_SIZE_KEY = "spool_batch_size"
+
 
 class OpenTelemetryLoggingHandler(logging.Handler):
     """
@@ -63,13 +165,39 @@ class OpenTelemetryLoggingHandler(logging.Handler):
             "level": "INFO",
             # endpoint for OTLP collector
             "endpoint": "http://localhost:4318/v1/logs",
+            # optional transport: "http" (default) or "grpc".
+            # For grpc, the endpoint is typically "http://localhost:4317"
+            # (or https with a certificate_file for TLS).
+            "protocol": "http",
+            # optional compression: "gzip" or "none" (default)
+            "compression": "gzip",
             # "substitution" keys: specify key names to be extracted
             # from LogRecord dictionary and put in "trace_id" and "span_id"
             # fields of outgoing OpenTelemetry Logger record.
             # This is done so we can better map our internal logging data structures
             # into values expected by OpenTelemetry backends (trace_id, span_id)
+            # Values that are not already hex ids or integers are hashed
+            # into valid ids. When omitted, the W3C trace context fields
+            # attached by RequestLoggerAdapter are used.
             "trace_id_key": "run_id",
-            "span_id_key": "request_id"
+            "span_id_key": "request_id",
+            # optional service.name resource attribute.
+            # When omitted, the "source" logging field is used.
+            "service_name": "my-service",
+            # optional: stop exporting after this many consecutive failures
+            # and probe the collector with exponential backoff until it recovers.
+            "failure_threshold": 32,
+            "initial_backoff_seconds": 1.0,
+            "max_backoff_seconds": 300.0,
+            # optional: where records go while the collector is unreachable.
+            # The in-memory buffer is sent once the collector recovers.
+            "spill_buffer_size": 10000,
+            "spill_file": "/tmp/otlp_spill.log",
+            # optional: durable spool mode for logs that must not be dropped.
+            # Records go to disk and are shipped in the background.
+            # fsync policy is one of "always", "interval" or "never".
+            "spool_dir": "/var/spool/otlp",
+            "spool_fsync": "interval"
         }
     },
     """
@@ -78,15 +206,18 @@ class OpenTelemetryLoggingHandler(logging.Handler):
     def __init__(self, level=logging.NOTSET, **kwargs):
         super().__init__(level)
 
-        # This variable prevents infinite recursion when init gets passed
-        # debug=True
-        self._already_called = False
+        # This thread-local flag prevents infinite recursion when
+        # something we call while emitting logs to a logger we handle.
+        self._emitting = threading.local()
+
+        # Set when we could not create an exporter at all.
+        # That makes any "emit" calls a no-action.
+        self._disabled = False
 
         # Logger to report problems with our LoggingHandler;
         # that seems circular, because OpenTelemetryLoggingHandler itself
         # is a run-time part of our loggers, but it works,
-        # if we call logger with self._already_called
-        # set to True.
+        # as records logged while we are emitting are ignored by this handler.
         self.logger = logging.getLogger(self.__class__.__name__)
 
         # In case log records don't have all the fields we need.
@@ -106,25 +237,122 @@ class OpenTelemetryLoggingHandler(logging.Handler):
         # This is done so we can better map our internal logging data structures
         # into values universally expected by OpenTelemetry backends,
         # namely trace_id and span_id.
-        self.trace_id_key: str = kwargs.get(OTLP_TRACE_ID_KEY, None)
-        self.span_id_key: str = kwargs.get(OTLP_SPAN_ID_KEY, None)
+        self.trace_id_key: str = kwargs.get(OTLP_TRACE_ID_KEY, TRACE_ID_FIELD)
+        self.span_id_key: str = kwargs.get(OTLP_SPAN_ID_KEY, SPAN_ID_FIELD)
+
+        # These are the same for every record, so build them once up front.
+        # At construction time in a typical logging.json setup, the default
+        # logging fields are not yet set up, so the Resource might have
+        # to wait until we see the first record with a "source" field.
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+        self.instrumentation_scope = InstrumentationScope(name=INSTRUMENTATION_SCOPE_NAME)
+        self.resource: "Resource" = None
+        service_name: str = kwargs.get(OTLP_SERVICE_NAME_KEY, None)
+        if service_name is None:
+            default_fields = ServiceLogRecord.get_default_extra_logging_fields()
+            service_name = default_fields.get(SOURCE_FIELD, None)
+        if service_name is not None:
+            self.resource = self._create_resource(service_name)
+
+        # Guards against blocking on exports to a collector that is down
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=int(kwargs.get(OTLP_FAILURE_THRESHOLD_KEY, MAX_SEND_FAILED_COUNT)),
+            initial_backoff_seconds=float(kwargs.get(OTLP_INITIAL_BACKOFF_KEY, 1.0)),
+            max_backoff_seconds=float(kwargs.get(OTLP_MAX_BACKOFF_KEY, 300.0)))
 
-        # Number of consecutive failed attempts to send log out.
-        self.fail_count = 0
+        # Where records go while the circuit is open
+        self.spill_buffer: Deque["ReadableLogRecord"] = None
+        spill_buffer_size = int(kwargs.get(OTLP_SPILL_BUFFER_SIZE_KEY, 0))
+        if spill_buffer_size > 0:
+            self.spill_buffer = deque(maxlen=spill_buffer_size)
+        self.spill_file: str = kwargs.get(OTLP_SPILL_FILE_KEY, None)
+        self.spill_file_max_bytes = int(kwargs.get(OTLP_SPILL_FILE_MAX_BYTES_KEY,
+                                                   DEFAULT_SPILL_FILE_MAX_BYTES))
+        self._spill_lock = threading.Lock()
+        self._spill_file_bytes: int = 0
+        if self.spill_file is not None and os.path.exists(self.spill_file):
+            self._spill_file_bytes = os.path.getsize(self.spill_file)
 
+        # Number of records dropped because the collector was unreachable
+        self.dropped_count: int = 0
+
+        self.exporter = None
         try:
-            self.exporter = \
-                OTLPLogExporter(endpoint=self.endpoint,
-                                certificate_file=self.certificate_file)
+            self.exporter = self._create_exporter(kwargs)
         # pylint: disable=broad-except
         except Exception as exc:
             # That will make any "emit" calls a no-action
-            self._already_called = True
+            self._disabled = True
             # If we fail to create OTLPLogExporter for any reason
             # (for example we have no open-telemetry endpoint available)
             # issue a message once and disable this LogExporter
             self.logger.error("FAILED to create OTLPLogExporter: %s", exc)
 
+        # Optional durable spool mode
+        self.spool: LogSpool = None
+        self.spool_shipper: LogSpoolShipper = None
+        self._spooled_since_wake: int = 0
+        spool_dir: str = kwargs.get(OTLP_SPOOL_DIR_KEY, None)
+        if spool_dir is not None and not self._disabled:
+            self._set_up_spool(spool_dir, kwargs)
+
+    def _create_exporter(self, config: Dict[str, Any]):
+        """
+        :param config: The handler configuration
+        :return: The OTLP log exporter for the configured protocol
+        """
+        protocol: str = str(config.get(OTLP_PROTOCOL_KEY, PROTOCOL_HTTP)).lower()
+        compression: str = str(config.get(OTLP_COMPRESSION_KEY, COMPRESSION_NONE)).lower()
+        if compression not in (COMPRESSION_GZIP, COMPRESSION_NONE):
+            raise ValueError(f"Unknown OTLP compression {compression}")
+        use_gzip: bool = compression == COMPRESSION_GZIP
+        timeout = config.get(OTLP_TIMEOUT_KEY, None)
+
+        if protocol == PROTOCOL_GRPC:
+            return self._create_grpc_exporter(use_gzip, timeout)
+
+        if protocol not in (PROTOCOL_HTTP, PROTOCOL_HTTP_PROTOBUF):
+            raise ValueError(f"Unknown OTLP protocol {protocol}")
+
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.exporter.otlp.proto.http import Compression
+        from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter
+
+        http_compression = Compression.NoCompression
+        if use_gzip:
+            http_compression = Compression.Gzip
+        return OTLPLogExporter(endpoint=self.endpoint,
+                               certificate_file=self.certificate_file,
+                               timeout=timeout,
+                               compression=http_compression)
+
+    def _create_grpc_exporter(self, use_gzip: bool, timeout):
+        """
+        :param use_gzip: True if exports are to be gzip-compressed
+        :param timeout: The export timeout in seconds, or None for the default
+        :return: The OTLP/gRPC log exporter
+        """
+        # pylint: disable=import-outside-toplevel
+        import grpc
+        from opentelemetry.exporter.otlp.proto.grpc._log_exporter import OTLPLogExporter as GrpcOTLPLogExporter
+
+        credentials = None
+        insecure = None
+        if self.certificate_file is not None:
+            with open(self.certificate_file, "rb") as cert_file:
+                root_certificates = cert_file.read()
+            credentials = grpc.ssl_channel_credentials(root_certificates=root_certificates)
+            insecure = False
+        grpc_compression = grpc.Compression.NoCompression
+        if use_gzip:
+            grpc_compression = grpc.Compression.Gzip
+        return GrpcOTLPLogExporter(endpoint=self.endpoint,
+                                   insecure=insecure,
+                                   credentials=credentials,
+                                   timeout=timeout,
+                                   compression=grpc_compression)
+
     def emit(self, record: logging.LogRecord):
         """
         Do whatever it takes to actually log the specified logging record
@@ -132,12 +360,196 @@ class OpenTelemetryLoggingHandler(logging.Handler):
         :param record: The LogRecord from the Python logging infrastructure
                        to handle
         """
-        if self._already_called:
+        if self._disabled or getattr(self._emitting, "active", False):
+            return
+
+        if self.spool is not None:
+            self._emitting.active = True
+            try:
+                if self.spool.append(self._create_spool_dict(record)):
+                    self._spooled_since_wake += 1
+                # Ship as soon as there is a full batch instead of at the next poll.
+                # Unlocked, as being off by a few records here does no harm.
+                if self._spooled_since_wake >= self.spool_shipper.batch_size:
+                    self._spooled_since_wake = 0
+                    self.spool_shipper.wake()
+            # pylint: disable=broad-except
+            except Exception:
+                self.dropped_count += 1
+            finally:
+                self._emitting.active = False
+            return
+
+        if not self.circuit_breaker.allow_request():
+            # Collector is known to be down. Do not even try.
+            if self.spill_buffer is None and self.spill_file is None:
+                self.dropped_count += 1
+                return
+            self._emitting.active = True
+            try:
+                self._spill(record)
+            finally:
+                self._emitting.active = False
             return
-        self._already_called = True
+
+        self._emitting.active = True
+        try:
+            self._emit_to_collector(record)
+        finally:
+            self._emitting.active = False
+
+    def _emit_to_collector(self, record: logging.LogRecord):
+        """
+        Attempt to export the record, reporting the outcome
+        to the circuit breaker.
+
+        :param record: The LogRecord from the Python logging infrastructure
+        """
+        readable = None
+        try:
+            readable = self._create_readable_log_record(record)
+            self._export([readable])
+        # pylint: disable=broad-except
+        except BaseException as exc:
+            # We want to catch as much as possible here:
+            # don't really care about failures in logging.
+            if self.circuit_breaker.record_failure():
+                self.logger.error("FAILED to send OTLP log data %d consecutive times: %s. "
+                                  "Pausing exports for %.1f seconds",
+                                  self.circuit_breaker.get_fail_count(), exc,
+                                  self.circuit_breaker.get_seconds_until_probe())
+            self._spill(record, readable)
+            return
+
+        if self.circuit_breaker.record_success():
+            self.logger.info("OTLP collector reachable again. Resuming exports.")
+        self._send_spill_buffer()
+
+    def _export(self, batch: List["ReadableLogRecord"]):
+        """
+        Export a batch of records, raising an exception on failure.
+
+        :param batch: The records to export
+        """
+        result = self.exporter.export(batch)
+        # The name of the result enum has changed across OpenTelemetry
+        # versions, but its members have not.
+        if getattr(result, "name", None) != "SUCCESS":
+            raise ConnectionError(f"OTLP export result was {result}")
+
+    def _create_readable_log_record(self, record: logging.LogRecord) -> "ReadableLogRecord":
+        """
+        :param record: The LogRecord from the Python logging infrastructure
+        :return: The corresponding OpenTelemetry ReadableLogRecord
+        """
+        # Already imported by the time we get here, so this is cheap
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.sdk._logs._internal import LogRecord
+        from opentelemetry.sdk._logs._internal import ReadableLogRecord
 
         # Format the LogRecord per the pre-configured python logging.Formatter
         # With this, we get a string.
+        formatted = self._format_record(record)
+
+        # Try to extract LogRecord elements that will work
+        # as our "trace_id" and "span_id" keys in output LogRecord:
+        trace_id_val = self._get_substitute_key(self.trace_id_key, 0, record, self._to_trace_id)
+        span_id_val = self._get_substitute_key(self.span_id_key, 0, record, self._to_span_id)
+
+        lrec = LogRecord(body=formatted,
+                         timestamp=int(record.created * 1e9),
+                         span_id=span_id_val, trace_id=trace_id_val, trace_flags=0,
+                         severity_text=record.levelname,
+                         severity_number=self._get_severity_number(record.levelno))
+        ldata = ReadableLogRecord(log_record=lrec,
+                                  instrumentation_scope=self.instrumentation_scope,
+                                  resource=self._get_resource(record))
+        return ldata
+
+    def _set_up_spool(self, spool_dir: str, config: Dict[str, Any]):
+        """
+        Set up the LogSpool and start the background thread shipping from it.
+
+        :param spool_dir: The directory in which to keep spool files
+        :param config: The handler configuration
+        """
+        try:
+            spool_args = {
+                "fsync_policy": config.get(OTLP_SPOOL_FSYNC_KEY, FSYNC_INTERVAL)
+            }
+            if OTLP_SPOOL_SEGMENT_BYTES_KEY in config:
+                spool_args["max_segment_bytes"] = int(config.get(OTLP_SPOOL_SEGMENT_BYTES_KEY))
+            if OTLP_SPOOL_MAX_BYTES_KEY in config:
+                spool_args["max_total_bytes"] = int(config.get(OTLP_SPOOL_MAX_BYTES_KEY))
+            self.spool = LogSpool(spool_dir, **spool_args)
+        # pylint: disable=broad-except
+        except Exception as exc:
+            # Fall back to sending directly
+            self.logger.error("FAILED to set up OTLP log spool in %s: %s", spool_dir, exc)
+            return
+
+        self.spool_shipper = LogSpoolShipper(
+            self.spool, self._export_spooled,
+            batch_size=int(config.get(OTLP_SPOOL_BATCH_SIZE_KEY, SPILL_EXPORT_BATCH_SIZE)))
+        self.spool_shipper.start()
+
+    def _create_spool_dict(self, record: logging.LogRecord) -> Dict[str, Any]:
+        """
+        :param record: The LogRecord from the Python logging infrastructure
+        :return: A JSON-serializable dictionary with everything needed
+                to export the record later on, possibly from another process.
+        """
+        return {
+            "body": self._format_record(record),
+            "time_ns": int(record.created * 1e9),
+            "levelno": record.levelno,
+            "levelname": record.levelname,
+            "trace_id": self._get_substitute_key(self.trace_id_key, 0, record, self._to_trace_id),
+            "span_id": self._get_substitute_key(self.span_id_key, 0, record, self._to_span_id),
+            SOURCE_FIELD: record.__dict__.get(SOURCE_FIELD, None)
+        }
+
+    def _export_spooled(self, spooled: List[Dict[str, Any]]):
+        """
+        Called from the LogSpoolShipper thread to export records read from the spool.
+
+        :param spooled: List of dictionaries created by _create_spool_dict()
+        """
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.sdk._logs._internal import LogRecord
+        from opentelemetry.sdk._logs._internal import ReadableLogRecord
+        from opentelemetry.sdk.resources import _DEFAULT_RESOURCE
+
+        batch: List[ReadableLogRecord] = []
+        for one in spooled:
+            lrec = LogRecord(body=one.get("body", ""),
+                             timestamp=one.get("time_ns", None),
+                             span_id=one.get("span_id", 0), trace_id=one.get("trace_id", 0), trace_flags=0,
+                             severity_text=one.get("levelname", None),
+                             severity_number=self._get_severity_number(one.get("levelno", logging.NOTSET)))
+            resource = self.resource
+            if resource is None:
+                service_name = one.get(SOURCE_FIELD, None)
+                resource = _DEFAULT_RESOURCE
+                if service_name is not None:
+                    self.resource = self._create_resource(service_name)
+                    resource = self.resource
+            batch.append(ReadableLogRecord(log_record=lrec,
+                                           instrumentation_scope=self.instrumentation_scope,
+                                           resource=resource))
+
+        # Make sure anything the exporter logs does not come back to us
+        self._emitting.active = True
+        try:
+            self._export(batch)
+        finally:
+            self._emitting.active = False
+
+    def _format_record(self, record: logging.LogRecord) -> str:
+        """
+        :param record: The LogRecord from the Python logging infrastructure
+        :return: The formatted string for the record
+        """
         # Try using our basic formatting.
         try:
             formatted = self.format(record)
@@ -151,67 +563,248 @@ class OpenTelemetryLoggingHandler(logging.Handler):
             formatted = ""
         if not isinstance(formatted, str):
             formatted = "<message is NOT a string>"
+        return formatted
 
-        # Try to extract LogRecord elements that will work
-        # as our "trace_id" and "span_id" keys in output LogRecord:
-        trace_id_val = self._get_substitute_key(self.trace_id_key, 0, record)
-        span_id_val = self._get_substitute_key(self.span_id_key, 0, record)
+    def _spill(self, record: logging.LogRecord, readable: "ReadableLogRecord" = None):
+        """
+        Keep a record that could not be sent to the collector
+        in the spill buffer and/or spill file, if so configured.
 
+        :param record: The LogRecord from the Python logging infrastructure
+        :param readable: The ReadableLogRecord already created for the record, if any
+        """
+        spilled = False
         try:
-            lrec = LogRecord(body=formatted,
-                             span_id=span_id_val, trace_id=trace_id_val, trace_flags=0,
-                             severity_number=SeverityNumber.UNSPECIFIED)
-            ldata = ReadableLogRecord(log_record=lrec,
-                                      instrumentation_scope=InstrumentationScope(name=""),
-                                      resource=_DEFAULT_RESOURCE)
-            self.exporter.export([ldata])
-            # If we send out log message successfully, reset our "fail" counter,
-            # so we would only react to MAX_SEND_FAILED_COUNT
-            # consecutive failed attempts to send.
-            self.fail_count = 0
+            if self.spill_buffer is not None:
+                if readable is None:
+                    readable = self._create_readable_log_record(record)
+                # Bounded deque drops the oldest record when full
+                self.spill_buffer.append(readable)
+                spilled = True
+
+            if self.spill_file is not None:
+                spilled = self._spill_to_file(self._format_record(record)) or spilled
         # pylint: disable=broad-except
-        except BaseException as exc:
-            # We want to catch as much as possible here:
-            # don't really care about failures in logging.
-            self.logger.info("FAILED to send OTLP log data: %s", exc)
-            self.fail_count = self.fail_count+1
-            if self._too_many_fails():
-                self.logger.error("Too many failed attempts to send log data: %d", self.fail_count)
-                self.logger.error("Giving up on this LoggingHandler")
+        except Exception:
+            spilled = False
+
+        if not spilled:
+            self.dropped_count += 1
+
+    def _spill_to_file(self, formatted: str) -> bool:
+        """
+        :param formatted: The formatted record to append to the spill file
+        :return: True if the record was written
+        """
+        line = formatted + "\n"
+        with self._spill_lock:
+            if self._spill_file_bytes + len(line) > self.spill_file_max_bytes:
+                return False
+            with open(self.spill_file, "a", encoding="utf-8") as spill_file:
+                spill_file.write(line)
+            self._spill_file_bytes += len(line)
+        return True
+
+    def _send_spill_buffer(self):
+        """
+        Send anything accumulated in the spill buffer while the collector
+        was unreachable. Called only after a successful export.
+        """
+        if not self.spill_buffer:
+            return
+
+        while self.spill_buffer and self.circuit_breaker.allow_request():
+            batch: List["ReadableLogRecord"] = []
+            try:
+                while len(batch) < SPILL_EXPORT_BATCH_SIZE:
+                    batch.append(self.spill_buffer.popleft())
+            except IndexError:
+                # Buffer was emptied, possibly by another thread.
+                pass
+            if not batch:
+                return
+
+            try:
+                self._export(batch)
+                self.circuit_breaker.record_success()
+            # pylint: disable=broad-except
+            except BaseException:
+                self.circuit_breaker.record_failure()
+                # Put them back in front, in order, for next time.
+                self.spill_buffer.extendleft(reversed(batch))
+                return
+
+    def close(self):
+        """
+        Tidy up any resources used by the handler.
+        """
+        try:
+            if self.spool_shipper is not None:
+                # Give queued records one last chance to go out.
+                # Anything left stays in the spool for next time.
+                self.spool_shipper.stop()
+                self.spool.close()
+            if self.exporter is not None:
+                self.exporter.shutdown()
+        # pylint: disable=broad-except
+        except Exception:
+            pass
         finally:
-            # If we have seen too many failures to send,
-            # that would disable our LoggerHandler -
-            # see the first check in method body.
-            self._already_called = self._too_many_fails()
+            super().close()
+
+    def _get_resource(self, record: logging.LogRecord) -> "Resource":
+        """
+        :param record: The LogRecord being emitted
+        :return: The Resource to send along with the record.
+                This is created at most once.
+        """
+        if self.resource is None:
+            service_name = record.__dict__.get(SOURCE_FIELD, None)
+            if service_name is None:
+                # Do not cache. We might get a source on the next record.
+                # pylint: disable=import-outside-toplevel
+                from opentelemetry.sdk.resources import _DEFAULT_RESOURCE
+                return _DEFAULT_RESOURCE
+            self.resource = self._create_resource(service_name)
+        return self.resource
 
-    def _too_many_fails(self) -> bool:
+    @staticmethod
+    def _create_resource(service_name: str) -> "Resource":
         """
-        Return True, if we have seen too many consecutive
-        failed attempts to send out log data.
-        Return False otherwise.
+        :param service_name: The name of the service sending the logs
+        :return: A Resource describing the service
+        """
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.resources import SERVICE_NAME
+        return Resource.create({SERVICE_NAME: str(service_name)})
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_severity_number(levelno: int) -> "SeverityNumber":
+        """
+        Results are remembered, as there are only ever a handful of levels.
+
+        :param levelno: The Python log level of a record
+        :return: The corresponding OpenTelemetry SeverityNumber
         """
-        return 0 < MAX_SEND_FAILED_COUNT < self.fail_count
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry._logs.severity import SeverityNumber
 
-    def _get_substitute_key(self, key: str, default_value: int, record: logging.LogRecord) -> int:
+        # API and METRICS sit between INFO and WARNING, so they map to the
+        # finer-grained INFO severities in the same order.
+        severity_by_level = {
+            METRICS: SeverityNumber.INFO2,
+            API: SeverityNumber.INFO3,
+        }
+        severity = severity_by_level.get(levelno, None)
+        if severity is not None:
+            return severity
+
+        # Other levels map to the severity of the next standard level down
+        if levelno < logging.DEBUG:
+            severity = SeverityNumber.TRACE
+        elif levelno < logging.INFO:
+            severity = SeverityNumber.DEBUG
+        elif levelno < logging.WARNING:
+            severity = SeverityNumber.INFO
+        elif levelno < logging.ERROR:
+            severity = SeverityNumber.WARN
+        elif levelno < logging.CRITICAL:
+            severity = SeverityNumber.ERROR
+        else:
+            severity = SeverityNumber.FATAL
+        return severity
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def _get_substitute_key(self, key: str, default_value: int, record: logging.LogRecord,
+                            converter) -> int:
         """
         Interpreting "record" as a Python dictionary,
-        extract value mapped to "key" in this dictionary.
-        We expect value to be convertable to integer,
-        any failure results in "default_value" being returned.
+        extract value mapped to "key" in this dictionary
+        and convert it to an id via the converter.
+        Missing or "None" values result in "default_value" being returned.
         """
         if key is None:
             return default_value
         subst_value = record.__dict__.get(key, None)
         if subst_value is None:
             return default_value
-        if isinstance(subst_value, str) and subst_value.lower() == "none":
+        subst_value = str(subst_value)
+        if subst_value.lower() == "none":
             return default_value
+        return converter(subst_value)
+
+    @staticmethod
+    @lru_cache(maxsize=ID_CACHE_SIZE)
+    def _to_trace_id(value: str) -> int:
+        """
+        :param value: A string id from a LogRecord field
+        :return: A valid (non-zero) 128-bit trace id. 32-digit hex strings,
+                UUIDs and integers in range are used as-is.
+                Anything else is hashed.
+        """
+        value = value.strip()
+        trace_id = 0
+        if len(value) == 32:
+            trace_id = OpenTelemetryLoggingHandler._parse_int(value, 16, _MAX_TRACE_ID)
+        elif len(value) == 36:
+            try:
+                trace_id = uuid.UUID(value).int
+            except ValueError:
+                trace_id = 0
+        else:
+            trace_id = OpenTelemetryLoggingHandler._parse_int(value, 10, _MAX_TRACE_ID)
+
+        if trace_id == 0:
+            trace_id = OpenTelemetryLoggingHandler._hash_id(value, 16)
+        return trace_id
+
+    @staticmethod
+    @lru_cache(maxsize=ID_CACHE_SIZE)
+    def _to_span_id(value: str) -> int:
+        """
+        :param value: A string id from a LogRecord field
+        :return: A valid (non-zero) 64-bit span id. 16-digit hex strings
+                and integers in range are used as-is. Anything else is hashed.
+        """
+        value = value.strip()
+        span_id = 0
+        if len(value) == 16:
+            span_id = OpenTelemetryLoggingHandler._parse_int(value, 16, _MAX_SPAN_ID)
+        else:
+            span_id = OpenTelemetryLoggingHandler._parse_int(value, 10, _MAX_SPAN_ID)
+
+        if span_id == 0:
+            span_id = OpenTelemetryLoggingHandler._hash_id(value, 8)
+        return span_id
+
+    @staticmethod
+    def _parse_int(value: str, base: int, max_value: int) -> int:
+        """
+        :return: The value parsed as an integer in the given base,
+                or 0 if it cannot be or it is out of range.
+        """
         try:
-            return int(subst_value)
+            parsed = int(value, base)
         except ValueError:
-            return default_value
+            return 0
+        if parsed < 0 or parsed > max_value:
+            return 0
+        return parsed
+
+    @staticmethod
+    def _hash_id(value: str, num_bytes: int) -> int:
+        """
+        :return: A stable, non-zero id of num_bytes derived from the value
+        """
+        digest = blake2b(value.encode("utf-8"), digest_size=num_bytes).digest()
+        hashed = int.from_bytes(digest, "big")
+        if hashed == 0:
+            hashed = 1
+        return hashed
 
-    def handleError(self, record: LogRecord):
+    def handleError(self, record: logging.LogRecord):
         """
         Handle errors which occur during an emit() call.
 
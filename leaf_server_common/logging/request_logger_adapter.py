@@ -15,10 +15,45 @@
 #
 # END COPYRIGHT
 
+from contextlib import contextmanager
 from logging import LoggerAdapter
+from typing import Any
+from typing import Dict
+from typing import Generator
+from typing import List
+
+import threading
+import time
 
 from leaf_server_common.logging.message_types import API
 from leaf_server_common.logging.message_types import METRICS
+from leaf_server_common.logging.service_log_record import ServiceLogRecord
+from leaf_server_common.logging.trace_context import TRACEPARENT_KEY
+from leaf_server_common.logging.trace_context import TraceContext
+
+# Names of the LogRecord fields attached to the one record logged per span
+SPAN_NAME_FIELD = "span_name"
+SPAN_DURATION_MS_FIELD = "span_duration_ms"
+
+# gRPC measures the deadline from slightly before the handler sees the request.
+# Termination this close to our own view of the deadline counts as the deadline passing.
+DEADLINE_TOLERANCE_SECONDS = 0.1
+
+# gRPC gives a time_remaining() of about 9.2e18 seconds when the client set no deadline.
+# Anything longer than a thread can wait for is taken to mean there is no deadline.
+NO_DEADLINE_SECONDS = threading.TIMEOUT_MAX
+
+
+def get_client_time_remaining(context) -> float:
+    """
+    :param context: a grpc.ServicerContext
+    :return: The number of seconds the client is willing to wait for the
+            request, or None if the client did not set a deadline
+    """
+    time_remaining = context.time_remaining()
+    if time_remaining is None or time_remaining >= NO_DEADLINE_SECONDS:
+        return None
+    return time_remaining
 
 
 class RequestLoggerAdapter(LoggerAdapter):
@@ -26,12 +61,208 @@ class RequestLoggerAdapter(LoggerAdapter):
     Class carrying around context for logging messages that arise
     within the context of processing a single service request.
 
-    This class only does rudimentary logging, but other versions
-    of this class might (for instance) be instantiated with trace ID
-    information from the gRPC headers so that information can be
-    collated and logged in a standard manner.
+    Each instance carries a TraceContext, typically continued from a W3C
+    traceparent in the gRPC request headers, whose trace and span ids are
+    attached to every record logged through this adapter.
+
+    Phases of the request can be timed with the span() context manager,
+    which logs one METRICS record per span when the span ends.
+    Spans are expected to be opened and closed on the thread servicing
+    the request.
+
+    The client's deadline and cancellation of the request are also tracked
+    here so that handlers can cheaply check whether anyone is still waiting
+    for the answer before doing more work, and can forward the remaining
+    time budget to outbound calls.
     """
 
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, logger, extra=None, trace_context: TraceContext = None):
+        """
+        Constructor
+
+        :param logger: The logger to send output to
+        :param extra: An optional dictionary of extra fields to attach
+                    to each record logged through this adapter
+        :param trace_context: The TraceContext for the request.
+                    Default of None means a new root trace is started.
+        """
+        super().__init__(logger, extra)
+
+        self.trace_context: TraceContext = trace_context
+        if self.trace_context is None:
+            self.trace_context = TraceContext()
+
+        # Stack of currently open spans. The request-level trace context
+        # is always at the bottom.
+        self._span_stack: List[TraceContext] = [self.trace_context]
+
+        # When handling of the request started, per time.monotonic()
+        self.start_time: float = time.monotonic()
+
+        # Time the request waited for a worker thread before handling started,
+        # if known
+        self.queue_wait_seconds: float = None
+
+        # Client deadline per time.monotonic(), or None if there is none
+        self.deadline: float = None
+
+        # The tenant the request is for, per ServerLifetime.tenant_field
+        self.tenant: str = None
+
+        # True while the request holds one of its tenant's quota slots
+        self.holds_quota: bool = False
+
+        # True for requests replayed by ServerWarmup, which are left out
+        # of request counts, latencies and tenant accounting
+        self.is_warmup: bool = False
+
+        # A cProfile.Profile running on the handler thread
+        # if this request was picked to be profiled
+        self.profile = None
+
+        # Set from a gRPC callback thread when the request terminates
+        # before the handler is finished with it.
+        self._cancelled: bool = False
+        self._finished: bool = False
+
+    def process(self, msg, kwargs):
+        """
+        Attaches the trace fields of the innermost open span to the record.
+        Fields the service's logging fields already put on every record are
+        left as they are, as the logging module refuses to overwrite them.
+
+        :param msg: The message to log
+        :param kwargs: The keyword arguments to the logging call
+        :return: A tuple of the msg and the modified kwargs
+        """
+        extra: Dict[str, Any] = self.get_current_span().get_logging_fields()
+        if self.extra:
+            extra.update(self.extra)
+        call_extra = kwargs.get("extra", None)
+        if call_extra:
+            extra.update(call_extra)
+        for key in ServiceLogRecord.get_record_field_names() & extra.keys():
+            del extra[key]
+        kwargs["extra"] = extra
+        return msg, kwargs
+
+    def get_current_span(self) -> TraceContext:
+        """
+        :return: The TraceContext of the innermost open span
+        """
+        return self._span_stack[-1]
+
+    def get_outbound_metadata(self) -> Dict[str, str]:
+        """
+        :return: A dictionary of metadata to send along with outbound
+                calls made on behalf of this request so the trace
+                continues downstream from the innermost open span
+        """
+        return {TRACEPARENT_KEY: self.get_current_span().to_traceparent()}
+
+    def set_time_remaining(self, time_remaining: float):
+        """
+        :param time_remaining: The number of seconds the client is willing
+                    to wait for the request, as per the time_remaining()
+                    of the grpc.ServicerContext. None means no deadline.
+        """
+        if time_remaining is None:
+            self.deadline = None
+        else:
+            self.deadline = time.monotonic() + time_remaining
+
+    def time_remaining(self) -> float:
+        """
+        :return: The number of seconds left before the client deadline,
+                which can be negative once it has passed.
+                None if the client did not set a deadline.
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def get_outbound_timeout(self, reserve_seconds: float = 0.0) -> float:
+        """
+        :param reserve_seconds: Time to hold back from the remaining budget
+                    for work to be done after the outbound call returns.
+        :return: The timeout to use for an outbound call made on behalf of
+                this request so it does not outlive the client's deadline,
+                or None if the client did not set a deadline.
+                Never less than 0.
+        """
+        remaining = self.time_remaining()
+        if remaining is None:
+            return None
+        return max(0.0, remaining - reserve_seconds)
+
+    def is_expired(self) -> bool:
+        """
+        :return: True if the client deadline has passed
+        """
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def is_cancelled(self) -> bool:
+        """
+        Cheap enough to call in the inner loops of handlers.
+
+        :return: True if nobody is waiting for the result of this request
+                anymore, either because the request was cancelled or
+                because the client deadline has passed.
+        """
+        return self._cancelled or self.is_expired()
+
+    def was_cancelled_by_client(self) -> bool:
+        """
+        :return: True if the request terminated before the handler finished
+                for some reason other than the deadline passing
+        """
+        return self._cancelled and not self.is_expired()
+
+    def on_terminated(self):
+        """
+        Callback registered with the grpc.ServicerContext, called when the
+        RPC terminates for whatever reason. Termination before finish()
+        means the client cancelled or the deadline passed.
+        """
+        if self._finished:
+            return
+        remaining = self.time_remaining()
+        if remaining is not None and remaining < DEADLINE_TOLERANCE_SECONDS:
+            self.deadline = time.monotonic()
+        self._cancelled = True
+
+    def finish(self):
+        """
+        Marks the handler as being done with the request, so that
+        the RPC terminating after this is not taken as a cancellation.
+        """
+        self._finished = True
+
+    @contextmanager
+    def span(self, name: str) -> Generator[TraceContext, None, None]:
+        """
+        Context manager timing a named phase of the request.
+        Spans can be nested. A single METRICS record with the elapsed time
+        is logged when the span ends, carrying the span's own ids.
+
+        :param name: The name of the phase being timed
+        :return: A generator yielding the TraceContext for the new span
+        """
+        span_context: TraceContext = self.get_current_span().create_child()
+        self._span_stack.append(span_context)
+        start_time: float = time.perf_counter()
+        try:
+            yield span_context
+        finally:
+            duration_ms: float = (time.perf_counter() - start_time) * 1000.0
+            extra = {
+                SPAN_NAME_FIELD: name,
+                SPAN_DURATION_MS_FIELD: round(duration_ms, 3)
+            }
+            self.log(METRICS, "Span %s took %.3f ms", name, duration_ms, extra=extra)
+            self._span_stack.pop()
+
     def metrics(self, msg, *args):
         """
         Intended only to be used by service-level code.
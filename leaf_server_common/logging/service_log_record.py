@@ -113,6 +113,34 @@ class ServiceLogRecord():
         default_extra_logging_fields = copy.copy(_DEFAULT_EXTRA_LOGGING_FIELDS_DICT)
         return default_extra_logging_fields
 
+    @classmethod
+    def get_current_logging_fields(cls):
+        """
+        :return: A copy of the logging fields dictionary set up for the
+                current thread, or of the defaults if there is none.
+                This is what is needed to carry the logging context of
+                a request over to another thread or process.
+        """
+        thread_dict = threading.current_thread().__dict__
+        logging_fields_dict = thread_dict.get(_SERVICE_LOGGING_FIELDS_KEY, None)
+        if logging_fields_dict is None:
+            return cls.get_default_extra_logging_fields()
+        return copy.copy(logging_fields_dict)
+
+    @classmethod
+    def get_record_field_names(cls):
+        """
+        Cheap enough to call for every record logged.
+
+        :return: A view of the names of the fields the record factory adds
+                to LogRecords made on the current thread. Empty if the record
+                factory has not been set up.
+        """
+        if _SERVICE_OLD_FACTORY is None:
+            return {}.keys()
+        thread_dict = threading.current_thread().__dict__
+        return thread_dict.get(_SERVICE_LOGGING_FIELDS_KEY, _DEFAULT_EXTRA_LOGGING_FIELDS_DICT).keys()
+
     def __init__(self, logging_fields_dict=None):
         """
         Constructor.
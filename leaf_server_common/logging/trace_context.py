@@ -0,0 +1,197 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+
+import random
+
+# Request metadata key for W3C trace context propagation.
+# See https://www.w3.org/TR/trace-context/#traceparent-header
+TRACEPARENT_KEY = "traceparent"
+
+# Names of the LogRecord fields the trace context is attached under
+TRACE_ID_FIELD = "trace_id"
+SPAN_ID_FIELD = "span_id"
+PARENT_SPAN_ID_FIELD = "parent_span_id"
+
+# The only traceparent version we know how to write.
+_TRACEPARENT_VERSION = "00"
+_INVALID_VERSION = "ff"
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+class TraceContext():
+    """
+    Lightweight carrier for W3C trace context (a 128-bit trace id and a
+    64-bit span id) for a single unit of work within a request.
+
+    This is deliberately not a full tracing SDK. It only knows how to
+    parse an incoming traceparent header, mint child spans and render
+    the ids in the lower-case hex form that OpenTelemetry backends expect.
+    """
+
+    # Random source for new ids. SystemRandom is not needed here,
+    # as ids only need to be unique, not unguessable.
+    _random = random.Random()
+
+    def __init__(self, trace_id: int = None, span_id: int = None,
+                 parent_span_id: int = None, trace_flags: int = 0):
+        """
+        Constructor
+
+        :param trace_id: The 128-bit trace id. Default of None means
+                    a new random trace id is generated.
+        :param span_id: The 64-bit span id. Default of None means
+                    a new random span id is generated.
+        :param parent_span_id: The 64-bit span id of the parent span.
+                    Default is None, indicating this is a root span.
+        :param trace_flags: The 8-bit W3C trace-flags. Default is 0.
+        """
+        self.trace_id: int = trace_id
+        if self.trace_id is None:
+            self.trace_id = self._new_id(128)
+
+        self.span_id: int = span_id
+        if self.span_id is None:
+            self.span_id = self._new_id(64)
+
+        self.parent_span_id: int = parent_span_id
+        self.trace_flags: int = trace_flags
+
+        # Ids never change, so the hex rendering is done at most once
+        self._logging_fields: Dict[str, str] = None
+
+    # pylint: disable=too-many-return-statements
+    @classmethod
+    def from_traceparent(cls, traceparent: str) -> "TraceContext":
+        """
+        :param traceparent: The value of a W3C traceparent header
+        :return: A new TraceContext for a span that is a child of the span
+                described by the header, or None if the header is not valid.
+        """
+        if not isinstance(traceparent, str):
+            return None
+
+        parts = traceparent.strip().lower().split("-")
+        if len(parts) < 4:
+            return None
+
+        version, trace_id_hex, parent_id_hex, flags_hex = parts[:4]
+        if not cls._is_hex(version, 2) or version == _INVALID_VERSION:
+            return None
+        # Version 00 has exactly 4 fields. Later versions may append more,
+        # which we are told to ignore.
+        if version == _TRACEPARENT_VERSION and len(parts) != 4:
+            return None
+        if not cls._is_hex(trace_id_hex, 32) \
+                or not cls._is_hex(parent_id_hex, 16) \
+                or not cls._is_hex(flags_hex, 2):
+            return None
+
+        trace_id = int(trace_id_hex, 16)
+        parent_span_id = int(parent_id_hex, 16)
+        if trace_id == 0 or parent_span_id == 0:
+            return None
+
+        return cls(trace_id=trace_id,
+                   parent_span_id=parent_span_id,
+                   trace_flags=int(flags_hex, 16))
+
+    @classmethod
+    def from_metadata(cls, metadata_dict: Dict[str, Any] = None) -> "TraceContext":
+        """
+        :param metadata_dict: Request metadata dictionary. Can be None.
+        :return: A TraceContext which continues the trace from a traceparent
+                in the metadata if there is a valid one, or a brand new
+                root trace otherwise.
+        """
+        trace_context = None
+        if metadata_dict is not None:
+            trace_context = cls.from_traceparent(metadata_dict.get(TRACEPARENT_KEY, None))
+
+        if trace_context is None:
+            trace_context = cls()
+        return trace_context
+
+    def create_child(self) -> "TraceContext":
+        """
+        :return: A new TraceContext for a span that is a child of this one
+        """
+        return TraceContext(trace_id=self.trace_id,
+                            parent_span_id=self.span_id,
+                            trace_flags=self.trace_flags)
+
+    def get_trace_id_hex(self) -> str:
+        """
+        :return: The trace id as 32 lower-case hex digits
+        """
+        return f"{self.trace_id:032x}"
+
+    def get_span_id_hex(self) -> str:
+        """
+        :return: The span id as 16 lower-case hex digits
+        """
+        return f"{self.span_id:016x}"
+
+    def get_parent_span_id_hex(self) -> str:
+        """
+        :return: The parent span id as 16 lower-case hex digits,
+                or None if this is a root span.
+        """
+        if self.parent_span_id is None:
+            return None
+        return f"{self.parent_span_id:016x}"
+
+    def to_traceparent(self) -> str:
+        """
+        :return: A W3C traceparent header value suitable for forwarding
+                to outbound calls made on behalf of this span
+        """
+        return f"{_TRACEPARENT_VERSION}-{self.get_trace_id_hex()}-" \
+               f"{self.get_span_id_hex()}-{self.trace_flags:02x}"
+
+    def get_logging_fields(self) -> Dict[str, str]:
+        """
+        :return: A dictionary of fields to be attached to each LogRecord
+                logged within this span
+        """
+        if self._logging_fields is None:
+            self._logging_fields = {
+                TRACE_ID_FIELD: self.get_trace_id_hex(),
+                SPAN_ID_FIELD: self.get_span_id_hex(),
+                PARENT_SPAN_ID_FIELD: self.get_parent_span_id_hex()
+            }
+        # Callers are free to modify what is returned
+        return dict(self._logging_fields)
+
+    @classmethod
+    def _new_id(cls, num_bits: int) -> int:
+        """
+        :param num_bits: The number of bits in the id
+        :return: A new random id. All-zero ids are invalid per the W3C spec.
+        """
+        new_id = 0
+        while new_id == 0:
+            new_id = cls._random.getrandbits(num_bits)
+        return new_id
+
+    @staticmethod
+    def _is_hex(value: str, length: int) -> bool:
+        """
+        :return: True if the value is a lower-case hex string of the given length
+        """
+        return len(value) == length and _HEX_DIGITS.issuperset(value)
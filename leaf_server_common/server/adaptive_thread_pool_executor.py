@@ -0,0 +1,269 @@
+
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Set
+
+import queue
+import threading
+import time
+
+from leaf_server_common.server.latency_tracker import LatencyTracker
+
+# Names of the latency histograms kept by the executor
+QUEUE_WAIT = "queue_wait"
+HANDLER = "handler"
+
+# Weight of the newest sample in exponentially weighted moving averages
+_EWMA_WEIGHT = 0.1
+
+# Thread-local storage for the queue wait of the work item currently being
+# run by a worker thread
+_WORKER_LOCAL = threading.local()
+
+
+class _WorkItem():
+    """
+    A unit of work submitted to the AdaptiveThreadPoolExecutor
+    """
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, future: futures.Future, fn: Callable, args, kwargs):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueue_time = time.monotonic()
+
+
+class AdaptiveThreadPoolExecutor(futures.Executor):
+    """
+    A thread pool executor that grows and shrinks its number of threads
+    between a minimum and a maximum.
+
+    A new thread is started on submit() when there is no idle thread to take
+    the work and the expected wait in the queue, judging by the queue depth
+    and the recent average time it takes to run a work item, is over a target.
+    Threads idle for longer than an idle timeout exit, down to the minimum.
+
+    Time spent waiting in the queue is tracked separately from the time
+    spent actually running each work item.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments,too-many-positional-arguments
+    def __init__(self, min_workers: int = 2, max_workers: int = 10,
+                 idle_timeout_seconds: float = 30.0,
+                 target_queue_wait_seconds: float = 0.005,
+                 thread_name_prefix: str = "AdaptiveWorker"):
+        """
+        Constructor
+
+        :param min_workers: The number of threads always kept around. Default is 2.
+        :param max_workers: The maximum number of threads. Default is 10.
+        :param idle_timeout_seconds: Time a thread above the minimum may sit idle
+                    before it exits. Default is 30 seconds.
+        :param target_queue_wait_seconds: Expected queue wait above which another
+                    thread is started. Default is 5 milliseconds.
+        :param thread_name_prefix: Prefix for the names of the threads
+        """
+        if max_workers < 1 or min_workers < 0 or min_workers > max_workers:
+            raise ValueError(f"Invalid worker bounds min={min_workers} max={max_workers}")
+
+        self.min_workers: int = min_workers
+        self.max_workers: int = max_workers
+        self.idle_timeout_seconds: float = idle_timeout_seconds
+        self.target_queue_wait_seconds: float = target_queue_wait_seconds
+        self.thread_name_prefix: str = thread_name_prefix
+
+        self.latency = LatencyTracker()
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._num_workers: int = 0
+        self._num_idle: int = 0
+        self._peak_workers: int = 0
+        self._thread_counter: int = 0
+        self._shutdown: bool = False
+        self._threads: Set[threading.Thread] = set()
+
+        # Recent averages, in seconds
+        self._avg_handler_seconds: float = 0.0
+        self._avg_queue_wait_seconds: float = 0.0
+
+        with self._lock:
+            for _ in range(self.min_workers):
+                self._start_worker()
+
+    @staticmethod
+    def get_current_queue_wait_seconds() -> float:
+        """
+        :return: The time the work item being run on the calling thread
+                spent waiting in the queue of an AdaptiveThreadPoolExecutor,
+                or None if the calling thread is not one of its workers.
+        """
+        return getattr(_WORKER_LOCAL, "queue_wait_seconds", None)
+
+    def submit(self, fn, /, *args, **kwargs) -> futures.Future:
+        """
+        Submit a callable to be run on the pool
+
+        :param fn: The callable
+        :param args: Positional arguments to the callable
+        :param kwargs: Keyword arguments to the callable
+        :return: A Future for the result of the callable
+        """
+        future = futures.Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._queue.put(_WorkItem(future, fn, args, kwargs))
+            if self._should_grow():
+                self._start_worker()
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """
+        Shut down the pool
+
+        :param wait: When True, wait for all threads to exit
+        :param cancel_futures: When True, cancel all work not yet started
+        """
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        work_item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    work_item.future.cancel()
+            threads = list(self._threads)
+            # One sentinel per worker wakes each of them up to exit
+            for _ in range(self._num_workers):
+                self._queue.put(None)
+
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary of metrics about the pool
+        """
+        with self._lock:
+            metrics: Dict[str, Any] = {
+                "workers": self._num_workers,
+                "idle_workers": self._num_idle,
+                "peak_workers": self._peak_workers,
+                "queue_depth": self._queue.qsize(),
+                "avg_queue_wait_ms": round(self._avg_queue_wait_seconds * 1000.0, 3),
+                "avg_handler_ms": round(self._avg_handler_seconds * 1000.0, 3),
+            }
+        metrics.update(self.latency.get_snapshot())
+        return metrics
+
+    def _should_grow(self) -> bool:
+        """
+        Called with the lock held after a work item has been queued.
+
+        :return: True if another thread should be started
+        """
+        if self._num_workers >= self.max_workers:
+            return False
+        pending = self._queue.qsize()
+        if pending <= self._num_idle:
+            # Someone is free to pick it up right away
+            return False
+        if self._num_workers == 0 or self._avg_handler_seconds <= 0.0:
+            # Nothing to go on yet
+            return True
+
+        # Each pending item beyond the idle threads waits, on average,
+        # for a share of the running items to finish.
+        expected_wait = (pending - self._num_idle) * self._avg_handler_seconds / self._num_workers
+        return expected_wait > self.target_queue_wait_seconds
+
+    def _start_worker(self):
+        """
+        Called with the lock held to start a new thread.
+        """
+        self._thread_counter += 1
+        self._num_workers += 1
+        self._peak_workers = max(self._peak_workers, self._num_workers)
+        thread = threading.Thread(target=self._work,
+                                  name=f"{self.thread_name_prefix}-{self._thread_counter}",
+                                  daemon=True)
+        self._threads.add(thread)
+        thread.start()
+
+    def _work(self):
+        """
+        Main loop of each worker thread
+        """
+        while True:
+            with self._lock:
+                self._num_idle += 1
+            try:
+                work_item = self._queue.get(timeout=self.idle_timeout_seconds)
+            except queue.Empty:
+                work_item = False
+            with self._lock:
+                self._num_idle -= 1
+                exiting = work_item is None
+                if work_item is False:
+                    # Work submitted after the timeout but before taking the lock
+                    # counted on this thread being idle, so do not leave it behind
+                    if self._num_workers <= self.min_workers or not self._queue.empty():
+                        continue
+                    exiting = True
+                if exiting:
+                    # Shutdown sentinel, or idle for too long
+                    self._num_workers -= 1
+                    self._threads.discard(threading.current_thread())
+                    return
+
+            self._run(work_item)
+
+    def _run(self, work_item: _WorkItem):
+        """
+        Run a single work item on the current thread, recording its timings.
+        """
+        if not work_item.future.set_running_or_notify_cancel():
+            return
+
+        start_time = time.monotonic()
+        queue_wait = start_time - work_item.enqueue_time
+        _WORKER_LOCAL.queue_wait_seconds = queue_wait
+        try:
+            result = work_item.fn(*work_item.args, **work_item.kwargs)
+        # pylint: disable=broad-except
+        except BaseException as exc:
+            work_item.future.set_exception(exc)
+        else:
+            work_item.future.set_result(result)
+        finally:
+            _WORKER_LOCAL.queue_wait_seconds = None
+            handler_seconds = time.monotonic() - start_time
+            self.latency.record(QUEUE_WAIT, queue_wait)
+            self.latency.record(HANDLER, handler_seconds)
+            with self._lock:
+                self._avg_queue_wait_seconds += _EWMA_WEIGHT * (queue_wait - self._avg_queue_wait_seconds)
+                self._avg_handler_seconds += _EWMA_WEIGHT * (handler_seconds - self._avg_handler_seconds)
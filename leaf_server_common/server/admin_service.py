@@ -0,0 +1,277 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from collections import Counter
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+import gc
+import logging
+import os
+import threading
+import time
+
+import grpc
+
+from google.protobuf.struct_pb2 import Struct     # pylint: disable=no-name-in-module
+
+from leaf_server_common.server.service_info import ServiceInfo
+
+# Name of the admin service. Its methods take and return google.protobuf.Struct
+ADMIN_SERVICE_NAME = "leaf.server.Admin"
+
+# Default time a status snapshot is reused for before it is taken again
+DEFAULT_SNAPSHOT_TTL_SECONDS = 1.0
+
+
+class AdminService():
+    """
+    Optional gRPC service for looking inside and adjusting a running
+    ServerLifetime-based service without redeploying it.
+
+    So that no generated code is needed on either side, every method takes
+    and returns a google.protobuf.Struct, which clients can build from and
+    turn into plain dictionaries with google.protobuf.json_format.
+    Methods of the ADMIN_SERVICE_NAME service are:
+
+        GetStatus               {} -> stats, latency, in-flight requests, heaviest tenants,
+                                      service info, threads, GC and more
+        SetLogLevel             {"logger": name, "level": "DEBUG"}
+                                      An empty logger name means the root logger.
+        SetLogRequestMetadata   {"enabled": true}
+        Recycle                 {"reason": "..."} starts a graceful shutdown
+        StartProfiling          {"duration_seconds": 30, "interval_seconds": 0.01}
+        ProfileRequests         {"caller": name, "one_in": 100, "max_profiles": 10}
+
+    GetStatus answers from a serialized snapshot taken at most once per
+    snapshot TTL, so it is cheap to poll. Calls to this service do not
+    count as requests in the stats of the ServerLifetime.
+
+    Anyone who can reach the service can change logging and shut the
+    server down, so it should only be reachable from inside the cluster.
+    """
+
+    def __init__(self, lifetime, service_info: ServiceInfo = None,
+                 snapshot_ttl_seconds: float = DEFAULT_SNAPSHOT_TTL_SECONDS):
+        """
+        Constructor
+
+        :param lifetime: The ServerLifetime to report on and adjust
+        :param service_info: The ServiceInfo to report.
+                    Default of None means one made from the lifetime's
+                    name for logs and start time.
+        :param snapshot_ttl_seconds: Time a status snapshot is reused for
+        """
+        self.lifetime = lifetime
+        self.service_info: ServiceInfo = service_info
+        if self.service_info is None:
+            self.service_info = ServiceInfo(name=lifetime.get_server_name_for_logs(),
+                                            start_time_since_epoch=lifetime.get_start_time_since_epoch())
+        self.snapshot_ttl_seconds: float = snapshot_ttl_seconds
+
+        self._lock = Lock()
+        self._snapshot: bytes = None
+        self._snapshot_time: float = None
+
+    def create_handler(self) -> grpc.GenericRpcHandler:
+        """
+        :return: A handler to add to the grpc server with add_generic_rpc_handlers()
+        """
+        controls: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "SetLogLevel": self.set_log_level,
+            "SetLogRequestMetadata": self.set_log_request_metadata,
+            "Recycle": self.recycle,
+            "StartProfiling": self.start_profiling,
+            "ProfileRequests": self.profile_requests,
+        }
+        handlers = {name: grpc.unary_unary_rpc_method_handler(self._wrap_control(control))
+                    for name, control in controls.items()}
+
+        # The snapshot is already serialized, so it goes out as is
+        handlers["GetStatus"] = grpc.unary_unary_rpc_method_handler(
+            lambda _request, _context: self.get_status_bytes())
+        return grpc.method_handlers_generic_handler(ADMIN_SERVICE_NAME, handlers)
+
+    def get_status_bytes(self) -> bytes:
+        """
+        :return: The serialized Struct of the status snapshot,
+                taking a new snapshot if the last one is too old
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is None or now - self._snapshot_time >= self.snapshot_ttl_seconds:
+                status = Struct()
+                status.update(to_json_compatible(self.get_status()))
+                self._snapshot = status.SerializeToString()
+                self._snapshot_time = now
+            return self._snapshot
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary describing the state of the service right now
+        """
+        lifetime = self.lifetime
+        with lifetime.lock:
+            stats = dict(lifetime.stats)
+        return {
+            "service_info": self.service_info.get_service_info(),
+            "stats": stats,
+            "shutdown_requested": lifetime.shutdown_requested.is_set(),
+            "shutdown_reason": lifetime.shutdown_reason,
+            "log_request_metadata": lifetime.log_request_metadata,
+            "latency": lifetime.get_latency_snapshot(),
+            "in_flight": lifetime.get_in_flight_requests(),
+            "slow_requests": lifetime.watchdog.get_metrics(),
+            "tenants": lifetime.get_tenant_usage(),
+            "periodic_tasks": lifetime.get_periodic_task_metrics(),
+            "warmup": lifetime.warmup_metrics,
+            "profiling": {
+                "sampling": lifetime.sampling_profiler.get_status(),
+                "requests": lifetime.request_profiler.get_status()
+            },
+            "threads": self.get_thread_stats(),
+            "gc": self.get_gc_stats(lifetime.gc_policy),
+            "pid": os.getpid()
+        }
+
+    @staticmethod
+    def get_thread_stats() -> Dict[str, Any]:
+        """
+        :return: A dictionary with the number of threads, and the number
+                of threads by name with any trailing number taken off
+        """
+        threads = threading.enumerate()
+        by_name = Counter(thread.name.rstrip("0123456789").rstrip("-_") or thread.name for thread in threads)
+        return {
+            "count": len(threads),
+            "by_name": dict(by_name)
+        }
+
+    @staticmethod
+    def get_gc_stats(gc_policy=None) -> Dict[str, Any]:
+        """
+        :param gc_policy: The GcPolicy of the lifetime, if any
+        :return: A dictionary describing the state of the garbage collector
+        """
+        stats = {
+            "enabled": gc.isenabled(),
+            "counts": list(gc.get_count()),
+            "thresholds": list(gc.get_threshold()),
+            "frozen": gc.get_freeze_count(),
+            "generations": gc.get_stats()
+        }
+        if gc_policy is not None:
+            stats["policy"] = gc_policy.get_metrics()
+        return stats
+
+    def set_log_level(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param request: A dictionary with the "logger" name and the new "level"
+        :return: A dictionary with the logger name and its old and new levels
+        """
+        name = request.get("logger", "")
+        level_name = str(request.get("level", "")).upper()
+        level = logging.getLevelName(level_name)
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level {level_name}")
+
+        logger = logging.getLogger(name or None)
+        previous = logging.getLevelName(logger.level)
+        logger.setLevel(level)
+        self.lifetime.logger.info("Admin set level of logger '%s' from %s to %s", name, previous, level_name)
+        return {"logger": name, "previous": previous, "level": level_name}
+
+    def set_log_request_metadata(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param request: A dictionary saying whether logging of request metadata is "enabled"
+        :return: A dictionary with the old and new settings
+        """
+        previous = self.lifetime.log_request_metadata
+        self.lifetime.log_request_metadata = bool(request.get("enabled", False))
+        self.lifetime.logger.info("Admin set log_request_metadata to %s",
+                                  str(self.lifetime.log_request_metadata))
+        return {"previous": previous, "enabled": self.lifetime.log_request_metadata}
+
+    def recycle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param request: A dictionary with an optional "reason"
+        :return: A dictionary with the reason given to the shutdown
+        """
+        reason = f"admin recycle: {request.get('reason', 'no reason given')}"
+        self.lifetime.request_shutdown(reason)
+        return {"reason": reason}
+
+    def start_profiling(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param request: A dictionary with optional "duration_seconds"
+                    and "interval_seconds"
+        :return: A dictionary with the file the profile goes to,
+                which is None if a profile is already being taken
+        """
+        kwargs = {key: float(request.get(key)) for key in ("duration_seconds", "interval_seconds")
+                  if request.get(key) is not None}
+        return {"file": self.lifetime.start_profiling(**kwargs)}
+
+    def profile_requests(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param request: A dictionary with the "caller" to profile, "one_in"
+                    and an optional "max_profiles"
+        :return: A dictionary describing the request profiling now going on
+        """
+        caller = request.get("caller")
+        if not caller:
+            raise ValueError("A caller is required")
+        self.lifetime.profile_requests(str(caller), int(request.get("one_in", 0)),
+                                       int(request.get("max_profiles", 10)))
+        return self.lifetime.request_profiler.get_status()
+
+    def _wrap_control(self, control: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        """
+        :return: A grpc behavior taking and returning serialized Structs
+                around the given control method
+        """
+        def behavior(request_bytes: bytes, context) -> bytes:
+            request = Struct.FromString(request_bytes)
+            try:
+                result = control(dict(request.items()))
+            except ValueError as exception:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exception))
+
+            # Controls change what the snapshot would say
+            with self._lock:
+                self._snapshot = None
+
+            response = Struct()
+            response.update(to_json_compatible(result))
+            return response.SerializeToString()
+        return behavior
+
+
+def to_json_compatible(value: Any) -> Any:
+    """
+    :param value: A value made up of dictionaries, lists and scalars
+    :return: The same value with dictionary keys made strings, tuples made
+            lists and anything Struct cannot hold made a string
+    """
+    if isinstance(value, dict):
+        return {str(key): to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_compatible(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
@@ -15,22 +15,38 @@
 #
 # END COPYRIGHT
 
+from typing import List
+from typing import Sequence
+
 import threading
 
 
 class AtomicCounter():
     """
     A class for thread-safe increment/decrement of a counter shared among threads.
+
+    Besides plain increments, the read-modify-write operations here are
+    atomic with respect to each other, so they can be used for limit checks.
+    Counters which must be read consistently with each other can share
+    a lock and be read together with snapshot().
+
+    For counters that are written far more often than they are read
+    by many threads at once, see ShardedCounter.
     """
 
-    def __init__(self, value: int = 0):
+    def __init__(self, value: int = 0, lock: threading.Lock = None):
         """
         Constructor
 
         :param value: The initial value of the counter. Default is 0.
+        :param lock: An optional lock to share with other counters,
+                    making snapshot() of those counters cheaper.
+                    Default of None means this counter gets its own lock.
         """
         self._value = int(value)
-        self._lock = threading.Lock()
+        self._lock = lock
+        if self._lock is None:
+            self._lock = threading.Lock()
 
     def increment(self, step: int = 1):
         """
@@ -53,6 +69,86 @@ class AtomicCounter():
 
     def get_count(self) -> int:
         """
+        Reading a single value does not need the lock, as the value is
+        only ever replaced whole. Use snapshot() to read several counters
+        consistently with each other.
+
         :return: The value of the counter.
         """
         return self._value
+
+    def add_and_get(self, delta: int) -> int:
+        """
+        Atomically add to the counter.
+
+        :param delta: The amount to add. Can be negative.
+        :return: The value of the counter after the addition
+        """
+        with self._lock:
+            self._value += int(delta)
+            return self._value
+
+    def get_and_add(self, delta: int) -> int:
+        """
+        Atomically add to the counter.
+
+        :param delta: The amount to add. Can be negative.
+        :return: The value of the counter before the addition
+        """
+        with self._lock:
+            previous = self._value
+            self._value = previous + int(delta)
+            return previous
+
+    def compare_and_set(self, expected: int, new_value: int) -> bool:
+        """
+        Atomically set the counter to a new value only if it currently
+        has the expected value.
+
+        :param expected: The value the counter is expected to have
+        :param new_value: The value to set the counter to
+        :return: True if the counter had the expected value and was set.
+                False otherwise.
+        """
+        with self._lock:
+            if self._value != expected:
+                return False
+            self._value = int(new_value)
+            return True
+
+    def add_if_below(self, delta: int, limit: int) -> bool:
+        """
+        Atomically add to the counter only if the result stays below a limit.
+        This is the typical shape of a concurrency limit check.
+
+        :param delta: The amount to add
+        :param limit: The value the counter must stay strictly below
+        :return: True if the addition was made. False otherwise.
+        """
+        with self._lock:
+            if self._value + int(delta) >= limit:
+                return False
+            self._value += int(delta)
+            return True
+
+    @staticmethod
+    def snapshot(counters: Sequence["AtomicCounter"]) -> List[int]:
+        """
+        Read a group of counters consistently, that is, with no update
+        to any of them happening in between the reads.
+
+        :param counters: The counters to read
+        :return: A list of the counter values, in the same order
+        """
+        # pylint: disable=protected-access
+        # Take each distinct lock exactly once, in a fixed order,
+        # so concurrent snapshots cannot deadlock each other.
+        locks = {id(counter._lock): counter._lock for counter in counters}
+        ordered = [locks[key] for key in sorted(locks)]
+        for lock in ordered:
+            lock.acquire()
+        try:
+            return [counter._value for counter in counters]
+        finally:
+            for lock in reversed(ordered):
+                lock.release()
@@ -0,0 +1,309 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import Tuple
+
+import struct
+import time
+import zlib
+
+import grpc
+
+# Version of the chunk and request formats
+CHUNK_FORMAT_VERSION = 1
+
+# Flag on the final chunk of a response
+LAST_CHUNK = 0x01
+
+# Header in front of the data of each chunk, in network byte order:
+# version (1 byte), flags (1 byte), reserved (2 bytes), CRC32 of the data
+# in this chunk (4 bytes), size of the whole response (8 bytes)
+# and offset of this chunk's data within the response (8 bytes)
+CHUNK_HEADER = struct.Struct("!BBHIQQ")
+
+# Header in front of the serialized request of the wrapped behavior:
+# version (1 byte) and offset of the response to resume from (8 bytes)
+REQUEST_HEADER = struct.Struct("!BQ")
+
+# Default data bytes per chunk. Well under grpc's default 4MB message limit,
+# and big enough that per-message overhead does not matter.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Default largest response a client will allocate room for
+DEFAULT_MAX_TOTAL_SIZE = 2 * 1024 * 1024 * 1024
+
+# Default number of tries a client makes at getting the whole response
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Status codes of a broken-off stream that are worth resuming after
+RESUMABLE_STATUS_CODES = (grpc.StatusCode.UNAVAILABLE,
+                          grpc.StatusCode.ABORTED,
+                          grpc.StatusCode.INTERNAL,
+                          grpc.StatusCode.UNKNOWN)
+
+
+def encode_chunks(payload, offset: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    :param payload: The bytes-like response to send
+    :param offset: The offset to start sending from, for resuming
+    :param chunk_size: The most data bytes in any one chunk
+    :return: A generator of chunk frames covering the payload from the offset.
+            An empty remainder still gets a single last chunk.
+    """
+    view = memoryview(payload).cast("B")
+    total_size = len(view)
+    if offset < 0 or offset > total_size:
+        raise ValueError(f"Offset {offset} is outside a response of {total_size} bytes")
+
+    while True:
+        end = min(offset + chunk_size, total_size)
+        data = view[offset:end]
+        flags = LAST_CHUNK if end == total_size else 0
+        header = CHUNK_HEADER.pack(CHUNK_FORMAT_VERSION, flags, 0, zlib.crc32(data), total_size, offset)
+        yield b"".join((header, data))
+        if flags & LAST_CHUNK:
+            return
+        offset = end
+
+
+def serialize(message: Any, serializer: Callable[[Any], bytes] = None):
+    """
+    :param message: A request or response
+    :param serializer: Turns the message into bytes.
+                Default of None means the message's SerializeToString(),
+                or the message itself if it is already bytes-like.
+    :return: The bytes-like serialized message
+    """
+    if serializer is not None:
+        return serializer(message)
+    if isinstance(message, (bytes, bytearray, memoryview)):
+        return message
+    return message.SerializeToString()
+
+
+def encode_request(request_bytes: bytes, offset: int = 0) -> bytes:
+    """
+    :param request_bytes: The serialized request of the wrapped behavior
+    :param offset: The offset of the response to start from
+    :return: The request as sent to a chunked method
+    """
+    return REQUEST_HEADER.pack(CHUNK_FORMAT_VERSION, offset) + request_bytes
+
+
+def decode_request(frame: bytes) -> Tuple[int, bytes]:
+    """
+    :param frame: The request as received by a chunked method
+    :return: A tuple of the offset to start from and the serialized request
+            of the wrapped behavior
+    """
+    if len(frame) < REQUEST_HEADER.size:
+        raise ValueError("Chunked request is too short")
+    version, offset = REQUEST_HEADER.unpack_from(frame)
+    if version != CHUNK_FORMAT_VERSION:
+        raise ValueError(f"Unknown chunked request version {version}")
+    return offset, frame[REQUEST_HEADER.size:]
+
+
+def chunked_unary_stream_rpc_method_handler(behavior: Callable[[Any, Any], Any],
+                                            request_deserializer: Callable[[bytes], Any] = None,
+                                            response_serializer: Callable[[Any], bytes] = None,
+                                            chunk_size: int = DEFAULT_CHUNK_SIZE) -> grpc.RpcMethodHandler:
+    """
+    Use in place of grpc.unary_unary_rpc_method_handler() for methods with
+    very large responses, for instance in a grpc.method_handlers_generic_handler(),
+    so that they are not sent as one huge message.
+
+    The response is serialized once and sent as a server-streaming RPC of
+    chunks of at most chunk_size bytes, each read straight out of the
+    serialized response. A chunk is only made when grpc asks for the next
+    one, so flow control keeps just a few chunks in flight, and other
+    streams on the same HTTP/2 connection get their turn in between.
+    Clients use call_chunked().
+
+    Resuming calls the behavior again, so it should return the same
+    response for the same request, caching it if that is expensive.
+
+    :param behavior: The unary behavior taking the request and the
+                grpc.ServicerContext and returning the response
+    :param request_deserializer: Turns the serialized request into what the
+                behavior takes, like SomeRequest.FromString.
+                Default of None means the behavior takes bytes.
+    :param response_serializer: Turns what the behavior returns into bytes.
+                Default of None means the response's SerializeToString(),
+                or the response itself if it is already bytes-like.
+    :param chunk_size: The most data bytes in any one chunk
+    :return: A grpc.RpcMethodHandler for a server-streaming method
+    """
+
+    def chunked_behavior(frame: bytes, context) -> Iterator[bytes]:
+        try:
+            offset, request_bytes = decode_request(frame)
+        except ValueError as exception:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exception))
+
+        request = request_bytes
+        if request_deserializer is not None:
+            request = request_deserializer(request_bytes)
+        response = behavior(request, context)
+
+        payload = serialize(response, response_serializer)
+        if offset > len(payload):
+            context.abort(grpc.StatusCode.OUT_OF_RANGE,
+                          f"Offset {offset} is past the end of a response of {len(payload)} bytes")
+        yield from encode_chunks(payload, offset, chunk_size)
+
+    return grpc.unary_stream_rpc_method_handler(chunked_behavior)
+
+
+class ChunkAssembler():
+    """
+    Puts the chunks of a response back together in a buffer allocated once.
+    Not thread-safe on its own.
+    """
+
+    def __init__(self, max_total_size: int = DEFAULT_MAX_TOTAL_SIZE):
+        """
+        Constructor
+
+        :param max_total_size: The largest response to allocate room for
+        """
+        self.max_total_size: int = max_total_size
+        self.offset: int = 0
+        self.total_size: int = None
+        self.done: bool = False
+        self._buffer: bytearray = None
+        self._view: memoryview = None
+
+    def add(self, frame: bytes) -> bool:
+        """
+        Checks a chunk and copies its data into place.
+        Raises ValueError if the chunk is corrupt or out of place,
+        in which case the response can be resumed from the current offset.
+
+        :param frame: A chunk frame as sent by encode_chunks()
+        :return: True if this was the last chunk
+        """
+        if len(frame) < CHUNK_HEADER.size:
+            raise ValueError("Chunk is too short")
+        version, flags, _, crc, total_size, offset = CHUNK_HEADER.unpack_from(frame)
+        if version != CHUNK_FORMAT_VERSION:
+            raise ValueError(f"Unknown chunk version {version}")
+
+        if self._buffer is None:
+            if total_size > self.max_total_size:
+                raise ValueError(f"Response of {total_size} bytes is over the limit of {self.max_total_size}")
+            self.total_size = total_size
+            self._buffer = bytearray(total_size)
+            self._view = memoryview(self._buffer)
+        elif total_size != self.total_size:
+            raise ValueError(f"Response size changed from {self.total_size} to {total_size} bytes")
+
+        if offset != self.offset:
+            raise ValueError(f"Chunk at offset {offset} when expecting {self.offset}")
+        data = memoryview(frame)[CHUNK_HEADER.size:]
+        end = offset + len(data)
+        if end > total_size:
+            raise ValueError(f"Chunk runs past the end of a response of {total_size} bytes")
+        if zlib.crc32(data) != crc:
+            raise ValueError(f"Chunk at offset {offset} failed its CRC check")
+
+        self._view[offset:end] = data
+        self.offset = end
+        if flags & LAST_CHUNK:
+            if end != total_size:
+                raise ValueError(f"Last chunk ends at {end} of {total_size} bytes")
+            self.done = True
+        return self.done
+
+    def get_payload(self) -> bytearray:
+        """
+        :return: The reassembled response, without copying it
+        """
+        if not self.done:
+            raise ValueError(f"Response is incomplete at {self.offset} of {self.total_size} bytes")
+        self._view.release()
+        return self._buffer
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+def call_chunked(channel: grpc.Channel, method: str, request: Any,
+                 request_serializer: Callable[[Any], bytes] = None,
+                 response_deserializer: Callable[[Any], Any] = None,
+                 timeout: float = None, metadata=None,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 max_total_size: int = DEFAULT_MAX_TOTAL_SIZE) -> Any:
+    """
+    Calls a method served by chunked_unary_stream_rpc_method_handler()
+    and puts the response back together in a buffer allocated once, when
+    the first chunk says how big the response is. Each chunk's CRC32 and
+    offset are checked before it is copied into place. If the stream
+    breaks off or a chunk is corrupt, the method is called again asking
+    for the rest of the response from the last good chunk.
+
+    :param channel: The grpc.Channel to call on
+    :param method: The full method name, like "/package.Service/Method"
+    :param request: The request to send
+    :param request_serializer: Turns the request into bytes.
+                Default of None means the request's SerializeToString(),
+                or the request itself if it is already bytes-like.
+    :param response_deserializer: Turns the reassembled bytearray into the
+                response, like SomeResponse.FromString.
+                Default of None means the bytearray itself is returned.
+    :param timeout: The longest time for all attempts together.
+                Default of None means no deadline.
+    :param metadata: Optional metadata to send with each attempt
+    :param max_attempts: The number of calls made before giving up
+    :param max_total_size: The largest response to allocate room for
+    :return: The response
+    """
+    request_bytes = bytes(serialize(request, request_serializer))
+    deadline = None
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+
+    call = channel.unary_stream(method)
+    assembler = ChunkAssembler(max_total_size)
+    for attempt in range(1, max_attempts + 1):
+        remaining = None
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.monotonic())
+        responses = call(encode_request(request_bytes, assembler.offset), timeout=remaining, metadata=metadata)
+        try:
+            for frame in responses:
+                if assembler.add(frame):
+                    break
+        except grpc.RpcError as exception:
+            # pylint: disable=no-member
+            if exception.code() not in RESUMABLE_STATUS_CODES or attempt == max_attempts:
+                raise
+        except ValueError:
+            # A response too big to take will not get any smaller
+            if assembler.total_size is None or attempt == max_attempts:
+                raise
+        finally:
+            # Nothing more is wanted from this attempt
+            responses.cancel()
+
+        if assembler.done:
+            break
+
+    payload = assembler.get_payload()
+    if response_deserializer is not None:
+        return response_deserializer(payload)
+    return payload
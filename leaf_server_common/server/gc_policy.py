@@ -0,0 +1,186 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+from typing import Tuple
+
+import gc
+import time
+
+from leaf_server_common.server.latency_tracker import LatencyHistogram
+
+# Oldest generation, whose collections look at every tracked object
+FULL_GENERATION = 2
+
+# Default shortest time between collections of the oldest generation
+# done while the server is idle
+DEFAULT_MIN_IDLE_COLLECT_SECONDS = 10.0
+
+# Name of the pause histogram for collections done while idle
+IDLE_PAUSES = "idle"
+
+
+class GcPolicy():
+    """
+    Garbage collection policy for latency-sensitive serving.
+
+    Handlers creating lots of protobuf objects set off collections of the
+    oldest generation in the middle of requests, which go through every
+    object the service has ever kept around and show up as p99 spikes.
+    When given to a ServerLifetime, this:
+
+        * Collects and then gc.freeze()s everything alive once warmup is
+          done, so that models, caches and modules loaded at startup are
+          never looked at by the collector again.
+        * Optionally sets larger collection thresholds, so that collections
+          of the oldest generation happen less often on their own.
+        * Collects the oldest generation when the server is idle, as judged
+          by ServerLoopCallbacks.loop_callback() and the number of requests
+          in flight, so there is less left for collections during requests.
+        * Records how long each collection pauses the process, by generation,
+          through gc.callbacks.
+
+    Pause times are recorded without taking any locks, as the collector can
+    run in any thread at any allocation, including in one holding a lock.
+    Collections never overlap, so only one callback runs at a time.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, freeze_after_warmup: bool = True, thresholds: Tuple[int, int, int] = None,
+                 idle_max_in_flight: int = 0,
+                 min_idle_collect_seconds: float = DEFAULT_MIN_IDLE_COLLECT_SECONDS):
+        """
+        Constructor
+
+        :param freeze_after_warmup: When True, everything alive after warmup
+                    is moved out of the collector's sight with gc.freeze().
+                    Default is True.
+        :param thresholds: An optional tuple of collection thresholds for
+                    gc.set_threshold() to set after warmup, like (50000, 50, 100).
+                    Default of None leaves the thresholds as they are.
+        :param idle_max_in_flight: The most requests in flight for the server
+                    to still count as idle. Default is 0.
+        :param min_idle_collect_seconds: Shortest time between a collection of
+                    the oldest generation and the next one done while idle.
+                    Default is 10 seconds.
+        """
+        self.freeze_after_warmup: bool = freeze_after_warmup
+        self.thresholds: Tuple[int, int, int] = thresholds
+        self.idle_max_in_flight: int = idle_max_in_flight
+        self.min_idle_collect_seconds: float = min_idle_collect_seconds
+
+        self._pauses: Dict[str, LatencyHistogram] = {str(generation): LatencyHistogram()
+                                                     for generation in range(FULL_GENERATION + 1)}
+        self._pauses[IDLE_PAUSES] = LatencyHistogram()
+        self._collected: int = 0
+        self._uncollectable: int = 0
+        self._pause_start: float = None
+        self._collecting_idle: bool = False
+        self._last_full_collection: float = time.monotonic()
+        self._frozen: int = 0
+        self._installed: bool = False
+
+    def install(self):
+        """
+        Starts recording collection pauses
+        """
+        if not self._installed:
+            gc.callbacks.append(self._on_collection)
+            self._installed = True
+
+    def uninstall(self):
+        """
+        Stops recording collection pauses
+        """
+        if self._installed:
+            gc.callbacks.remove(self._on_collection)
+            self._installed = False
+
+    def after_warmup(self):
+        """
+        Called once the server is warmed up, before it reports SERVING
+        """
+        if self.freeze_after_warmup:
+            # Get rid of startup garbage first so it is not frozen with the rest
+            self._collect_idle()
+            gc.freeze()
+            self._frozen = gc.get_freeze_count()
+        if self.thresholds is not None:
+            gc.set_threshold(*self.thresholds)
+
+    def maybe_collect(self, server_active: bool, num_in_flight: int) -> bool:
+        """
+        Collects the oldest generation if the server is idle and it has
+        been long enough since the last time it was collected.
+
+        :param server_active: What ServerLoopCallbacks.loop_callback() said
+        :param num_in_flight: The number of requests being processed
+        :return: True if a collection was done
+        """
+        if server_active or num_in_flight > self.idle_max_in_flight:
+            return False
+        if time.monotonic() - self._last_full_collection < self.min_idle_collect_seconds:
+            return False
+        self._collect_idle()
+        return True
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary of pause time summaries by generation collected,
+                and for collections done while idle, along with the number
+                of objects collected, found uncollectable and frozen
+        """
+        return {
+            "pauses": {name: histogram.get_summary() for name, histogram in self._pauses.items()},
+            "collected": self._collected,
+            "uncollectable": self._uncollectable,
+            "frozen": self._frozen,
+            "thresholds": list(gc.get_threshold())
+        }
+
+    def _collect_idle(self):
+        """
+        Collects the oldest generation, keeping its pause apart from the
+        pauses of collections that happen on their own
+        """
+        self._collecting_idle = True
+        try:
+            gc.collect(FULL_GENERATION)
+        finally:
+            self._collecting_idle = False
+
+    def _on_collection(self, phase: str, info: Dict[str, int]):
+        """
+        Called by the collector at the start and stop of every collection
+        """
+        if phase == "start":
+            self._pause_start = time.perf_counter()
+            return
+        if self._pause_start is None:
+            return
+
+        pause_seconds = time.perf_counter() - self._pause_start
+        self._pause_start = None
+        generation = info.get("generation", 0)
+        name = str(generation)
+        if self._collecting_idle:
+            name = IDLE_PAUSES
+        self._pauses[name].record(pause_seconds)
+        self._collected += info.get("collected", 0)
+        self._uncollectable += info.get("uncollectable", 0)
+        if generation == FULL_GENERATION:
+            self._last_full_collection = time.monotonic()
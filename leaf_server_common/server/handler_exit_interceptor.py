@@ -0,0 +1,135 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Callable
+from typing import List
+
+import threading
+
+import grpc
+
+from leaf_server_common.logging.request_logger_adapter import RequestLoggerAdapter
+
+
+class HandlerExitInterceptor(grpc.ServerInterceptor):
+    """
+    gRPC server interceptor which ServerLifetime puts closest to every
+    handler, so it can let go of the requests a handler started once the
+    handler returns or raises, whether or not it got to finish_request().
+
+    This is different from the RPC terminating, which happens as soon as
+    the client cancels or its deadline passes, while the handler can
+    still be running for a long time after.
+    """
+
+    def __init__(self, on_handler_exit: Callable[[RequestLoggerAdapter], None]):
+        """
+        Constructor
+
+        :param on_handler_exit: A function called on the handler thread with
+                    the RequestLoggerAdapter of each request started by a
+                    handler, once that handler is done
+        """
+        self.on_handler_exit: Callable[[RequestLoggerAdapter], None] = on_handler_exit
+
+        # The requests started by the handler running on each thread
+        self._local = threading.local()
+
+    def add_request(self, request_log: RequestLoggerAdapter):
+        """
+        Called on the handler thread when handling of a request starts.
+        Requests started outside of a handler wrapped by this interceptor
+        are left alone.
+
+        :param request_log: The RequestLoggerAdapter for the request
+        """
+        request_logs: List[RequestLoggerAdapter] = getattr(self._local, "request_logs", None)
+        if request_logs is not None:
+            request_logs.append(request_log)
+
+    def intercept_service(self, continuation, handler_call_details):
+        """
+        :param continuation: Function returning the next RpcMethodHandler
+        :param handler_call_details: Describes the method being called
+        :return: The RpcMethodHandler to use for the call
+        """
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(self._wrap(handler.unary_unary),
+                                                       request_deserializer=handler.request_deserializer,
+                                                       response_serializer=handler.response_serializer)
+        if handler.stream_unary is not None:
+            return grpc.stream_unary_rpc_method_handler(self._wrap(handler.stream_unary),
+                                                        request_deserializer=handler.request_deserializer,
+                                                        response_serializer=handler.response_serializer)
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(self._wrap_streaming(handler.unary_stream),
+                                                        request_deserializer=handler.request_deserializer,
+                                                        response_serializer=handler.response_serializer)
+        return grpc.stream_stream_rpc_method_handler(self._wrap_streaming(handler.stream_stream),
+                                                     request_deserializer=handler.request_deserializer,
+                                                     response_serializer=handler.response_serializer)
+
+    def _wrap(self, behavior):
+        """
+        :param behavior: A handler behavior returning a single response
+        :return: The behavior, letting go of its requests once it returns or raises
+        """
+        def wrapped_behavior(request, context):
+            outer_request_logs = self._enter()
+            try:
+                return behavior(request, context)
+            finally:
+                self._exit(outer_request_logs)
+
+        return wrapped_behavior
+
+    def _wrap_streaming(self, behavior):
+        """
+        :param behavior: A handler behavior returning an iterator of responses
+        :return: The behavior, letting go of its requests once the iterator
+                is exhausted, raises or is closed
+        """
+        def wrapped_behavior(request, context):
+            # gRPC iterates the responses of an RPC on a single thread
+            outer_request_logs = self._enter()
+            try:
+                yield from behavior(request, context)
+            finally:
+                self._exit(outer_request_logs)
+
+        return wrapped_behavior
+
+    def _enter(self) -> List[RequestLoggerAdapter]:
+        """
+        :return: The requests of any handler this one is called from,
+                as when SingleFlightInterceptor calls the real handler
+        """
+        outer_request_logs: List[RequestLoggerAdapter] = getattr(self._local, "request_logs", None)
+        self._local.request_logs = []
+        return outer_request_logs
+
+    def _exit(self, outer_request_logs: List[RequestLoggerAdapter]):
+        """
+        :param outer_request_logs: What _enter() returned
+        """
+        request_logs: List[RequestLoggerAdapter] = self._local.request_logs
+        self._local.request_logs = outer_request_logs
+        for request_log in request_logs:
+            self.on_handler_exit(request_log)
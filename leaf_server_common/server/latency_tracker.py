@@ -0,0 +1,127 @@
+
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Dict
+from typing import List
+
+import math
+import threading
+
+# Histogram buckets grow geometrically by this factor (4 buckets per doubling)
+# starting from this lower bound, which gives percentiles within ~20%
+# from 10 microseconds up to hours in ~120 buckets.
+_BUCKET_GROWTH = 2.0 ** 0.25
+_LOG_BUCKET_GROWTH = math.log(_BUCKET_GROWTH)
+_MIN_BUCKET_SECONDS = 0.00001
+_NUM_BUCKETS = 128
+
+# Percentiles reported in snapshots
+PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram():
+    """
+    Fixed-memory histogram of durations with geometrically sized buckets.
+    Not thread-safe on its own. See LatencyTracker.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.counts: List[int] = [0] * _NUM_BUCKETS
+        self.count: int = 0
+        self.total_seconds: float = 0.0
+        self.max_seconds: float = 0.0
+
+    def record(self, seconds: float):
+        """
+        :param seconds: A duration to add to the histogram
+        """
+        index = 0
+        if seconds > _MIN_BUCKET_SECONDS:
+            index = min(_NUM_BUCKETS - 1,
+                        1 + int(math.log(seconds / _MIN_BUCKET_SECONDS) / _LOG_BUCKET_GROWTH))
+        self.counts[index] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def get_percentile_seconds(self, percentile: float) -> float:
+        """
+        :param percentile: The percentile to report, between 0 and 100
+        :return: An upper bound on the given percentile of recorded durations
+        """
+        if self.count == 0:
+            return 0.0
+        threshold = math.ceil(self.count * percentile / 100.0)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= threshold:
+                upper_bound = _MIN_BUCKET_SECONDS * (_BUCKET_GROWTH ** index)
+                return min(upper_bound, self.max_seconds)
+        return self.max_seconds
+
+    def get_summary(self) -> Dict[str, float]:
+        """
+        :return: A dictionary summarizing the histogram, with times in milliseconds
+        """
+        summary: Dict[str, float] = {
+            "count": self.count,
+            "mean_ms": 0.0,
+            "max_ms": round(self.max_seconds * 1000.0, 3)
+        }
+        if self.count > 0:
+            summary["mean_ms"] = round(self.total_seconds * 1000.0 / self.count, 3)
+        for percentile in PERCENTILES:
+            summary[f"p{percentile}_ms"] = round(self.get_percentile_seconds(percentile) * 1000.0, 3)
+        return summary
+
+
+class LatencyTracker():
+    """
+    Thread-safe collection of named LatencyHistograms, for keeping track
+    of where time goes in a service without unbounded memory growth.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, name: str, seconds: float):
+        """
+        :param name: The name of the histogram to add the duration to
+        :param seconds: The duration to record
+        """
+        with self._lock:
+            histogram = self._histograms.get(name, None)
+            if histogram is None:
+                histogram = LatencyHistogram()
+                self._histograms[name] = histogram
+            histogram.record(seconds)
+
+    def get_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: A dictionary of histogram name to summary dictionary
+        """
+        with self._lock:
+            return {name: histogram.get_summary()
+                    for name, histogram in self._histograms.items()}
@@ -0,0 +1,272 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from collections import Counter
+from typing import Any
+from typing import Dict
+from typing import List
+
+import gc
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# Default number of frames kept for each traced allocation.
+# More frames tell allocation sites apart better, at more cost per allocation.
+DEFAULT_TRACE_FRAMES = 5
+
+# Default number of top growers reported for each comparison
+DEFAULT_TOP_GROWERS = 20
+
+# Allocations in these files say nothing about the service itself
+IGNORED_FILES = [
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+]
+
+
+class LeakDiagnostics():
+    """
+    Opt-in diagnostics for finding what grows between the request-limit
+    restarts of a ServerLifetime, so that leaks can be fixed and the
+    request limit raised or removed instead of paying for a cold start
+    every cycle.
+
+    tracemalloc is started when this is constructed. A snapshot of traced
+    memory and of the number of live objects by type is taken once warmup
+    is done, and again as the number of requests handled passes each
+    milestone. Each snapshot is compared with the one before it as it is
+    taken, keeping only the top growers by allocation site, so that at most
+    the baseline and the latest snapshot are held in memory.
+
+    A last snapshot is taken when the server shuts down, and write_report()
+    puts everything in a single JSON report: the growth in each interval,
+    the growth from the baseline to the end with the amount per request,
+    and how many intervals each top allocation site grew in. Sites that
+    grow in every interval are the likeliest leaks. Caches filling up
+    tend to grow early and then level off.
+
+    Tracing every allocation slows the service down noticeably,
+    so this is for diagnosing, not for leaving on.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments,too-many-positional-arguments
+    def __init__(self, milestones: List[int], output_dir: str = None, logger: logging.Logger = None,
+                 trace_frames: int = DEFAULT_TRACE_FRAMES, top_growers: int = DEFAULT_TOP_GROWERS):
+        """
+        Constructor
+
+        :param milestones: The numbers of requests handled at which to take
+                    snapshots after the one taken after warmup
+        :param output_dir: The directory the report is written to.
+                    Default of None means the system temporary directory.
+        :param logger: The logger to report to.
+                    Default of None means a logger for this module.
+        :param trace_frames: The number of frames kept for each traced allocation
+        :param top_growers: The number of allocation sites and object types
+                    reported for each comparison
+        """
+        self.milestones: List[int] = sorted(set(milestones))
+        self.output_dir: str = output_dir
+        if self.output_dir is None:
+            self.output_dir = tempfile.gettempdir()
+        self.logger: logging.Logger = logger
+        if self.logger is None:
+            self.logger = logging.getLogger(__name__)
+        self.trace_frames: int = trace_frames
+        self.top_growers: int = top_growers
+
+        self._lock = threading.Lock()
+        self._baseline: Dict[str, Any] = None
+        self._previous: Dict[str, Any] = None
+        self._next_milestone: int = 0
+        self._snapshots: List[Dict[str, Any]] = []
+        self._intervals: List[Dict[str, Any]] = []
+        self._grew_in: Counter = Counter()
+
+        # Tracing only sees allocations made after this
+        self._started_tracing: bool = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(self.trace_frames)
+
+    def check(self, num_requests: int) -> bool:
+        """
+        Takes a snapshot if the number of requests has passed the next milestone.
+        Meant to be called every so often from a periodic task.
+
+        :param num_requests: The number of requests handled so far
+        :return: True if a snapshot was taken
+        """
+        if self._baseline is None or self._next_milestone >= len(self.milestones) \
+                or num_requests < self.milestones[self._next_milestone]:
+            return False
+        # Passing more than one milestone since the last check only counts once
+        while self._next_milestone < len(self.milestones) \
+                and num_requests >= self.milestones[self._next_milestone]:
+            self._next_milestone += 1
+        self.take_snapshot(f"requests_{num_requests}", num_requests)
+        return True
+
+    def take_snapshot(self, name: str, num_requests: int):
+        """
+        Takes a snapshot and compares it with the one before it.
+        The first snapshot taken is the baseline.
+
+        :param name: The name of the snapshot in the report
+        :param num_requests: The number of requests handled so far
+        """
+        if not tracemalloc.is_tracing():
+            return
+
+        start_time = time.monotonic()
+        snapshot = {
+            "name": name,
+            "requests": num_requests,
+            "memory": tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, file_name) for file_name in IGNORED_FILES]),
+            "objects": self._count_objects()
+        }
+        traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+
+        with self._lock:
+            self._snapshots.append({
+                "name": name,
+                "requests": num_requests,
+                "time": time.time(),
+                "traced_bytes": traced_bytes,
+                "peak_traced_bytes": peak_bytes,
+                "objects": sum(snapshot["objects"].values())
+            })
+            if self._baseline is None:
+                self._baseline = snapshot
+            else:
+                interval = self._compare(self._previous, snapshot)
+                self._intervals.append(interval)
+                self._grew_in.update({grower["site"] for grower in interval["allocation_sites"]})
+            self._previous = snapshot
+
+        self.logger.info("Leak diagnostics snapshot %s at %d requests took %.3f seconds",
+                         name, num_requests, time.monotonic() - start_time)
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary with every snapshot taken, the growth in each
+                interval between snapshots, and the overall growth from the
+                baseline to the latest snapshot
+        """
+        with self._lock:
+            report = {
+                "pid": os.getpid(),
+                "snapshots": list(self._snapshots),
+                "intervals": list(self._intervals),
+                "overall": None
+            }
+            if self._baseline is not None and self._previous is not self._baseline:
+                overall = self._compare(self._baseline, self._previous)
+                for grower in overall["allocation_sites"]:
+                    grower["grew_in_intervals"] = self._grew_in.get(grower["site"], 0)
+                report["overall"] = overall
+        return report
+
+    def write_report(self, name: str = "shutdown", num_requests: int = None) -> str:
+        """
+        Takes a last snapshot, writes the report and stops tracing.
+        Called when the server is shutting down.
+
+        :param name: The name of the last snapshot
+        :param num_requests: The number of requests handled so far.
+                    Default of None means no last snapshot is taken.
+        :return: The name of the file the report was written to,
+                or None if there was nothing to report
+        """
+        if num_requests is not None:
+            self.take_snapshot(name, num_requests)
+        if self._started_tracing:
+            tracemalloc.stop()
+
+        report = self.get_report()
+        overall: Dict[str, Any] = report.get("overall")
+        if overall is None:
+            self.logger.info("Leak diagnostics has nothing to compare")
+            return None
+
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        file_name = os.path.join(self.output_dir, f"leaks-{os.getpid()}-{timestamp}.json")
+        try:
+            with open(file_name, "w", encoding="utf-8") as report_file:
+                json.dump(report, report_file, indent=4)
+        except OSError as exception:
+            self.logger.error("Could not write leak report %s: %s", file_name, str(exception))
+            file_name = None
+
+        top_sites = [grower["site"] for grower in overall["allocation_sites"][:3]]
+        self.logger.info("Leak report %s: %d bytes and %d objects more over %d requests. Top growers %s",
+                         file_name, overall["size_diff"], overall["objects_diff"],
+                         overall["requests"], str(top_sites))
+        return file_name
+
+    def _compare(self, before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :return: A dictionary with the top growing allocation sites and
+                object types between two snapshots
+        """
+        stats = after["memory"].compare_to(before["memory"], "traceback")
+        growers = sorted((stat for stat in stats if stat.size_diff > 0),
+                         key=lambda stat: stat.size_diff, reverse=True)[:self.top_growers]
+
+        object_diffs = Counter(after["objects"])
+        object_diffs.subtract(before["objects"])
+        object_growers = [(type_name, diff) for type_name, diff in object_diffs.most_common(self.top_growers)
+                          if diff > 0]
+
+        num_requests = max(1, after["requests"] - before["requests"])
+        size_diff = sum(stat.size_diff for stat in stats)
+        return {
+            "from": before["name"],
+            "to": after["name"],
+            "requests": after["requests"] - before["requests"],
+            "size_diff": size_diff,
+            "bytes_per_request": round(size_diff / num_requests, 1),
+            "objects_diff": sum(after["objects"].values()) - sum(before["objects"].values()),
+            "allocation_sites": [{
+                # The most recent frame is the allocation itself
+                "site": f"{stat.traceback[-1].filename}:{stat.traceback[-1].lineno}",
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size": stat.size,
+                "count": stat.count,
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+            } for stat in growers],
+            "object_types": [{"type": type_name, "count_diff": diff} for type_name, diff in object_growers]
+        }
+
+    @staticmethod
+    def _count_objects() -> Counter:
+        """
+        :return: A Counter of the number of objects tracked by the garbage
+                collector by the module-qualified name of their type
+        """
+        counts = Counter()
+        for obj in gc.get_objects():
+            obj_type = type(obj)
+            counts[f"{obj_type.__module__}.{obj_type.__qualname__}"] += 1
+        return counts
@@ -0,0 +1,281 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import struct
+
+import grpc
+
+# Protobuf wire types
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+FIXED32 = 5
+
+# Values of 64-bit varints at or above this are negative numbers
+_INT64_SIGN = 1 << 63
+_UINT64_RANGE = 1 << 64
+
+
+class WireMessage():
+    """
+    Lazy read-only view of a serialized protobuf message that pulls out
+    just the fields asked for, without generated code or deserializing
+    the whole message.
+
+    The first time a field is asked for, the top level of the message is
+    scanned once, noting where each field is. Length-delimited fields,
+    like strings and sub-messages, are skipped over rather than looked
+    inside, so the scan costs little even for large messages. Sub-messages
+    from get_message() are WireMessages over the same bytes.
+
+    Fields are asked for by field number, as in the .proto file. As for
+    parsed messages, when a field appears more than once the last one wins,
+    and missing fields get the default. Packed repeated fields and groups
+    are not supported.
+    """
+
+    def __init__(self, data):
+        """
+        Constructor
+
+        :param data: The bytes-like serialized message
+        """
+        self.data = data
+        # Maps field number -> list of (wire type, start, end) for each
+        # appearance. For varints start is the value itself.
+        self._fields: Dict[int, List[Tuple[int, int, int]]] = None
+
+    def has(self, field_number: int) -> bool:
+        """
+        :param field_number: The field number
+        :return: True if the field is in the message
+        """
+        return self._find(field_number) is not None
+
+    def get_int(self, field_number: int, default: int = 0) -> int:
+        """
+        :param field_number: The number of an int32, int64, uint32, uint64 or enum field
+        :param default: The value if the field is not in the message
+        :return: The value of the field. Values of uint64 fields over
+                2^63 come out negative.
+        """
+        found = self._find(field_number, VARINT)
+        if found is None:
+            return default
+        value = found[1]
+        if value >= _INT64_SIGN:
+            value -= _UINT64_RANGE
+        return value
+
+    def get_bool(self, field_number: int, default: bool = False) -> bool:
+        """
+        :param field_number: The number of a bool field
+        :param default: The value if the field is not in the message
+        :return: The value of the field
+        """
+        found = self._find(field_number, VARINT)
+        if found is None:
+            return default
+        return found[1] != 0
+
+    def get_double(self, field_number: int, default: float = 0.0) -> float:
+        """
+        :param field_number: The number of a double field
+        :param default: The value if the field is not in the message
+        :return: The value of the field
+        """
+        found = self._find(field_number, FIXED64)
+        if found is None:
+            return default
+        return struct.unpack_from("<d", self.data, found[1])[0]
+
+    def get_float(self, field_number: int, default: float = 0.0) -> float:
+        """
+        :param field_number: The number of a float field
+        :param default: The value if the field is not in the message
+        :return: The value of the field
+        """
+        found = self._find(field_number, FIXED32)
+        if found is None:
+            return default
+        return struct.unpack_from("<f", self.data, found[1])[0]
+
+    def get_bytes(self, field_number: int, default: bytes = b"") -> bytes:
+        """
+        :param field_number: The number of a bytes field
+        :param default: The value if the field is not in the message
+        :return: A copy of the value of the field
+        """
+        found = self._find(field_number, LENGTH_DELIMITED)
+        if found is None:
+            return default
+        return bytes(memoryview(self.data)[found[1]:found[2]])
+
+    def get_string(self, field_number: int, default: str = "") -> str:
+        """
+        :param field_number: The number of a string field
+        :param default: The value if the field is not in the message
+        :return: The value of the field
+        """
+        found = self._find(field_number, LENGTH_DELIMITED)
+        if found is None:
+            return default
+        return str(memoryview(self.data)[found[1]:found[2]], "utf-8")
+
+    def get_message(self, field_number: int) -> "WireMessage":
+        """
+        :param field_number: The number of a message field
+        :return: A WireMessage over the sub-message, sharing these bytes,
+                or None if the field is not in the message
+        """
+        found = self._find(field_number, LENGTH_DELIMITED)
+        if found is None:
+            return None
+        return WireMessage(memoryview(self.data)[found[1]:found[2]])
+
+    def _find(self, field_number: int, wire_type: int = None) -> Tuple[int, int, int]:
+        """
+        :param field_number: The field number
+        :param wire_type: The wire type the field should have, if any
+        :return: The (wire type, start, end) of the last appearance of
+                the field, or None if it is not in the message
+        """
+        if self._fields is None:
+            self._fields = self._scan()
+        appearances = self._fields.get(field_number)
+        if not appearances:
+            return None
+        found = appearances[-1]
+        if wire_type is not None and found[0] != wire_type:
+            raise ValueError(f"Field {field_number} has wire type {found[0]}, not {wire_type}")
+        return found
+
+    def _scan(self) -> Dict[int, List[Tuple[int, int, int]]]:
+        """
+        :return: Where each top-level field is in the message
+        """
+        data = self.data
+        if not isinstance(data, (bytes, bytearray)):
+            data = memoryview(data).cast("B")
+        fields: Dict[int, List[Tuple[int, int, int]]] = {}
+        position = 0
+        size = len(data)
+        while position < size:
+            key, position = read_varint(data, position)
+            field_number = key >> 3
+            wire_type = key & 0x07
+            if wire_type == VARINT:
+                value, position = read_varint(data, position)
+                found = (wire_type, value, None)
+            elif wire_type == LENGTH_DELIMITED:
+                length, position = read_varint(data, position)
+                found = (wire_type, position, position + length)
+                position += length
+            elif wire_type == FIXED64:
+                found = (wire_type, position, position + 8)
+                position += 8
+            elif wire_type == FIXED32:
+                found = (wire_type, position, position + 4)
+                position += 4
+            else:
+                raise ValueError(f"Unsupported wire type {wire_type} for field {field_number}")
+            if position > size:
+                raise ValueError(f"Message is cut off in field {field_number}")
+            fields.setdefault(field_number, []).append(found)
+        return fields
+
+
+def read_varint(data, position: int) -> Tuple[int, int]:
+    """
+    :param data: The bytes-like data to read from
+    :param position: Where the varint starts
+    :return: A tuple of the value and the position just past the varint
+    """
+    value = 0
+    shift = 0
+    size = len(data)
+    while True:
+        if position >= size or shift > 63:
+            raise ValueError("Malformed varint")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def passthrough_generic_handler(lifetime, service_name: str,
+                                behaviors: Dict[str, Callable[[WireMessage, Any, Any], bytes]],
+                                logging_fields: Dict[str, int] = None) -> grpc.GenericRpcHandler:
+    """
+    Makes a handler for unary methods that take and return serialized
+    messages as they are, for routers and proxies that relay payloads
+    downstream and only look at a few headers or fields. Nothing is
+    deserialized or serialized unless the behavior asks for it.
+
+    Each request still goes through start_request() and finish_request()
+    of the ServerLifetime, with the method name as the caller and the
+    peer as the requestor, so it is counted, limited, logged and drained
+    like any other.
+
+    A relay can send request.data downstream on a channel.unary_unary()
+    made without serializers and return the response bytes as they come.
+
+    :param lifetime: The ServerLifetime handling the requests
+    :param service_name: The full name of the service, like "package.Service"
+    :param behaviors: A dictionary of method name to a function taking the
+                request as a WireMessage, the grpc.ServicerContext and the
+                RequestLoggerAdapter from start_request(), and returning
+                the serialized response
+    :param logging_fields: An optional dictionary of structured logging field
+                name to the number of a top-level string field of the request
+                to take it from when it is not in the request metadata,
+                like {"request_id": 1}
+    :return: A handler to add to the grpc server with add_generic_rpc_handlers()
+    """
+
+    def wrap(method_name: str, behavior: Callable[[WireMessage, Any, Any], bytes]):
+
+        def passthrough_behavior(request_bytes: bytes, context) -> bytes:
+            request = WireMessage(request_bytes)
+            service_logging_dict = None
+            if logging_fields:
+                try:
+                    service_logging_dict = {name: request.get_string(field_number)
+                                            for name, field_number in logging_fields.items()
+                                            if request.has(field_number)}
+                except (ValueError, UnicodeDecodeError) as exception:
+                    context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Malformed request: {exception}")
+
+            request_log = lifetime.start_request(method_name, context.peer(), context,
+                                                 service_logging_dict=service_logging_dict)
+            try:
+                return behavior(request, context, request_log)
+            finally:
+                lifetime.finish_request(method_name, context.peer(), request_log)
+
+        return passthrough_behavior
+
+    handlers = {method_name: grpc.unary_unary_rpc_method_handler(wrap(method_name, behavior))
+                for method_name, behavior in behaviors.items()}
+    return grpc.method_handlers_generic_handler(service_name, handlers)
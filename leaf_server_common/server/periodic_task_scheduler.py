@@ -0,0 +1,292 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import logging
+import random
+import threading
+import time
+
+from leaf_server_common.server.latency_tracker import LatencyTracker
+
+# Longest the scheduler thread sleeps before looking at its tasks again.
+# Bounds how late timeouts are noticed.
+MAX_SCHEDULER_SLEEP_SECONDS = 1.0
+
+
+# pylint: disable=too-few-public-methods
+class PeriodicTask():
+    """
+    A function to be called every so often by a PeriodicTaskScheduler,
+    along with counts of how its runs have gone.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self, name: str, function: Callable[[], Any], interval_seconds: float,
+                 jitter_fraction: float = 0.1, timeout_seconds: float = None,
+                 run_immediately: bool = False, fixed_delay: bool = False):
+        """
+        Constructor
+
+        :param name: The name of the task for metrics and logs
+        :param function: The function to call, taking no arguments.
+                    Long-running functions can check the stopping Event
+                    of the scheduler to find out when to give up early.
+        :param interval_seconds: Time between the start of one run and the next.
+                    This can be changed between runs, even by the function itself.
+        :param jitter_fraction: Fraction of the interval by which the actual
+                    time between runs is randomized either way, so that replicas
+                    started at the same time spread their work out. Default is 0.1.
+        :param timeout_seconds: Runs taking longer than this are reported.
+                    Default of None means runs are never considered late.
+        :param run_immediately: When True, the first run happens as soon as the
+                    scheduler starts. Default is False, meaning the first run
+                    happens after one interval.
+        :param fixed_delay: When True, each run is scheduled one interval after
+                    the previous one finishes, so runs taking longer than the
+                    interval are never overruns. Default is False, meaning
+                    one interval after the previous one started.
+        """
+        self.name: str = name
+        self.function: Callable[[], Any] = function
+        self.interval_seconds: float = interval_seconds
+        self.jitter_fraction: float = jitter_fraction
+        self.timeout_seconds: float = timeout_seconds
+        self.run_immediately: bool = run_immediately
+        self.fixed_delay: bool = fixed_delay
+
+        # Scheduling state. Only touched with the scheduler lock held.
+        self.next_run_time: float = None
+        self.future: futures.Future = None
+        self.run_start_time: float = None
+        self.run_interval_seconds: float = None
+        self.timed_out: bool = False
+
+        self.counts: Dict[str, int] = {
+            "runs": 0,
+            "failures": 0,
+            "overruns": 0,
+            "timeouts": 0
+        }
+
+    def get_next_interval_seconds(self) -> float:
+        """
+        :return: The jittered time until the next run
+        """
+        jitter = self.interval_seconds * self.jitter_fraction * random.uniform(-1.0, 1.0)
+        return max(0.0, self.interval_seconds + jitter)
+
+
+class PeriodicTaskScheduler():
+    """
+    Runs any number of PeriodicTasks, each on its own schedule,
+    on a small dedicated pool of threads.
+
+    * A task that is still running when its next run comes due is not
+      started again. The skipped run is counted as an overrun.
+      Fixed-delay tasks only come due once their last run is done.
+    * A run going on longer than the task's timeout is counted and logged once.
+      Python threads cannot be killed, so the run is left to finish.
+    * On stop(), no further runs are started and runs that have not started
+      yet are cancelled. Running tasks are given a chance to finish.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, max_workers: int = 2, logger: logging.Logger = None,
+                 thread_name_prefix: str = "periodic-task"):
+        """
+        Constructor
+
+        :param max_workers: The number of threads running tasks. Default is 2.
+        :param logger: The logger to report problems to.
+                    Default of None means a logger for this module.
+        :param thread_name_prefix: Prefix for the names of the threads
+        """
+        self.max_workers: int = max_workers
+        self.logger: logging.Logger = logger
+        if self.logger is None:
+            self.logger = logging.getLogger(__name__)
+        self.thread_name_prefix: str = thread_name_prefix
+
+        # Set when the scheduler is stopping. Tasks can check this.
+        self.stopping = threading.Event()
+
+        self.latency = LatencyTracker()
+        self._tasks: List[PeriodicTask] = []
+        self._condition = threading.Condition()
+        self._pool: futures.ThreadPoolExecutor = None
+        self._thread: threading.Thread = None
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def schedule(self, name: str, function: Callable[[], Any], interval_seconds: float,
+                 jitter_fraction: float = 0.1, timeout_seconds: float = None,
+                 run_immediately: bool = False, fixed_delay: bool = False) -> PeriodicTask:
+        """
+        Convenience method to create and add a PeriodicTask.
+        See the PeriodicTask constructor for arguments.
+
+        :return: The new PeriodicTask
+        """
+        task = PeriodicTask(name, function, interval_seconds,
+                            jitter_fraction=jitter_fraction,
+                            timeout_seconds=timeout_seconds,
+                            run_immediately=run_immediately,
+                            fixed_delay=fixed_delay)
+        self.add_task(task)
+        return task
+
+    def add_task(self, task: PeriodicTask):
+        """
+        Adds a task. Can be called before or after start().
+
+        :param task: The PeriodicTask to add
+        """
+        with self._condition:
+            task.next_run_time = time.monotonic()
+            if not task.run_immediately:
+                task.next_run_time += task.get_next_interval_seconds()
+            self._tasks.append(task)
+            self._condition.notify()
+
+    def start(self):
+        """
+        Starts running the tasks
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._pool = futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=self.thread_name_prefix)
+            self._thread = threading.Thread(target=self._schedule_runs, daemon=True,
+                                            name=f"{self.thread_name_prefix}-scheduler")
+            self._thread.start()
+
+    def stop(self, timeout_seconds: float = 5.0) -> bool:
+        """
+        Stops starting new runs and waits a while for current ones to finish.
+
+        :param timeout_seconds: The longest time to wait for running tasks
+        :return: True if no task was still running when this returned
+        """
+        with self._condition:
+            self.stopping.set()
+            self._condition.notify()
+            running = {task.future: task.name for task in self._tasks if task.future is not None}
+
+        if self._thread is not None:
+            self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+        _, not_done = futures.wait(running, timeout=timeout_seconds)
+        for future in not_done:
+            self.logger.warning("Periodic task %s still running at shutdown", running.get(future))
+        return len(not_done) == 0
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: A dictionary of task name to counts of runs, failures,
+                overruns and timeouts, merged with a summary of run durations
+        """
+        durations = self.latency.get_snapshot()
+        metrics = {}
+        with self._condition:
+            for task in self._tasks:
+                task_metrics = dict(task.counts)
+                task_metrics.update(durations.get(task.name, {}))
+                metrics[task.name] = task_metrics
+        return metrics
+
+    def _schedule_runs(self):
+        """
+        Main loop of the scheduler thread
+        """
+        with self._condition:
+            while not self.stopping.is_set():
+                now = time.monotonic()
+                next_wake = now + MAX_SCHEDULER_SLEEP_SECONDS
+                for task in self._tasks:
+                    self._check_timeout(task, now)
+                    if now >= task.next_run_time:
+                        self._start_run(task, now)
+                    next_wake = min(next_wake, task.next_run_time)
+                self._condition.wait(max(0.0, next_wake - time.monotonic()))
+
+    def _start_run(self, task: PeriodicTask, now: float):
+        """
+        Starts a run of the task if the last one is done.
+        Called with the lock held.
+        """
+        if task.fixed_delay:
+            # Scheduled when this run finishes
+            task.next_run_time = float("inf")
+        else:
+            task.next_run_time = now + task.get_next_interval_seconds()
+        if task.future is not None:
+            task.counts["overruns"] += 1
+            self.logger.warning("Periodic task %s still running after %.3f seconds. Skipping a run.",
+                                task.name, now - task.run_start_time)
+            return
+
+        task.run_start_time = now
+        task.run_interval_seconds = task.interval_seconds
+        task.timed_out = False
+        task.future = self._pool.submit(self._run, task)
+
+    def _check_timeout(self, task: PeriodicTask, now: float):
+        """
+        Reports a run of the task going on too long, once per run.
+        Called with the lock held.
+        """
+        if task.future is None or task.timeout_seconds is None or task.timed_out:
+            return
+        if now - task.run_start_time > task.timeout_seconds:
+            task.timed_out = True
+            task.counts["timeouts"] += 1
+            self.logger.warning("Periodic task %s has been running over its %.3f second timeout",
+                                task.name, task.timeout_seconds)
+
+    def _run(self, task: PeriodicTask):
+        """
+        Runs the task once on a pool thread
+        """
+        start_time = time.monotonic()
+        failed = False
+        try:
+            task.function()
+        except Exception:      # pylint: disable=broad-exception-caught
+            failed = True
+            self.logger.exception("Periodic task %s failed", task.name)
+
+        duration = time.monotonic() - start_time
+        self.latency.record(task.name, duration)
+        with self._condition:
+            task.counts["runs"] += 1
+            if failed:
+                task.counts["failures"] += 1
+            task.future = None
+            if task.fixed_delay:
+                task.next_run_time = time.monotonic() + task.get_next_interval_seconds()
+            # The interval may have changed during the run
+            elif task.interval_seconds != task.run_interval_seconds:
+                task.next_run_time = start_time + task.get_next_interval_seconds()
+            self._condition.notify()
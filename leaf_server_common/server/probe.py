@@ -18,8 +18,6 @@
 import json
 import logging
 
-from google.protobuf.json_format import MessageToDict
-
 
 # pylint: disable=too-few-public-methods
 class Probe():
@@ -37,6 +35,8 @@ class Probe():
         if myobj is not None:
             obj_dict = myobj
             if hasattr(myobj, 'DESCRIPTOR'):
+                # pylint: disable=import-outside-toplevel
+                from google.protobuf.json_format import MessageToDict
                 obj_dict = MessageToDict(myobj)
 
         json_dict = None
@@ -0,0 +1,387 @@
+
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from multiprocessing import shared_memory
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+import importlib
+import logging
+import logging.config
+import multiprocessing
+import threading
+import time
+
+from leaf_server_common.logging.service_log_record import ServiceLogRecord
+from leaf_server_common.logging.structured_log_record import StructuredLogRecord
+from leaf_server_common.server.atomic_counter import AtomicCounter
+
+# Maximum number of offloaded tasks that can have a cancellation flag at once
+DEFAULT_MAX_CANCELLABLE = 1024
+
+# Set in each worker process by _init_worker()
+_WORKER_CANCEL_FLAGS = None
+_WORKER_LOCAL = threading.local()
+
+
+def _init_worker(cancel_flags, default_logging_fields: Dict[str, str],
+                 logging_config: Dict[str, Any], preload_modules: Sequence[str]):
+    """
+    Initializer run once in each worker process when it starts.
+    """
+    # pylint: disable=global-statement
+    global _WORKER_CANCEL_FLAGS
+    _WORKER_CANCEL_FLAGS = cancel_flags
+
+    if logging_config is not None:
+        logging.config.dictConfig(logging_config)
+    StructuredLogRecord.set_up_record_factory()
+    ServiceLogRecord.set_up_record_factory(default_logging_fields)
+
+    # Pay for expensive imports up front, not on the first request
+    for module_name in preload_modules:
+        importlib.import_module(module_name)
+
+
+def _warm_up(seconds: float) -> int:
+    """
+    Keeps a worker busy long enough that every worker process gets started.
+    """
+    time.sleep(seconds)
+    return multiprocessing.current_process().pid
+
+
+def _run_offloaded(fn: Callable, logging_fields: Dict[str, str], cancel_slot: int, args, kwargs):
+    """
+    Runs in a worker process with the logging context and cancellation
+    flag of the request that offloaded the work.
+    """
+    ServiceLogRecord(logging_fields)
+    _WORKER_LOCAL.cancel_slot = cancel_slot
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _WORKER_LOCAL.cancel_slot = -1
+
+
+def is_offload_cancelled() -> bool:
+    """
+    Called by offloaded functions running in a worker process
+    to cooperatively check whether they should stop early.
+
+    :return: True if the request that offloaded the currently running
+            work has been cancelled by its client or has ended.
+    """
+    cancel_slot = getattr(_WORKER_LOCAL, "cancel_slot", -1)
+    if _WORKER_CANCEL_FLAGS is None or cancel_slot < 0:
+        return False
+    return bool(_WORKER_CANCEL_FLAGS[cancel_slot])
+
+
+class SharedArray():
+    """
+    A numeric array or byte buffer in shared memory which can be handed to
+    offloaded work in a worker process without the payload being pickled.
+    Only the name and layout of the shared memory are pickled.
+
+    The process that creates a SharedArray owns it and should release() it
+    when the work is done. Worker processes only attach to it.
+    """
+
+    def __init__(self, nbytes: int, shape: Sequence[int] = None, dtype: str = None):
+        """
+        Constructor. Allocates new, zeroed shared memory.
+        See also from_buffer().
+
+        :param nbytes: The size of the buffer in bytes
+        :param shape: The shape of the array, when it is a numpy array.
+                    Default of None means the buffer is raw bytes.
+        :param dtype: The numpy dtype string (e.g. "<f8") of the array.
+                    Default of None means the buffer is raw bytes.
+        """
+        self.nbytes: int = int(nbytes)
+        self.shape = None if shape is None else tuple(shape)
+        self.dtype: str = dtype
+        # Zero-sized shared memory is not allowed
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=max(1, self.nbytes))
+        self._owner: bool = True
+
+    @classmethod
+    def from_buffer(cls, buffer) -> "SharedArray":
+        """
+        :param buffer: A numpy array or any other object supporting the
+                    buffer protocol (bytes, bytearray, memoryview, array.array)
+        :return: A new SharedArray holding a copy of the buffer's contents.
+                This is the one and only copy made of the payload.
+        """
+        shape = None
+        dtype = None
+        if hasattr(buffer, "dtype") and hasattr(buffer, "shape"):
+            # numpy array, without requiring numpy here
+            shape = buffer.shape
+            dtype = buffer.dtype.str
+        view = memoryview(buffer).cast("B")
+        shared = cls(view.nbytes, shape=shape, dtype=dtype)
+        shared.shared_memory.buf[:view.nbytes] = view
+        return shared
+
+    def as_array(self):
+        """
+        :return: A view of the shared memory, without copying.
+                A numpy array if this was created from one,
+                otherwise a memoryview of bytes.
+        """
+        view = self.shared_memory.buf[:self.nbytes]
+        if self.dtype is None:
+            return view
+
+        # Only import numpy when there is a numpy array
+        # pylint: disable=import-outside-toplevel,import-error
+        import numpy
+        return numpy.ndarray(self.shape, dtype=numpy.dtype(self.dtype), buffer=view)
+
+    def to_bytes(self) -> bytes:
+        """
+        :return: A copy of the contents as bytes
+        """
+        return bytes(self.shared_memory.buf[:self.nbytes])
+
+    def release(self):
+        """
+        Called by the owner to free the shared memory once no process needs it.
+        Any views returned by as_array() must no longer be in use.
+        """
+        self.shared_memory.close()
+        if self._owner:
+            self.shared_memory.unlink()
+
+    def __getstate__(self):
+        return {
+            "name": self.shared_memory.name,
+            "nbytes": self.nbytes,
+            "shape": self.shape,
+            "dtype": self.dtype
+        }
+
+    def __setstate__(self, state):
+        self.nbytes = state.get("nbytes")
+        self.shape = state.get("shape")
+        self.dtype = state.get("dtype")
+        self.shared_memory = shared_memory.SharedMemory(name=state.get("name"))
+        self._owner = False
+
+
+class ProcessOffloader():
+    """
+    Offloads CPU-heavy parts of request handling to a pool of pre-warmed
+    worker processes, so they neither tie up a gRPC worker thread's share
+    of the GIL nor block other requests.
+
+    * Large numeric payloads can be passed as SharedArrays instead of being
+      pickled.
+    * The ServiceLogRecord logging context of the request is carried over,
+      so log messages from the worker have the request's structured fields.
+    * When given the gRPC context, work not yet started is cancelled when the
+      RPC is cancelled, and work already running can check
+      is_offload_cancelled() to stop early.
+    * Offloaded work in flight is counted in an AtomicCounter, which
+      ServerLifetime includes in NumProcessing when draining.
+
+    Offloaded functions and their arguments must be picklable,
+    so functions need to be defined at module level.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments,too-many-positional-arguments
+    def __init__(self, max_workers: int = None,
+                 in_flight_counter: AtomicCounter = None,
+                 start_method: str = "spawn",
+                 logging_config: Dict[str, Any] = None,
+                 preload_modules: Sequence[str] = None,
+                 prewarm: bool = True,
+                 max_cancellable: int = DEFAULT_MAX_CANCELLABLE):
+        """
+        Constructor
+
+        :param max_workers: The number of worker processes.
+                    Default of None means the number of CPUs.
+        :param in_flight_counter: An AtomicCounter to keep the number of
+                    offloaded tasks in flight in. Default of None means
+                    this offloader keeps its own.
+        :param start_method: The multiprocessing start method. Default is "spawn",
+                    as forking a process with running gRPC threads is unsafe.
+        :param logging_config: An optional logging dictConfig to set up in
+                    each worker process. Default of None means worker processes
+                    use default Python logging.
+        :param preload_modules: Names of modules to import in each worker process
+                    when it starts.
+        :param prewarm: When True (the default), start all worker processes
+                    right away instead of on first use.
+        :param max_cancellable: Maximum number of tasks in flight that can
+                    be cooperatively cancelled at once.
+        """
+        self.in_flight = in_flight_counter
+        if self.in_flight is None:
+            self.in_flight = AtomicCounter()
+
+        mp_context = multiprocessing.get_context(start_method)
+        self._cancel_flags = mp_context.Array("b", max_cancellable, lock=False)
+        self._free_slots: List[int] = list(range(max_cancellable - 1, -1, -1))
+        # Bumped each time a slot is released, so that a late cancel()
+        # of one task cannot set the flag of the next task to use the slot
+        self._slot_generations: List[int] = [0] * max_cancellable
+        self._slot_lock = threading.Lock()
+
+        if preload_modules is None:
+            preload_modules = []
+        default_logging_fields = ServiceLogRecord.get_default_extra_logging_fields()
+
+        self.executor = futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self._cancel_flags, default_logging_fields,
+                      logging_config, list(preload_modules)))
+        # pylint: disable=protected-access
+        self.max_workers: int = self.executor._max_workers
+
+        if prewarm:
+            self.prewarm()
+
+    def prewarm(self, seconds: float = 0.2):
+        """
+        Start all worker processes now, so that the first requests do not pay
+        for process startup and module imports.
+
+        :param seconds: Time each warm-up task keeps its worker busy, which
+                    needs to be long enough for all workers to get started.
+        """
+        warm_ups = [self.executor.submit(_warm_up, seconds) for _ in range(self.max_workers)]
+        futures.wait(warm_ups)
+
+    def submit(self, fn: Callable, *args, context=None, **kwargs) -> futures.Future:
+        """
+        Submit work to a worker process.
+
+        :param fn: A picklable, module-level function
+        :param args: Positional arguments to the function
+        :param context: The optional grpc.ServicerContext of the request
+                    on behalf of which the work is done. When given,
+                    the work is cancelled along with the RPC.
+        :param kwargs: Keyword arguments to the function
+        :return: A Future for the result of the function
+        """
+        cancel_slot, generation = self._acquire_slot()
+        logging_fields = ServiceLogRecord.get_current_logging_fields()
+
+        self.in_flight.increment()
+        try:
+            future = self.executor.submit(_run_offloaded, fn, logging_fields, cancel_slot, args, kwargs)
+        except BaseException:
+            self.in_flight.decrement()
+            self._release_slot(cancel_slot)
+            raise
+
+        def done(_future):
+            self.in_flight.decrement()
+            self._release_slot(cancel_slot)
+
+        future.add_done_callback(done)
+
+        if context is not None:
+            def cancel():
+                # The RPC is over. If the work is still around,
+                # the result is no longer of any use to anyone.
+                if not future.done():
+                    self._set_cancel_flag(cancel_slot, generation)
+                    future.cancel()
+
+            if not context.add_callback(cancel):
+                # RPC already terminated
+                cancel()
+
+        return future
+
+    def run(self, fn: Callable, *args, context=None, timeout: float = None, **kwargs) -> Any:
+        """
+        Run work in a worker process and wait for its result.
+
+        :param fn: A picklable, module-level function
+        :param args: Positional arguments to the function
+        :param context: The optional grpc.ServicerContext of the request
+                    on behalf of which the work is done
+        :param timeout: Maximum time to wait for the result.
+                    Default of None means wait as long as it takes.
+        :param kwargs: Keyword arguments to the function
+        :return: The result of the function. Exceptions raised by the
+                function are re-raised, and concurrent.futures.CancelledError
+                is raised if the work was cancelled.
+        """
+        future = self.submit(fn, *args, context=context, **kwargs)
+        return future.result(timeout=timeout)
+
+    def get_num_in_flight(self) -> int:
+        """
+        :return: The number of offloaded tasks submitted but not yet done
+        """
+        return self.in_flight.get_count()
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """
+        Shut down the worker processes
+
+        :param wait: When True, wait for work in flight to finish
+        :param cancel_futures: When True, cancel work not yet started
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def _acquire_slot(self) -> Tuple[int, int]:
+        """
+        :return: A tuple of a free cancellation flag slot, cleared, or -1 if
+                none are free, and the generation of the slot
+        """
+        with self._slot_lock:
+            if not self._free_slots:
+                return -1, 0
+            slot = self._free_slots.pop()
+            self._cancel_flags[slot] = 0
+            return slot, self._slot_generations[slot]
+
+    def _release_slot(self, slot: int):
+        if slot < 0:
+            return
+        with self._slot_lock:
+            self._slot_generations[slot] += 1
+            self._free_slots.append(slot)
+
+    def _set_cancel_flag(self, slot: int, generation: int):
+        """
+        Sets a cancellation flag, unless the slot has since been released
+        and possibly handed to another task.
+
+        :param slot: The slot from _acquire_slot()
+        :param generation: The generation from _acquire_slot()
+        """
+        if slot < 0:
+            return
+        with self._slot_lock:
+            if self._slot_generations[slot] == generation:
+                self._cancel_flags[slot] = 1
@@ -0,0 +1,328 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from collections import Counter
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Default time between stack samples. 100 samples a second is plenty
+# to see where time goes while costing little.
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 0.01
+
+# Upper bound on a single sampling run, so a forgotten one ends by itself
+MAX_SAMPLE_DURATION_SECONDS = 600.0
+
+
+class SamplingProfiler():
+    """
+    Low-overhead statistical profiler for a running service.
+
+    For a given time, a background thread periodically grabs the current
+    stack of every other thread with sys._current_frames() and counts how
+    often each stack is seen. Nothing is done to the threads being sampled,
+    so this is safe to turn on in production.
+
+    The result is written in the "collapsed stack" format, one line per
+    distinct stack with frames separated by semicolons followed by a count,
+    ready for flamegraph.pl, speedscope or similar. Frames are named by
+    function, file and first line of the function so that samples taken at
+    different lines of the same function add up.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, output_dir: str = None, logger: logging.Logger = None):
+        """
+        Constructor
+
+        :param output_dir: The directory profiles are written to.
+                    Default of None means the system temporary directory.
+        :param logger: The logger to report to.
+                    Default of None means a logger for this module.
+        """
+        self.output_dir: str = output_dir
+        if self.output_dir is None:
+            self.output_dir = tempfile.gettempdir()
+        self.logger: logging.Logger = logger
+        if self.logger is None:
+            self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+        self._stacks: Counter = Counter()
+        self._num_samples: int = 0
+        self._file_name: str = None
+
+    def start(self, duration_seconds: float,
+              interval_seconds: float = DEFAULT_SAMPLE_INTERVAL_SECONDS) -> str:
+        """
+        Starts sampling in the background
+
+        :param duration_seconds: How long to sample for.
+                    Capped at MAX_SAMPLE_DURATION_SECONDS.
+        :param interval_seconds: Time between samples
+        :return: The name of the file the profile will be written to when
+                done, or None if a profile is already being taken
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return None
+            duration_seconds = min(duration_seconds, MAX_SAMPLE_DURATION_SECONDS)
+            timestamp = time.strftime("%Y%m%d-%H%M%S")
+            self._file_name = os.path.join(self.output_dir, f"profile-{os.getpid()}-{timestamp}.collapsed")
+            self._stacks = Counter()
+            self._num_samples = 0
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, args=(duration_seconds, interval_seconds),
+                                            daemon=True, name="sampling-profiler")
+            self._thread.start()
+            file_name = self._file_name
+
+        self.logger.info("Sampling profiler running for %.1f seconds into %s", duration_seconds, file_name)
+        return file_name
+
+    def stop(self):
+        """
+        Ends sampling early. The profile gathered so far is still written.
+        """
+        self._stop.set()
+
+    def wait(self, timeout_seconds: float = None) -> bool:
+        """
+        :param timeout_seconds: The longest time to wait for the profile to
+                    be written. Default of None means wait as long as it takes.
+        :return: True if no profile is being taken anymore
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout_seconds)
+            return not thread.is_alive()
+        return True
+
+    def is_running(self) -> bool:
+        """
+        :return: True if a profile is being taken
+        """
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary saying whether a profile is being taken,
+                how many samples it has, and the file it goes to
+        """
+        return {
+            "running": self.is_running(),
+            "samples": self._num_samples,
+            "file": self._file_name
+        }
+
+    def _sample(self, duration_seconds: float, interval_seconds: float):
+        """
+        Main loop of the sampling thread
+        """
+        my_ident = threading.get_ident()
+        end_time = time.monotonic() + duration_seconds
+        while not self._stop.is_set() and time.monotonic() < end_time:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            # pylint: disable=protected-access
+            for ident, frame in sys._current_frames().items():
+                if ident == my_ident:
+                    continue
+                stack = self._collapse(names.get(ident, str(ident)), frame)
+                self._stacks[stack] += 1
+            self._num_samples += 1
+            self._stop.wait(interval_seconds)
+
+        try:
+            self._write(self._file_name)
+            self.logger.info("Sampling profiler wrote %d samples to %s", self._num_samples, self._file_name)
+        except OSError as exception:
+            self.logger.error("Sampling profiler could not write %s: %s", self._file_name, str(exception))
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        """
+        :return: The stack of the frame, outermost first, as a single string
+        """
+        frames: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        frames.reverse()
+        return ";".join(frames)
+
+    def _write(self, file_name: str):
+        """
+        Writes the collapsed stacks, most often seen first
+        """
+        with open(file_name, "w", encoding="utf-8") as profile_file:
+            for stack, count in self._stacks.most_common():
+                profile_file.write(f"{stack} {count}\n")
+
+
+class RequestProfiler():
+    """
+    Deterministic profiling of a sample of the requests to a given method.
+
+    Every one_in'th request to the method has its handler thread profiled
+    with cProfile from start_request() to finish_request(), and the stats
+    written to a file readable with pstats or snakeviz.
+
+    cProfile slows down the profiled request considerably, and only one
+    cProfile can be active at a time. Requests picked while another is
+    being profiled are skipped.
+    """
+
+    def __init__(self, output_dir: str = None, logger: logging.Logger = None):
+        """
+        Constructor
+
+        :param output_dir: The directory profiles are written to.
+                    Default of None means the system temporary directory.
+        :param logger: The logger to report to.
+                    Default of None means a logger for this module.
+        """
+        self.output_dir: str = output_dir
+        if self.output_dir is None:
+            self.output_dir = tempfile.gettempdir()
+        self.logger: logging.Logger = logger
+        if self.logger is None:
+            self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        # The (thread ident, cProfile.Profile) of the request being profiled
+        self._active: Tuple[int, Any] = None
+        # Maps caller -> [one_in, requests seen, profiles left]
+        self._callers: Dict[str, List[int]] = {}
+
+    def profile_requests(self, caller: str, one_in: int, max_profiles: int = 10):
+        """
+        :param caller: The caller name given to start_request()
+        :param one_in: Profile one in this many requests.
+                    0 stops profiling requests to the caller.
+        :param max_profiles: The number of profiles to take before stopping
+        """
+        with self._lock:
+            if one_in <= 0 or max_profiles <= 0:
+                self._callers.pop(caller, None)
+            else:
+                self._callers[caller] = [one_in, 0, max_profiles]
+
+    def get_status(self) -> Dict[str, Dict[str, int]]:
+        """
+        :return: A dictionary of caller to its sampling rate,
+                requests seen and profiles left to take
+        """
+        with self._lock:
+            return {caller: {"one_in": one_in, "seen": seen, "profiles_left": left}
+                    for caller, (one_in, seen, left) in self._callers.items()}
+
+    def maybe_start(self, caller: str):
+        """
+        Called on the handler thread when a request starts
+
+        :param caller: The caller name given to start_request()
+        :return: A running cProfile.Profile if this request was picked
+                for profiling, otherwise None
+        """
+        if not self._callers:
+            return None
+        with self._lock:
+            settings = self._callers.get(caller)
+            if settings is None:
+                return None
+            settings[1] += 1
+            if settings[1] % settings[0] != 0:
+                return None
+            self._abandon_profile_on_this_thread()
+            if self._active is not None:
+                return None
+            settings[2] -= 1
+            if settings[2] <= 0:
+                self._callers.pop(caller, None)
+
+            # Only loaded when a request is actually profiled
+            # pylint: disable=import-outside-toplevel
+            import cProfile
+
+            profile = cProfile.Profile()
+            self._active = (threading.get_ident(), profile)
+
+        profile.enable()
+        return profile
+
+    def finish(self, caller: str, profile) -> str:
+        """
+        Called on the same handler thread when the request is finished
+
+        :param caller: The caller name given to start_request()
+        :param profile: The cProfile.Profile returned by maybe_start()
+        :return: The name of the file the stats were written to,
+                or None if they could not be written
+        """
+        profile.disable()
+        with self._lock:
+            if self._active is not None and self._active[1] is profile:
+                self._active = None
+
+        safe_caller = "".join(char if char.isalnum() else "_" for char in str(caller))
+        file_name = os.path.join(self.output_dir,
+                                 f"request-{safe_caller}-{os.getpid()}-{time.time_ns()}.prof")
+        try:
+            profile.dump_stats(file_name)
+        except OSError as exception:
+            self.logger.error("Could not write request profile %s: %s", file_name, str(exception))
+            return None
+        self.logger.info("Wrote profile of %s request to %s", caller, file_name)
+        return file_name
+
+    def abandon(self, profile):
+        """
+        Called on the same handler thread when the handler is done with
+        the request without having called finish_request(), like when it
+        raised. Stops the profile without writing it, so that profiling
+        of other requests can carry on.
+
+        :param profile: The cProfile.Profile returned by maybe_start()
+        """
+        profile.disable()
+        with self._lock:
+            if self._active is not None and self._active[1] is profile:
+                self._active = None
+
+    def _abandon_profile_on_this_thread(self):
+        """
+        A handler that raised outside of a server created by ServerLifetime
+        never calls finish_request(), leaving its profile running on its
+        thread. Stop it when the thread comes back for another request
+        so that profiling can carry on. Called with the lock held.
+        """
+        if self._active is None or self._active[0] != threading.get_ident():
+            return
+        self._active[1].disable()
+        self._active = None
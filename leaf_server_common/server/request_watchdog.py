@@ -0,0 +1,194 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Tuple
+
+import sys
+import threading
+import time
+import traceback
+
+from leaf_server_common.logging.request_logger_adapter import RequestLoggerAdapter
+
+# Default time after which a request is considered slow
+DEFAULT_SLOW_REQUEST_SECONDS = 60.0
+
+# Default minimum time between slow request records for the same caller
+DEFAULT_LOG_INTERVAL_SECONDS = 60.0
+
+# Default number of innermost frames of a slow request's stack to log
+DEFAULT_MAX_STACK_FRAMES = 30
+
+
+class RequestWatchdog():
+    """
+    Keeps track of the requests being handled and notices those that are
+    taking too long, logging what their threads are doing at the time.
+
+    start_tracking() and stop_tracking() are on the request hot path and
+    are no more than a dictionary insert and delete. Relying on the GIL,
+    they take no lock. All the work happens in check(), which is meant to
+    be called every second or so from a background thread.
+
+    Each slow request is reported at most once, through its own
+    RequestLoggerAdapter so the record carries the request's trace ids.
+    Records are rate-limited per caller. Slow requests that are not
+    logged are counted and mentioned in the next record for the caller.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, slow_request_seconds: float = DEFAULT_SLOW_REQUEST_SECONDS,
+                 thresholds: Dict[str, float] = None,
+                 log_interval_seconds: float = DEFAULT_LOG_INTERVAL_SECONDS,
+                 max_stack_frames: int = DEFAULT_MAX_STACK_FRAMES):
+        """
+        Constructor
+
+        :param slow_request_seconds: Time after which a request is
+                    considered slow, unless its caller has its own threshold
+        :param thresholds: An optional dictionary of caller name, as given to
+                    start_request(), to the time after which requests for
+                    that caller are considered slow
+        :param log_interval_seconds: Minimum time between slow request
+                    records for the same caller
+        :param max_stack_frames: The number of innermost frames of
+                    the stack to log
+        """
+        self.slow_request_seconds: float = slow_request_seconds
+        self.thresholds: Dict[str, float] = dict(thresholds or {})
+        self.log_interval_seconds: float = log_interval_seconds
+        self.max_stack_frames: int = max_stack_frames
+
+        # Maps the RequestLoggerAdapter of each request being handled
+        # to a tuple of (caller, requestor_id, thread ident)
+        self._in_flight: Dict[RequestLoggerAdapter, Tuple[str, str, int]] = {}
+
+        # Kept by check(), under the lock
+        self._lock = threading.Lock()
+        self._reported: Set[RequestLoggerAdapter] = set()
+        self._last_logged: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._slow_counts: Dict[str, int] = {}
+
+    def start_tracking(self, request_log: RequestLoggerAdapter, caller: str, requestor_id: str):
+        """
+        Called on the handler thread when handling of a request starts
+
+        :param request_log: The RequestLoggerAdapter for the request
+        :param caller: The caller name given to start_request()
+        :param requestor_id: The requestor id given to start_request()
+        """
+        self._in_flight[request_log] = (caller, requestor_id, threading.get_ident())
+
+    def stop_tracking(self, request_log: RequestLoggerAdapter):
+        """
+        Called when handling of a request is done
+
+        :param request_log: The RequestLoggerAdapter for the request
+        """
+        self._in_flight.pop(request_log, None)
+
+    def get_threshold(self, caller: str) -> float:
+        """
+        :param caller: The caller name given to start_request()
+        :return: The time after which requests for the caller are slow
+        """
+        return self.thresholds.get(caller, self.slow_request_seconds)
+
+    def get_num_in_flight(self) -> int:
+        """
+        :return: The number of requests being tracked
+        """
+        return len(self._in_flight)
+
+    def get_in_flight(self) -> List[Dict[str, Any]]:
+        """
+        :return: A list of dictionaries describing each request being
+                handled, longest running first
+        """
+        now = time.monotonic()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        requests = []
+        for request_log, (caller, requestor_id, ident) in dict(self._in_flight).items():
+            elapsed = now - request_log.start_time
+            requests.append({
+                "caller": caller,
+                "requestor_id": requestor_id,
+                "elapsed_seconds": round(elapsed, 3),
+                "thread": names.get(ident, str(ident)),
+                "trace_id": request_log.trace_context.get_trace_id_hex(),
+                "slow": elapsed >= self.get_threshold(caller),
+                # Nobody is waiting for the result anymore, but the handler is still going
+                "cancelled": request_log.is_cancelled()
+            })
+        requests.sort(key=lambda request: request.get("elapsed_seconds"), reverse=True)
+        return requests
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        :return: A dictionary of caller to the number of its requests
+                found to be slow so far
+        """
+        with self._lock:
+            return dict(self._slow_counts)
+
+    def check(self):
+        """
+        Looks for requests that have become slow since the last check
+        and logs what their threads are doing
+        """
+        now = time.monotonic()
+        in_flight = dict(self._in_flight)
+        frames = None
+        with self._lock:
+            # Forget about reported requests that have since finished
+            self._reported.intersection_update(in_flight.keys())
+
+            for request_log, (caller, requestor_id, ident) in in_flight.items():
+                elapsed = now - request_log.start_time
+                threshold = self.get_threshold(caller)
+                if elapsed < threshold or request_log in self._reported:
+                    continue
+                self._reported.add(request_log)
+                self._slow_counts[caller] = self._slow_counts.get(caller, 0) + 1
+
+                last_logged = self._last_logged.get(caller)
+                if last_logged is not None and now - last_logged < self.log_interval_seconds:
+                    self._suppressed[caller] = self._suppressed.get(caller, 0) + 1
+                    continue
+                self._last_logged[caller] = now
+                suppressed = self._suppressed.pop(caller, 0)
+
+                if frames is None:
+                    # pylint: disable=protected-access
+                    frames = sys._current_frames()
+                stack = self._format_stack(frames.get(ident))
+                request_log.warning("Slow %s request for %s running %.3f seconds, over its %.3f second threshold "
+                                    "(%d other slow requests not logged). Stack of its thread:\n%s",
+                                    str(caller), str(requestor_id), elapsed, threshold, suppressed, stack)
+
+    def _format_stack(self, frame) -> str:
+        """
+        :return: The innermost frames of the stack as a string
+        """
+        if frame is None:
+            return "    (thread no longer running)"
+        frames = traceback.extract_stack(frame)[-self.max_stack_frames:]
+        return "".join(traceback.format_list(frames)).rstrip("\n")
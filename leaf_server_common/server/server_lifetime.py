@@ -15,9 +15,18 @@
 #
 # END COPYRIGHT
 
+# pylint: disable=too-many-lines
+
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Tuple
 
 import random
+import signal
+import threading
 import time
 
 from threading import RLock
@@ -25,23 +34,63 @@ from concurrent import futures
 
 import grpc
 
-from grpc_health.v1 import health
-from grpc_health.v1 import health_pb2
-from grpc_health.v1 import health_pb2_grpc
-from grpc_reflection.v1alpha import reflection
-
 from leaf_common.session.grpc_metadata_util import GrpcMetadataUtil
 
 from leaf_server_common.logging.logging_setup \
     import setup_extra_logging_fields
 from leaf_server_common.logging.request_logger_adapter \
     import RequestLoggerAdapter
+from leaf_server_common.logging.request_logger_adapter import get_client_time_remaining
+from leaf_server_common.logging.trace_context import TraceContext
+from leaf_server_common.server.adaptive_thread_pool_executor import AdaptiveThreadPoolExecutor
+from leaf_server_common.server.atomic_counter import AtomicCounter
+from leaf_server_common.server.handler_exit_interceptor import HandlerExitInterceptor
+from leaf_server_common.server.latency_tracker import LatencyTracker
 from leaf_server_common.server.request_logger import RequestLogger
 from leaf_server_common.server.server_loop_callbacks \
     import ServerLoopCallbacks
 
+# The optional subsystems are only imported once a ServerLifetime is created,
+# or once they are first asked for, so importing this module stays cheap.
+if TYPE_CHECKING:
+    from leaf_server_common.server.gc_policy import GcPolicy
+    from leaf_server_common.server.periodic_task_scheduler import PeriodicTask
+    from leaf_server_common.server.tenant_accounting import TenantQuotas
+    from leaf_server_common.server.warmup import ServerWarmup
+
 ONE_MINUTE_IN_SECONDS = 60
 
+# How often to check on requests still being processed when draining
+DRAIN_POLL_SECONDS = 1.0
+
+# Longest time to wait for running periodic tasks when shutting down
+PERIODIC_TASK_STOP_SECONDS = 5.0
+
+# Name of the periodic task calling the ServerLoopCallbacks
+LOOP_CALLBACK_TASK = "loop_callback"
+
+# Name of the periodic task looking for slow requests, and how often it looks
+WATCHDOG_TASK = "request_watchdog"
+WATCHDOG_INTERVAL_SECONDS = 1.0
+
+# Name of the periodic task looking for changes to the logging config,
+# and how often it looks
+LOGGING_CONFIG_TASK = "logging_config"
+LOGGING_CONFIG_CHECK_SECONDS = 5.0
+
+# Name of the periodic task taking leak diagnostics snapshots at request
+# milestones, and how often it looks
+LEAK_DIAGNOSTICS_TASK = "leak_diagnostics"
+LEAK_DIAGNOSTICS_CHECK_SECONDS = 1.0
+
+# How long the sampling profiler runs when started by SIGUSR2
+PROFILE_SIGNAL_SECONDS = 30.0
+
+# Names of the latency histograms kept by ServerLifetime
+QUEUE_WAIT_LATENCY = "queue_wait"
+HANDLER_LATENCY = "handler"
+WARMUP_LATENCY = "warmup"
+
 
 class ServerLifetime(RequestLogger):
     """
@@ -52,14 +101,33 @@ class ServerLifetime(RequestLogger):
     # Tied for Public Enemy #3 for too-many-arguments
     # pylint: disable=too-many-arguments
     # Tied for Public Enemy #2 for too-many-instance-attributes
-    # pylint: disable=too-many-instance-attributes,too-many-locals,too-many-positional-arguments
+    # pylint: disable=too-many-instance-attributes,too-many-locals,too-many-positional-arguments,too-many-statements
     def __init__(self, server_name, server_name_for_logs, port,
                  logger,
                  request_limit=-1, max_workers=10, max_concurrent_rpcs=None,
                  protocol_services_by_name_values=None,
                  loop_sleep_seconds: float = ONE_MINUTE_IN_SECONDS,
                  server_loop_callbacks: ServerLoopCallbacks = None,
-                 active_sleep_seconds: float = 0.1):
+                 active_sleep_seconds: float = 0.1,
+                 min_workers: int = None,
+                 worker_idle_timeout_seconds: float = 30.0,
+                 interceptors: List[grpc.ServerInterceptor] = None,
+                 shutdown_propagation_seconds: float = 5.0,
+                 drain_timeout_seconds: float = 15 * ONE_MINUTE_IN_SECONDS,
+                 stop_grace_seconds: float = 30.0,
+                 shutdown_budget_seconds: float = None,
+                 periodic_task_workers: int = 2,
+                 warmup_timeout_seconds: float = 60.0,
+                 warmup_parallelism: int = 1,
+                 profile_dir: str = None,
+                 slow_request_seconds: float = None,
+                 slow_request_thresholds: Dict[str, float] = None,
+                 enable_admin_service: bool = False,
+                 tenant_field: str = "user_id",
+                 max_tracked_tenants: int = None,
+                 tenant_quotas: "TenantQuotas" = None,
+                 leak_diagnostics_milestones: List[float] = None,
+                 gc_policy: "GcPolicy" = None):
         """
         Constructor
 
@@ -84,11 +152,79 @@ class ServerLifetime(RequestLogger):
         :param protocol_services_by_name_values: result of:
                     <protocol>_pb2.DESCRIPTOR.services_by_name.values()
                     Default is None
-        :param loop_sleep_seconds: Number of seconds to sleep in the request
-                    polling loop when the server is inactive
+        :param loop_sleep_seconds: Number of seconds between calls to the
+                    server_loop_callbacks when the server is inactive
         :param server_loop_callbacks: A ServerLoopCallbacks instance to allow
                     app-specific hooks into the main loop of the server.
-        :param active_sleep_seconds: Amount of time to sleep when the server is active
+                    Its loop_callback() is run as a periodic task.
+        :param active_sleep_seconds: Number of seconds between calls to the
+                    server_loop_callbacks when the server is active
+        :param min_workers: When set, the worker threads handling requests
+                    are kept in an adaptive pool that grows up to max_workers
+                    when requests queue up and shrinks back down to this many
+                    when they are idle. Default of None means a fixed-size pool
+                    of max_workers threads.
+        :param worker_idle_timeout_seconds: With min_workers set, the time a worker
+                    thread above the minimum may sit idle before it exits.
+                    Default is 30 seconds.
+        :param interceptors: An optional list of grpc.ServerInterceptors
+                    to install on the server, for instance a
+                    SingleFlightInterceptor to share the work of identical
+                    concurrent requests to idempotent methods.
+        :param shutdown_propagation_seconds: When shutting down, the time
+                    between announcing NOT_SERVING via health checks and
+                    refusing new requests, so that load balancers have a chance
+                    to notice and stop routing requests here. Default is 5 seconds.
+        :param drain_timeout_seconds: When shutting down, the longest time to wait
+                    for requests being processed to finish once new requests are
+                    being refused. Default is 15 minutes.
+        :param stop_grace_seconds: The grace period given to the grpc server
+                    to finish off any remaining RPCs once draining is done.
+                    Default is 30 seconds.
+        :param shutdown_budget_seconds: An optional upper bound on the time
+                    the whole shutdown sequence may take once it starts,
+                    for instance to fit within a kubernetes
+                    terminationGracePeriodSeconds. Stages are cut short
+                    to fit. Default of None means no overall bound.
+        :param periodic_task_workers: The number of threads running periodic
+                    tasks added with add_periodic_task(). Default is 2.
+        :param warmup_timeout_seconds: The longest time to spend running
+                    warmup tasks and replaying warmup requests after the server
+                    starts and before it reports SERVING. Default is 60 seconds.
+        :param warmup_parallelism: The number of warmup tasks or requests
+                    run at the same time. Default is 1.
+        :param profile_dir: The directory profiles taken with start_profiling(),
+                    SIGUSR2 or profile_requests() are written to.
+                    Default of None means the system temporary directory.
+        :param slow_request_seconds: Time after which a request still being
+                    handled is logged as slow, along with the stack of its thread.
+                    Default of None means 60 seconds.
+        :param slow_request_thresholds: An optional dictionary of caller name,
+                    as given to start_request(), to its own slow request time
+        :param enable_admin_service: When True, an AdminService is registered
+                    next to health checking for looking at stats and changing
+                    log levels and the like at runtime. Default is False.
+        :param tenant_field: The structured logging field, as taken from
+                    request metadata by setup_extra_logging_fields(), which
+                    says which tenant a request is for. Default is "user_id".
+        :param max_tracked_tenants: The number of heaviest tenants whose
+                    requests and handler time are tracked.
+                    Default of None means 100.
+        :param tenant_quotas: An optional TenantQuotas limiting the concurrent
+                    requests or request rate of each tenant. Requests over
+                    quota are refused with RESOURCE_EXHAUSTED.
+        :param leak_diagnostics_milestones: When set, tracemalloc and object
+                    count snapshots are taken after warmup, at each of these
+                    points and at shutdown, and a report of what grew in
+                    between is written to the profile_dir before the server
+                    goes away. Values up to 1.0 are fractions of the request
+                    limit, like [0.5, 0.9]. Larger values are numbers of
+                    requests. Default of None means no leak diagnostics,
+                    which slow the service down while on.
+        :param gc_policy: An optional GcPolicy for keeping garbage collection
+                    pauses out of requests, by freezing startup objects after
+                    warmup and collecting when the server is idle.
+                    Default of None leaves garbage collection alone.
         """
 
         self.start_time_since_epoch = time.time()
@@ -117,7 +253,21 @@ class ServerLifetime(RequestLogger):
         self.logger.info("Shutting down in %d requests.", self.shutdown_at)
 
         self.max_workers = max_workers
+        self.min_workers = min_workers
+        self.worker_idle_timeout_seconds = worker_idle_timeout_seconds
         self.max_concurrent_rpcs = max_concurrent_rpcs
+        self.interceptors = interceptors
+        if self.interceptors:
+            # pylint: disable=import-outside-toplevel
+            from leaf_server_common.server.single_flight import SingleFlightInterceptor
+            for interceptor in self.interceptors:
+                # Requests it answers without the handler still count here
+                if isinstance(interceptor, SingleFlightInterceptor) and interceptor.lifetime is None:
+                    interceptor.lifetime = self
+        self.thread_pool = None
+
+        # Lets go of what requests hold once their handlers return or raise
+        self.handler_exit_interceptor = HandlerExitInterceptor(self._release_request_resources)
 
         # Some placeholders for things we will set later on
         self.lock = RLock()
@@ -134,13 +284,121 @@ class ServerLifetime(RequestLogger):
             'Serving': True,
             'Total': 0
         }
+
+        # Where time goes for requests: waiting for a worker thread vs in the handler
+        self.latency = LatencyTracker()
+
+        # Work offloaded to other processes on behalf of requests.
+        # This counts towards what needs draining before shutdown.
+        self.offload_in_flight = AtomicCounter()
+        self.process_offloaders = []
         self.loop_sleep_seconds = loop_sleep_seconds
         self.active_sleep_seconds = active_sleep_seconds
 
+        # Staged shutdown settings and how long each stage actually took
+        self.shutdown_propagation_seconds = shutdown_propagation_seconds
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.stop_grace_seconds = stop_grace_seconds
+        self.shutdown_budget_seconds = shutdown_budget_seconds
+        self.shutdown_metrics: Dict[str, float] = {}
+
+        # Set when it is time to shut down. Wakes the main loop.
+        self.shutdown_requested = threading.Event()
+        self.shutdown_reason = None
+
+        # Set when signalled to shut down a second time. Skips the rest of
+        # the propagation delay.
+        self.shutdown_signalled = False
+        self.shutdown_hurried = threading.Event()
+
+        # Notified when the last request being processed finishes
+        self.drained = threading.Condition(self.lock)
+
         self.server_loop_callbacks = server_loop_callbacks
         if self.server_loop_callbacks is None:
             self.server_loop_callbacks = ServerLoopCallbacks()
 
+        # pylint: disable=import-outside-toplevel
+        from leaf_server_common.server.periodic_task_scheduler import PeriodicTaskScheduler
+        from leaf_server_common.server.profiler import RequestProfiler
+        from leaf_server_common.server.profiler import SamplingProfiler
+        from leaf_server_common.server.request_watchdog import DEFAULT_SLOW_REQUEST_SECONDS
+        from leaf_server_common.server.request_watchdog import RequestWatchdog
+        from leaf_server_common.server.tenant_accounting import DEFAULT_MAX_TRACKED_TENANTS
+        from leaf_server_common.server.tenant_accounting import TenantAccounting
+
+        # Housekeeping done off the main thread, each task on its own schedule
+        self.scheduler = PeriodicTaskScheduler(max_workers=periodic_task_workers,
+                                               logger=self.logger,
+                                               thread_name_prefix=f"{self.server_name_for_logs}-periodic")
+        self._loop_callback_task: "PeriodicTask" = self.scheduler.schedule(
+            LOOP_CALLBACK_TASK, self._call_loop_callback, self.loop_sleep_seconds,
+            jitter_fraction=0.0, run_immediately=True, fixed_delay=True)
+
+        # Work done between starting the server and reporting SERVING.
+        # Only created once there is some.
+        self.warmup: "ServerWarmup" = None
+        self.warmup_timeout_seconds = warmup_timeout_seconds
+        self.warmup_parallelism = warmup_parallelism
+        self.warmup_metrics: Dict[str, Any] = {}
+        self.bound_port = None
+
+        # On-demand looks inside the running server
+        self.sampling_profiler = SamplingProfiler(profile_dir, self.logger)
+        self.request_profiler = RequestProfiler(profile_dir, self.logger)
+
+        # Notices requests that are stuck
+        if slow_request_seconds is None:
+            slow_request_seconds = DEFAULT_SLOW_REQUEST_SECONDS
+        self.watchdog = RequestWatchdog(slow_request_seconds=slow_request_seconds,
+                                        thresholds=slow_request_thresholds)
+        self.scheduler.schedule(WATCHDOG_TASK, self.watchdog.check, WATCHDOG_INTERVAL_SECONDS,
+                                jitter_fraction=0.0)
+
+        self.enable_admin_service = enable_admin_service
+        self.admin_service = None
+
+        # Who is using the service, and how much they are allowed to
+        self.tenant_field = tenant_field
+        if max_tracked_tenants is None:
+            max_tracked_tenants = DEFAULT_MAX_TRACKED_TENANTS
+        self.tenant_accounting = TenantAccounting(max_tracked_tenants)
+        self.tenant_quotas = tenant_quotas
+
+        # What grows from one request limit restart to the next
+        self.leak_diagnostics = None
+        if leak_diagnostics_milestones is not None:
+            self._set_up_leak_diagnostics(leak_diagnostics_milestones, profile_dir)
+
+        # When garbage collection gets to pause the process
+        self.gc_policy = gc_policy
+        if self.gc_policy is not None:
+            self.gc_policy.install()
+
+    def _set_up_leak_diagnostics(self, milestones: List[float], output_dir: str):
+        """
+        :param milestones: Fractions of the request limit or numbers of
+                    requests at which to take snapshots
+        :param output_dir: The directory the report goes to
+        """
+        # tracemalloc is only loaded when diagnosing leaks
+        # pylint: disable=import-outside-toplevel
+        from leaf_server_common.server.leak_diagnostics import LeakDiagnostics
+
+        request_milestones = []
+        for milestone in milestones:
+            if milestone > 1.0:
+                request_milestones.append(int(milestone))
+            elif self.shutdown_at != -1:
+                request_milestones.append(max(1, round(milestone * self.shutdown_at)))
+            else:
+                self.logger.warning("No request limit to take leak diagnostics milestone %s of", str(milestone))
+
+        self.leak_diagnostics = LeakDiagnostics(request_milestones, output_dir, self.logger)
+        self.scheduler.schedule(LEAK_DIAGNOSTICS_TASK,
+                                lambda: self.leak_diagnostics.check(self._get_total_requests()),
+                                LEAK_DIAGNOSTICS_CHECK_SECONDS, jitter_fraction=0.0)
+
     def create_server(self):
         """
         Called by client code to create the GRPC server instance.
@@ -150,22 +408,31 @@ class ServerLifetime(RequestLogger):
             that has the request handling methods)
         """
 
-        # pylint-protobuf cannot find enums defined within scope of a message
-        # pylint: disable=protobuf-undefined-attribute,consider-using-with
+        # Health checking is only loaded once there is a server to check on
+        # pylint: disable=import-outside-toplevel
+        from grpc_health.v1 import health
+
+        # pylint: disable=consider-using-with
         health_thread_pool = futures.ThreadPoolExecutor(max_workers=1)
         self.health = health.HealthServicer(
                         experimental_non_blocking=True,
                         experimental_thread_pool=health_thread_pool)
-        # pylint: disable=no-member
-        self.health.set(self.server_name,
-                        health_pb2.HealthCheckResponse.ServingStatus.NOT_SERVING)
+        self._set_health_status("NOT_SERVING")
 
         max_message_length = -1     # No limit to message length
         # pylint: disable=consider-using-with
-        thread_pool = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        if self.min_workers is not None:
+            self.thread_pool = AdaptiveThreadPoolExecutor(
+                min_workers=self.min_workers,
+                max_workers=self.max_workers,
+                idle_timeout_seconds=self.worker_idle_timeout_seconds,
+                thread_name_prefix=f"{self.server_name_for_logs}-worker")
+        else:
+            self.thread_pool = futures.ThreadPoolExecutor(max_workers=self.max_workers)
         self.server = grpc.server(
-            thread_pool,
+            self.thread_pool,
             maximum_concurrent_rpcs=self.max_concurrent_rpcs,
+            interceptors=list(self.interceptors or []) + [self.handler_exit_interceptor],
             options=[('grpc.max_send_message_length', max_message_length),
                      ('grpc.max_receive_message_length', max_message_length)])
 
@@ -181,16 +448,202 @@ class ServerLifetime(RequestLogger):
         self._set_up_health()
         self._set_up_ports()
         self._start_server()
+        self.scheduler.start()
+        previous_handlers = self._install_signal_handlers()
 
-        # Main polling loop in here
-        self._poll_until_request_limit()
+        try:
+            # Main polling loop in here
+            self._poll_until_request_limit()
 
-        self._drain_last_requests()
+            self._shut_down_in_stages()
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
 
-        self.server_loop_callbacks.shutdown_callback()
+    def add_warmup_task(self, name: str, function: Callable[[], Any]):
+        """
+        Called by client code to have a function called once after the server
+        starts but before it reports SERVING, like one that loads a model
+        or fills a cache.
 
-        # Finally stop the service
-        self.server.stop(None)
+        :param name: The name of the task for logs
+        :param function: The function to call, taking no arguments
+        """
+        self._get_warmup().add_task(name, function)
+
+    def add_warmup_requests(self, requests: List[Tuple[str, bytes]]):
+        """
+        Called by client code to have requests sent to the server after it
+        starts but before it reports SERVING, exercising the same code paths
+        real requests will. Replayed requests are left out of quotas, limits
+        and stats, and start_request() returns a RequestLoggerAdapter with
+        is_warmup set for them. Only requests carrying the token of this
+        process's ServerWarmup while it runs are treated this way.
+
+        :param requests: A list of (full method name, serialized request)
+                    tuples, like those from RequestRecorder.load()
+        """
+        self._get_warmup().add_requests(requests)
+
+    def _get_warmup(self) -> "ServerWarmup":
+        """
+        :return: The ServerWarmup, created on first use
+        """
+        if self.warmup is None:
+            # pylint: disable=import-outside-toplevel
+            from leaf_server_common.server.warmup import ServerWarmup
+            self.warmup = ServerWarmup(self.logger, timeout_seconds=self.warmup_timeout_seconds,
+                                       parallelism=self.warmup_parallelism)
+        return self.warmup
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def add_periodic_task(self, name: str, function: Callable[[], Any], interval_seconds: float,
+                          jitter_fraction: float = 0.1, timeout_seconds: float = None,
+                          run_immediately: bool = False) -> "PeriodicTask":
+        """
+        Called by client code to have a function called every so often
+        on a small pool of threads dedicated to housekeeping, until
+        the server shuts down.
+
+        :param name: The name of the task for metrics and logs
+        :param function: The function to call, taking no arguments.
+                    Long-running functions can check scheduler.stopping
+                    to find out when to give up early.
+        :param interval_seconds: Time between the start of one run and the next
+        :param jitter_fraction: Fraction of the interval by which the actual
+                    time between runs is randomized either way. Default is 0.1.
+        :param timeout_seconds: Runs taking longer than this are reported.
+                    Default of None means runs are never considered late.
+        :param run_immediately: When True, the first run happens when the
+                    server starts. Default is False, meaning one interval later.
+        :return: The PeriodicTask, whose interval_seconds can be changed later
+        """
+        return self.scheduler.schedule(name, function, interval_seconds,
+                                       jitter_fraction=jitter_fraction,
+                                       timeout_seconds=timeout_seconds,
+                                       run_immediately=run_immediately)
+
+    def add_passthrough_methods(self, service_name: str,
+                                behaviors: Dict[str, Callable[[Any, Any, Any], bytes]],
+                                logging_fields: Dict[str, int] = None):
+        """
+        Called by client code after create_server() to serve unary methods
+        that take and return serialized messages as they are, for routers
+        and proxies that relay payloads without needing to deserialize them.
+        Requests are counted, limited and logged by start_request() and
+        finish_request() like any other.
+
+        :param service_name: The full name of the service, like "package.Service"
+        :param behaviors: A dictionary of method name to a function taking the
+                    request as a WireMessage, the grpc.ServicerContext and the
+                    RequestLoggerAdapter for the request, and returning the
+                    serialized response
+        :param logging_fields: An optional dictionary of structured logging
+                    field name to the number of a top-level string field of
+                    the request to take it from, when not in request metadata
+        """
+        # pylint: disable=import-outside-toplevel
+        from leaf_server_common.server.passthrough import passthrough_generic_handler
+
+        handler = passthrough_generic_handler(self, service_name, behaviors, logging_fields)
+        self.server.add_generic_rpc_handlers((handler,))
+
+    def watch_logging_config(self, watcher, interval_seconds: float = LOGGING_CONFIG_CHECK_SECONDS):
+        """
+        Called by client code to have changes to the logging config file
+        applied while the server is running, like turning on DEBUG logging
+        to chase down a problem without restarting and losing warm state.
+
+        :param watcher: The LoggingConfigWatcher returned by setup_logging()
+        :param interval_seconds: How often to check the file for changes
+        :return: The PeriodicTask doing the checking
+        """
+        if watcher is None:
+            return None
+        return self.scheduler.schedule(LOGGING_CONFIG_TASK, watcher.check, interval_seconds)
+
+    def get_periodic_task_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: A dictionary of periodic task name to counts of runs,
+                failures, overruns and timeouts along with run durations
+        """
+        return self.scheduler.get_metrics()
+
+    def get_in_flight_requests(self) -> List[Dict[str, Any]]:
+        """
+        :return: A list of dictionaries describing each request being
+                handled, longest running first
+        """
+        return self.watchdog.get_in_flight()
+
+    def get_tenant_usage(self, num: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        :param num: The number of tenants wanted for each measure
+        :return: A dictionary with lists of the heaviest tenants by
+                "requests" and by "handler_seconds"
+        """
+        return self.tenant_accounting.get_top(num)
+
+    def start_profiling(self, duration_seconds: float = PROFILE_SIGNAL_SECONDS,
+                        interval_seconds: float = None) -> str:
+        """
+        Starts sampling the stacks of all threads in the background,
+        for finding out where a slow replica spends its time.
+        Sending the process SIGUSR2 does the same with the default arguments.
+
+        :param duration_seconds: How long to sample for
+        :param interval_seconds: Time between samples.
+                    Default of None means the SamplingProfiler default.
+        :return: The name of the collapsed-stack file the profile will be
+                written to when done, or None if one is already being taken
+        """
+        if interval_seconds is None:
+            return self.sampling_profiler.start(duration_seconds)
+        return self.sampling_profiler.start(duration_seconds, interval_seconds)
+
+    def profile_requests(self, caller: str, one_in: int, max_profiles: int = 10):
+        """
+        Has cProfile profile the handling of one in every one_in requests
+        for the given caller, from start_request() to finish_request(),
+        writing each profile to its own file.
+
+        :param caller: The caller name given to start_request()
+        :param one_in: Profile one in this many requests.
+                    0 stops profiling requests for the caller.
+        :param max_profiles: The number of profiles to take before stopping
+        """
+        self.request_profiler.profile_requests(caller, one_in, max_profiles)
+
+    def request_shutdown(self, reason: str = "requested"):
+        """
+        Starts the staged shutdown of the server from any thread.
+        This returns immediately. The main loop in run() does the work.
+        Calls after the first do nothing, so every request over the limit
+        can ask without cutting the stages short.
+
+        :param reason: A string describing why the server is shutting down
+        """
+        with self.lock:
+            if self.shutdown_requested.is_set():
+                return
+            self.shutdown_reason = reason
+            self.shutdown_requested.set()
+
+    def _on_shutdown_signal(self, reason: str):
+        """
+        Starts the staged shutdown, or hurries it along if this is not
+        the first shutdown signal.
+
+        :param reason: A string describing why the server is shutting down
+        """
+        with self.lock:
+            repeated = self.shutdown_signalled
+            self.shutdown_signalled = True
+        if repeated:
+            self.logger.info("Hurrying shutdown: %s", reason)
+            self.shutdown_hurried.set()
+            return
+        self.request_shutdown(reason)
 
     def start_request(self, caller, requestor_id, context,
                       service_logging_dict: Dict[str, str] = None):
@@ -208,7 +661,11 @@ class ServerLifetime(RequestLogger):
                 from which structured logging fields can be derived from
                 request-specific fields. When included, similarly named keys here
                 will be overriden by those from the context above.
-        :return: The RequestLoggerAdapter for the request
+        :return: The RequestLoggerAdapter for the request. This also carries
+                the client deadline and cancellation state of the request
+                via its time_remaining() and is_cancelled() methods.
+                Requests which are already past their deadline are aborted
+                with DEADLINE_EXCEEDED instead.
         """
 
         # Create the RequestLoggerAdapter
@@ -216,8 +673,19 @@ class ServerLifetime(RequestLogger):
         if context is not None:
             metadata = context.invocation_metadata()
             metadata_dict = GrpcMetadataUtil.to_dict(metadata)
-        setup_extra_logging_fields(metadata_dict, service_logging_dict)
-        request_log = RequestLoggerAdapter(self.logger, None)
+        logging_fields = setup_extra_logging_fields(metadata_dict, service_logging_dict)
+
+        # Continue any W3C trace the caller sent along in the request headers
+        trace_context = TraceContext.from_metadata(metadata_dict)
+        request_log = RequestLoggerAdapter(self.logger, None, trace_context=trace_context)
+        request_log.tenant = str(logging_fields.get(self.tenant_field, "None"))
+        request_log.is_warmup = self.warmup is not None and self.warmup.is_warmup_request(metadata_dict)
+        self._track_deadline(request_log, context)
+
+        # The adaptive pool knows how long this request waited for this thread
+        request_log.queue_wait_seconds = AdaptiveThreadPoolExecutor.get_current_queue_wait_seconds()
+        if request_log.queue_wait_seconds is not None and not request_log.is_warmup:
+            self.latency.record(QUEUE_WAIT_LATENCY, request_log.queue_wait_seconds)
 
         # Log that the request was received by the caller
         request_log.api("Received a %s request for %s",
@@ -228,6 +696,27 @@ class ServerLifetime(RequestLogger):
                 metadata_dict is not None:
             request_log.api("Request metadata %s", str(metadata_dict))
 
+        # Do not start work on a request whose caller already gave up
+        if request_log.is_cancelled():
+            with self.lock:
+                self._count_abandoned(request_log)
+            message = f"Service dropping {str(caller)} request from {str(requestor_id)} " + \
+                      "which was cancelled or past its deadline on arrival"
+            request_log.info(message)
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, message)
+
+        # Do not let one tenant take over the workers
+        if self.tenant_quotas is not None and not request_log.is_warmup:
+            exceeded = self.tenant_quotas.try_acquire(request_log.tenant)
+            if exceeded is not None:
+                with self.lock:
+                    self.stats['QuotaExceeded'] = self.stats.get('QuotaExceeded', 0) + 1
+                message = f"Service refusing {str(caller)} request from {str(requestor_id)} " + \
+                          f"for tenant {request_log.tenant} over its {exceeded}"
+                request_log.info(message)
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, message)
+            request_log.holds_quota = True
+
         # Update stats for the caller.
         # Take the lock because we are modifying stats
         stats_str = ""
@@ -235,32 +724,45 @@ class ServerLifetime(RequestLogger):
             is_serving = self._is_still_serving()
             if is_serving:
 
-                # Add to the total number of requests and check the value
-                # to see if we should block any further request from being
-                # processed because we will be shutting down
-                self.stats['Total'] = self.stats.get('Total', 0) + 1
-
                 # Keep track of the number of requests actively being processed
                 self.stats['NumProcessing'] = self.stats.get('NumProcessing', 0) + 1
 
-                # Keep track how many times the caller invoked us
-                self.stats[caller] = self.stats.get(caller, 0) + 1
+                # Warmup requests are not counted against the request limit
+                if not request_log.is_warmup:
+
+                    # Add to the total number of requests and check the value
+                    # to see if we should block any further request from being
+                    # processed because we will be shutting down
+                    self.stats['Total'] = self.stats.get('Total', 0) + 1
+
+                    # Keep track how many times the caller invoked us
+                    self.stats[caller] = self.stats.get(caller, 0) + 1
 
-                # Maybe stop serving
-                keep_going = self._keep_going()
-                if not keep_going:
-                    self._stop_serving()
+                    # Maybe start shutting down.
+                    # We keep serving while the shutdown is announced.
+                    keep_going = self._keep_going()
+                    if not keep_going:
+                        self.request_shutdown("request limit reached")
 
                 stats_str = str(self.stats)
 
         # We can do all this without the lock, making smaller critical section
         if not is_serving:
+            self._release_request_resources(request_log)
             message = f"Service refusing {str(caller)} request from {str(requestor_id)} to shut down cleanly"
             self.logger.info(message)
             context.abort(grpc.StatusCode.UNAVAILABLE, message)
 
         # Report
         request_log.metrics("Stats : %s", stats_str)
+
+        # Maybe profile the rest of the handling of this request
+        request_log.profile = self.request_profiler.maybe_start(caller)
+        self.watchdog.start_tracking(request_log, caller, requestor_id)
+
+        # Handlers that raise never get to finish_request(),
+        # so let go of the request when the handler is done regardless
+        self.handler_exit_interceptor.add_request(request_log)
         return request_log
 
     def finish_request(self, caller, requestor_id, request_log):
@@ -273,6 +775,11 @@ class ServerLifetime(RequestLogger):
         :param request_log: The RequestLoggerAdapter for the request
         """
 
+        if request_log.profile is not None:
+            self.request_profiler.finish(caller, request_log.profile)
+            request_log.profile = None
+        self._release_request_resources(request_log)
+
         # Log that the request was finsihed by the caller
         request_log.api("Done with %s request for %s",
                         str(caller), str(requestor_id))
@@ -282,10 +789,106 @@ class ServerLifetime(RequestLogger):
         stats_str = ""
         with self.lock:
             self.stats['NumProcessing'] = self.stats.get('NumProcessing', 0) - 1
+            self._count_abandoned(request_log)
             stats_str = str(self.stats)
+            if self.stats['NumProcessing'] <= 0:
+                self.drained.notify_all()
+        request_log.finish()
+
+        # Time spent in the handler, separate from time spent waiting for a thread
+        handler_seconds = time.monotonic() - request_log.start_time
+        if not request_log.is_warmup:
+            self.latency.record(HANDLER_LATENCY, handler_seconds)
+            self.latency.record(f"{HANDLER_LATENCY}:{caller}", handler_seconds)
+            self.tenant_accounting.record(request_log.tenant, handler_seconds)
+        timing = {"HandlerMs": round(handler_seconds * 1000.0, 3)}
+        if request_log.queue_wait_seconds is not None:
+            timing["QueueWaitMs"] = round(request_log.queue_wait_seconds * 1000.0, 3)
 
         # Report
         request_log.metrics("Stats : %s", stats_str)
+        request_log.metrics("Timing : %s", str(timing))
+
+    def _release_request_resources(self, request_log: RequestLoggerAdapter):
+        """
+        Gives back what the request holds and stops watching it. Called from
+        finish_request() and when the handler returns or raises, whichever
+        is first. Later calls do nothing.
+
+        :param request_log: The RequestLoggerAdapter for the request
+        """
+        # Only a handler that did not get to finish_request() still has its profile
+        if request_log.profile is not None:
+            self.request_profiler.abandon(request_log.profile)
+            request_log.profile = None
+        self.watchdog.stop_tracking(request_log)
+        with self.lock:
+            holds_quota = request_log.holds_quota
+            request_log.holds_quota = False
+        if holds_quota:
+            self.tenant_quotas.release(request_log.tenant)
+
+    @staticmethod
+    def _track_deadline(request_log: RequestLoggerAdapter, context):
+        """
+        Captures the client deadline and registers for notification of
+        the request terminating early.
+
+        :param request_log: The RequestLoggerAdapter for the request
+        :param context: a grpc.ServicerContext. Can be None.
+        """
+        if context is None:
+            return
+        request_log.set_time_remaining(get_client_time_remaining(context))
+        # add_callback() returns False if the RPC has already terminated
+        if not context.add_callback(request_log.on_terminated):
+            request_log.on_terminated()
+
+    def _count_abandoned(self, request_log: RequestLoggerAdapter):
+        """
+        Counts requests nobody was waiting for anymore in stats.
+        Must be called with the lock held.
+
+        :param request_log: The RequestLoggerAdapter for the request
+        """
+        if request_log.is_expired():
+            self.stats['DeadlineExceeded'] = self.stats.get('DeadlineExceeded', 0) + 1
+        elif request_log.is_cancelled():
+            self.stats['Cancelled'] = self.stats.get('Cancelled', 0) + 1
+
+    def create_process_offloader(self, max_workers: int = None, **kwargs):
+        """
+        Called by client code to create a pool of pre-warmed worker processes
+        to which CPU-heavy parts of request handling can be offloaded.
+        Offloaded work in flight counts towards NumProcessing when draining,
+        and the pool is shut down along with the server.
+
+        :param max_workers: The number of worker processes.
+                    Default of None means the number of CPUs.
+        :param kwargs: Other arguments to the ProcessOffloader constructor
+        :return: A new ProcessOffloader
+        """
+        # multiprocessing is only loaded for services that offload work
+        # pylint: disable=import-outside-toplevel
+        from leaf_server_common.server.process_offloader import ProcessOffloader
+
+        offloader = ProcessOffloader(max_workers=max_workers,
+                                     in_flight_counter=self.offload_in_flight,
+                                     **kwargs)
+        self.process_offloaders.append(offloader)
+        return offloader
+
+    def get_latency_snapshot(self):
+        """
+        :return: A dictionary of latency summaries: time requests spent waiting
+                for a worker thread, and time spent in handlers, overall
+                and per caller. Also includes worker pool metrics when
+                the adaptive pool is in use.
+        """
+        snapshot = self.latency.get_snapshot()
+        if isinstance(self.thread_pool, AdaptiveThreadPoolExecutor):
+            snapshot["worker_pool"] = self.thread_pool.get_metrics()
+        return snapshot
 
     def get_start_time_since_epoch(self):
         """
@@ -299,33 +902,139 @@ class ServerLifetime(RequestLogger):
         """
         return self.server_name_for_logs
 
+    def _get_total_requests(self) -> int:
+        with self.lock:
+            return self.stats.get('Total', 0)
+
     def _get_num_processing(self):
-        return self.stats.get('NumProcessing', 0)
+        return self.stats.get('NumProcessing', 0) + self.offload_in_flight.get_count()
 
     def _is_still_serving(self):
         """
-        Called by start_request() while holding the lock and also by
-        _poll_until_request_limit() while not holding the lock (fine).
+        Called by start_request() while holding the lock.
         """
         return self.stats.get('Serving', True)
 
-    def _stop_serving(self):
+    def _announce_not_serving(self):
         """
-        Called from start_request() from a block that holds the lock.
+        First stage of shutdown. Health checks report NOT_SERVING
+        so that the mesh can turn up another replica if it is told to
+        with in the policies cfg, but requests are still accepted.
         """
+        self.logger.info("Announcing no longer serving: %s", str(self.shutdown_reason))
 
-        self.stats['Serving'] = False
+        self._set_health_status("NOT_SERVING")
 
-        self.logger.info("Registered as no longer serving")
+    def _stop_serving(self):
+        """
+        Second stage of shutdown. New requests are refused from here on.
+        """
+        with self.lock:
+            self.stats['Serving'] = False
 
-        # Turn down the service in an orderly fashion so that the mesh can
-        # turn up another replica if it is told too with in the policies cfg
-        # pylint-protobuf cannot find enums defined within scope of a message
-        # pylint: disable=protobuf-undefined-attribute,no-member
-        self.health.set(self.server_name,
-                        health_pb2.HealthCheckResponse.ServingStatus.NOT_SERVING)
+        self.logger.info("Registered as no longer serving")
         self.health.enter_graceful_shutdown()
 
+    def _shut_down_in_stages(self):
+        """
+        Called from run() once the main loop is done.
+        Records how long each stage took in shutdown_metrics.
+        """
+        if self.shutdown_reason is None:
+            self.shutdown_reason = "main loop exited"
+
+        # Past this point in time we cut stages short
+        budget_deadline = None
+        if self.shutdown_budget_seconds is not None:
+            budget_deadline = time.monotonic() + self.shutdown_budget_seconds
+
+        stage_start = time.monotonic()
+        self._announce_not_serving()
+        self.shutdown_hurried.wait(self._fit_to_budget(self.shutdown_propagation_seconds, budget_deadline))
+        self.shutdown_metrics["PropagationSeconds"] = time.monotonic() - stage_start
+
+        stage_start = time.monotonic()
+        self._stop_serving()
+        # Leave time in the budget for the grace period of the final stop
+        drain_timeout = self._fit_to_budget(self.drain_timeout_seconds, budget_deadline,
+                                            reserve_seconds=self.stop_grace_seconds)
+        drained = self._drain_last_requests(drain_timeout)
+        self.shutdown_metrics["DrainSeconds"] = time.monotonic() - stage_start
+        self.shutdown_metrics["Drained"] = drained
+
+        stage_start = time.monotonic()
+        self.scheduler.stop(self._fit_to_budget(PERIODIC_TASK_STOP_SECONDS, budget_deadline,
+                                                reserve_seconds=self.stop_grace_seconds))
+        self.server_loop_callbacks.shutdown_callback()
+
+        # Anything offloaded still not done after draining will never be used
+        for offloader in self.process_offloaders:
+            offloader.shutdown(wait=False, cancel_futures=True)
+        self.shutdown_metrics["CallbackSeconds"] = time.monotonic() - stage_start
+
+        # Say what grew since warmup before the evidence goes away
+        if self.leak_diagnostics is not None:
+            stage_start = time.monotonic()
+            self.leak_diagnostics.write_report("shutdown", self._get_total_requests())
+            self.shutdown_metrics["LeakReportSeconds"] = time.monotonic() - stage_start
+
+        # Finally stop the service, giving any stragglers a chance to finish
+        stage_start = time.monotonic()
+        self.server.stop(self._fit_to_budget(self.stop_grace_seconds, budget_deadline)).wait()
+        self.shutdown_metrics["StopSeconds"] = time.monotonic() - stage_start
+
+        if self.gc_policy is not None:
+            self.gc_policy.uninstall()
+
+        self.logger.info("Shutdown stages : %s",
+                         str({key: round(value, 3) if isinstance(value, float) else value
+                              for key, value in self.shutdown_metrics.items()}))
+
+    @staticmethod
+    def _fit_to_budget(seconds: float, budget_deadline: float, reserve_seconds: float = 0.0) -> float:
+        """
+        :param seconds: The time a shutdown stage would like to take
+        :param budget_deadline: The time.monotonic() by which the whole
+                    shutdown has to be done, or None if there is no limit
+        :param reserve_seconds: Time to leave for later stages
+        :return: The time the stage can take within the budget
+        """
+        if budget_deadline is None:
+            return seconds
+        remaining = budget_deadline - time.monotonic() - reserve_seconds
+        return max(0.0, min(seconds, remaining))
+
+    def _install_signal_handlers(self) -> Dict[int, Any]:
+        """
+        Have SIGTERM, which is how kubernetes asks pods to go away, and SIGINT
+        start the same staged shutdown as reaching the request limit.
+        A second signal skips whatever is left of the propagation delay.
+        SIGUSR2 starts the sampling profiler.
+        Signal handlers can only be installed from the main thread.
+
+        :return: A dictionary of signal number to the handler that was
+                installed before, for restoring when run() is done
+        """
+        previous_handlers = {}
+        if threading.current_thread() is not threading.main_thread():
+            return previous_handlers
+
+        def on_signal(signum, _frame):
+            # Do the work on another thread, as the main thread might be
+            # interrupted while holding a lock request_shutdown() needs.
+            reason = f"received {signal.Signals(signum).name}"
+            threading.Thread(target=self._on_shutdown_signal, args=(reason,), daemon=True).start()
+
+        def on_profile_signal(_signum, _frame):
+            threading.Thread(target=self.start_profiling, daemon=True).start()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous_handlers[signum] = signal.signal(signum, on_signal)
+        # Not every platform has SIGUSR2
+        if hasattr(signal, "SIGUSR2"):
+            previous_handlers[signal.SIGUSR2] = signal.signal(signal.SIGUSR2, on_profile_signal)
+        return previous_handlers
+
     def _keep_going(self):
         '''
         Called by the start_request() method while holding a lock to see if
@@ -346,8 +1055,25 @@ class ServerLifetime(RequestLogger):
 
         return keep_at_it
 
+    def _set_health_status(self, status: str):
+        """
+        :param status: The name of the health_pb2 ServingStatus to report
+        """
+        # pylint: disable=import-outside-toplevel
+        from grpc_health.v1 import health_pb2
+
+        # pylint-protobuf cannot find enums defined within scope of a message
+        # pylint: disable=protobuf-undefined-attribute,no-member
+        self.health.set(self.server_name,
+                        health_pb2.HealthCheckResponse.ServingStatus.Value(status))
+
     def _set_up_health(self):
 
+        # pylint: disable=import-outside-toplevel
+        from grpc_health.v1 import health
+        from grpc_health.v1 import health_pb2_grpc
+        from grpc_reflection.v1alpha import reflection
+
         # default setup
         services = [self.server_name, 'grpc.health.v1.Health']
 
@@ -362,49 +1088,88 @@ class ServerLifetime(RequestLogger):
         reflection.enable_server_reflection(services, self.server)
         health_pb2_grpc.add_HealthServicer_to_server(self.health, self.server)
 
+        if self.enable_admin_service:
+            # pylint: disable=import-outside-toplevel
+            from leaf_server_common.server.admin_service import AdminService
+            self.admin_service = AdminService(self)
+            self.server.add_generic_rpc_handlers((self.admin_service.create_handler(),))
+
     def _set_up_ports(self):
 
         # All IPv6 interfaces should listen
-        self.server.add_insecure_port(f"[::]:{self.port}")
+        self.bound_port = self.server.add_insecure_port(f"[::]:{self.port}")
 
     def _start_server(self):
 
         self.server.start()
 
+        # Get the slow first-time work out of the way before taking real traffic
+        if self.warmup is not None:
+            self.warmup_metrics = self.warmup.run(self.bound_port)
+        if self.warmup_metrics.get("WarmupSeconds"):
+            self.latency.record(WARMUP_LATENCY, self.warmup_metrics.get("WarmupSeconds"))
+            self.logger.info("Warmup : %s", str(self.warmup_metrics))
+
+        # Whatever is alive now is here to stay
+        if self.gc_policy is not None:
+            self.gc_policy.after_warmup()
+
+        # Everything warmup left behind is the baseline for leak diagnostics
+        if self.leak_diagnostics is not None:
+            self.leak_diagnostics.take_snapshot("warmup", self._get_total_requests())
+
         # Activate the instance as healthy
-        # pylint-protobuf cannot find enums defined within scope of a message
-        # pylint: disable=protobuf-undefined-attribute,no-member
-        self.health.set(self.server_name,
-                        health_pb2.HealthCheckResponse.ServingStatus.SERVING)
+        self._set_health_status("SERVING")
         self.logger.info("%s started.", str(self.server_name_for_logs))
 
     def _poll_until_request_limit(self):
 
-        # Poll the service every so often to see if it thinks its instance
-        # should keep going.  When it says no, break out of the loop
-        # and report ill health so infrastructure can restart this service.
+        # Wait until something decides this instance should not keep going,
+        # like reaching the request limit or a signal, so that infrastructure
+        # can restart this service. Periodic tasks do any other work.
         try:
-            while self._is_still_serving():
-                server_active: bool = bool(self.server_loop_callbacks.loop_callback())
+            while not self.shutdown_requested.is_set():
+                self.shutdown_requested.wait(self.loop_sleep_seconds)
 
-                # At least yield the processor if the server is active.
-                sleep_seconds: float = self.active_sleep_seconds
-                if not server_active:
-                    sleep_seconds = self.loop_sleep_seconds
+        except KeyboardInterrupt:
+            self.shutdown_reason = "interrupted"
 
-                time.sleep(sleep_seconds)
+    def _call_loop_callback(self):
+        """
+        Periodic task adapting ServerLoopCallbacks.loop_callback().
+        The time until the next call depends on whether the server
+        reports itself as active.
+        """
+        server_active: bool = bool(self.server_loop_callbacks.loop_callback())
 
-        except KeyboardInterrupt:
-            pass
+        # At least yield the processor if the server is active.
+        interval_seconds: float = self.active_sleep_seconds
+        if not server_active:
+            interval_seconds = self.loop_sleep_seconds
+        self._loop_callback_task.interval_seconds = interval_seconds
 
-    def _drain_last_requests(self):
+        # Quiet times are the least harmful times to collect garbage
+        if self.gc_policy is not None:
+            self.gc_policy.maybe_collect(server_active, self._get_num_processing())
+
+    def _drain_last_requests(self, timeout_seconds: float) -> bool:
+        """
+        :param timeout_seconds: The longest time to wait
+        :return: True if all requests finished before the timeout
+        """
 
         # Wait for the NumProcessing to go to 0 before issuing the stop
         # so that existing requests doesn't get truncated.
-        # But we don't want to wait forever
-        num_minutes_wait = 15
-        while self._get_num_processing() > 0 \
-                and num_minutes_wait > 0:
-
-            time.sleep(ONE_MINUTE_IN_SECONDS)
-            num_minutes_wait = num_minutes_wait - 1
+        # But we don't want to wait forever.
+        # finish_request() wakes us as soon as the last request is done.
+        # Offloaded work does not, so check every so often regardless.
+        deadline = time.monotonic() + timeout_seconds
+        with self.drained:
+            while self._get_num_processing() > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0.0:
+                    self.logger.warning("Gave up waiting on %d requests to finish: %s",
+                                        self._get_num_processing(), str(self.get_in_flight_requests()))
+                    return False
+                self.drained.wait(min(DRAIN_POLL_SECONDS, remaining))
+        return True
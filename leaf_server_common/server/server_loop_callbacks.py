@@ -23,7 +23,9 @@ class ServerLoopCallbacks:
 
     def loop_callback(self) -> bool:
         """
-        Periodically called by the main server loop of ServerLifetime.
+        Periodically called by ServerLifetime from a thread dedicated
+        to periodic tasks. The time until the next call depends on
+        whether the server reports itself as active.
         :return: True if the server is considered active. False or None otherwise
         """
         # Do nothing
@@ -31,6 +33,7 @@ class ServerLoopCallbacks:
 
     def shutdown_callback(self):
         """
-        Called by the main server loop when it's time to shut down.
+        Called by the main server loop when it's time to shut down,
+        after the last loop_callback() has finished.
         """
         # Do nothing
@@ -18,9 +18,6 @@
 from datetime import datetime
 import time
 
-from leaf_common.persistence.easy.easy_txt_persistence \
-    import EasyTxtPersistence
-
 
 class ServiceInfo():
     """
@@ -71,6 +68,9 @@ class ServiceInfo():
         """
         :return: the service version
         """
+        # leaf_common persistence pulls in a lot, so only load it when asked
+        # pylint: disable=import-outside-toplevel
+        from leaf_common.persistence.easy.easy_txt_persistence import EasyTxtPersistence
         persistence = EasyTxtPersistence(base_name="service_version")
         version = persistence.restore()
         if version is not None:
@@ -82,6 +82,8 @@ class ServiceInfo():
         """
         :return: the last commit
         """
+        # pylint: disable=import-outside-toplevel
+        from leaf_common.persistence.easy.easy_txt_persistence import EasyTxtPersistence
         persistence = EasyTxtPersistence(base_name="last_commit")
         last_commit = persistence.restore()
         if last_commit is not None:
@@ -0,0 +1,105 @@
+
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import List
+from typing import Tuple
+
+import threading
+
+
+class ShardedCounter():
+    """
+    A counter for write-heavy use by many threads at once.
+
+    Each thread increments its own private cell without taking any lock,
+    so writers never contend with each other. Reads sum up all the cells,
+    which costs time proportional to the number of threads that have
+    written, and so should be comparatively rare.
+
+    Only increment/decrement are supported. For read-modify-write
+    operations such as compare-and-set, use AtomicCounter.
+    """
+
+    def __init__(self, value: int = 0):
+        """
+        Constructor
+
+        :param value: The initial value of the counter. Default is 0.
+        """
+        # Protects _base and _cells, but is not taken on the write path
+        self._lock = threading.Lock()
+
+        # Accumulated value of cells of threads that have gone away
+        self._base: int = int(value)
+
+        # Each thread's cell is a single element list only that thread writes to.
+        self._cells: List[Tuple[threading.Thread, List[int]]] = []
+        self._local = threading.local()
+
+    def increment(self, step: int = 1):
+        """
+        Increment the counter
+
+        :param step: The amount by which the counter should be incremented.
+                     Default is 1.
+        """
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = self._new_cell()
+        cell[0] += int(step)
+
+    def decrement(self, step: int = 1):
+        """
+        Decrement the counter
+
+        :param step: The amount by which the counter should be decremented.
+                     Default is 1.
+        """
+        self.increment(-step)
+
+    def get_count(self) -> int:
+        """
+        :return: The value of the counter. Increments happening concurrently
+                with the read may or may not be included.
+        """
+        with self._lock:
+            total = self._base
+            for _, cell in self._cells:
+                total += cell[0]
+        return total
+
+    def _new_cell(self) -> List[int]:
+        """
+        Called the first time a thread increments the counter.
+        Also folds in the cells of threads that have finished,
+        so the number of cells stays close to the number of live threads.
+
+        :return: The new cell for the current thread
+        """
+        cell: List[int] = [0]
+        with self._lock:
+            live_cells = []
+            for thread, other_cell in self._cells:
+                if thread.is_alive():
+                    live_cells.append((thread, other_cell))
+                else:
+                    # Thread is gone, so nothing else will write to its cell
+                    self._base += other_cell[0]
+            live_cells.append((threading.current_thread(), cell))
+            self._cells = live_cells
+        self._local.cell = cell
+        return cell
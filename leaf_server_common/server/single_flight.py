@@ -0,0 +1,351 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from collections import OrderedDict
+from threading import Event
+from threading import Lock
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import time
+
+import grpc
+
+from leaf_server_common.logging.request_logger_adapter import get_client_time_remaining
+
+# Default upper bound on the memory taken by cached responses
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Rough per-entry bookkeeping overhead counted against the cache size
+# in addition to the key and response bytes themselves
+ENTRY_OVERHEAD_BYTES = 128
+
+# Default request metadata whose values must match for requests to share
+# a response, so that one user is never answered with another's response
+DEFAULT_KEY_METADATA = ["user_id"]
+
+
+# pylint: disable=too-few-public-methods
+class SingleFlightPolicy():
+    """
+    Describes how requests to a single idempotent, read-only unary method
+    are to be shared between callers.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self, coalesce: bool = True, cache_ttl_seconds: float = 0.0,
+                 max_response_bytes: int = 1024 * 1024,
+                 key_metadata: List[str] = None, caller: str = None):
+        """
+        Constructor
+
+        :param coalesce: When True, concurrent identical requests share
+                    a single execution of the handler. Default is True.
+        :param cache_ttl_seconds: When greater than 0, successful responses
+                    are cached for this long and identical requests are
+                    answered from the cache. Default of 0 means no caching.
+        :param max_response_bytes: Responses larger than this are never cached.
+                    Default is 1MB.
+        :param key_metadata: The request metadata keys whose values must also
+                    be the same for requests to count as identical.
+                    Default of None means DEFAULT_KEY_METADATA.
+                    An empty list shares responses between everyone.
+        :param caller: The name the handler gives start_request() for this
+                    method, under which requests answered without running
+                    the handler are counted in the ServerLifetime stats.
+                    Default of None means the method name, like "Method".
+        """
+        self.coalesce: bool = coalesce
+        self.cache_ttl_seconds: float = cache_ttl_seconds
+        self.max_response_bytes: int = max_response_bytes
+        self.key_metadata: List[str] = key_metadata
+        if self.key_metadata is None:
+            self.key_metadata = DEFAULT_KEY_METADATA
+        self.caller: str = caller
+
+
+class ResponseCache():
+    """
+    Thread-safe TTL + LRU cache of serialized responses whose memory
+    is bounded by bytes rather than by number of entries.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        """
+        Constructor
+
+        :param max_bytes: The maximum number of bytes of keys and
+                    responses kept in the cache
+        """
+        self.max_bytes: int = max_bytes
+        self._lock = Lock()
+        # Maps key -> (expiry time, response bytes, size), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._num_bytes: int = 0
+        self._evictions: int = 0
+
+    def get(self, key: Tuple[str, bytes]) -> bytes:
+        """
+        :param key: The (method and key metadata, request bytes) key
+        :return: The cached response bytes, or None if there is no
+                unexpired entry for the key
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            expiry, response, _ = entry
+            if time.monotonic() >= expiry:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: Tuple[str, bytes], response: bytes, ttl_seconds: float):
+        """
+        :param key: The (method and key metadata, request bytes) key
+        :param response: The serialized response
+        :param ttl_seconds: How long the entry is good for
+        """
+        size = len(key[0]) + len(key[1]) + len(response) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl_seconds, response, size)
+            self._num_bytes += size
+
+            # Evict least recently used entries until we fit
+            while self._num_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        :return: A dictionary describing the size of the cache
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._num_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions
+            }
+
+    def _remove(self, key: Tuple[str, bytes]):
+        """
+        Removes an entry. Must be called with the lock held.
+        """
+        _, _, size = self._entries.pop(key)
+        self._num_bytes -= size
+
+
+# pylint: disable=too-few-public-methods
+class _Flight():
+    """
+    A single in-flight execution of a handler whose result is shared
+    with identical requests that arrived while it was running.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.done = Event()
+        self.response: bytes = None
+
+
+class SingleFlightInterceptor(grpc.ServerInterceptor):
+    """
+    gRPC server interceptor which lets concurrent identical requests
+    (same method, same serialized request, same values of the policy's
+    key metadata) to selected idempotent unary methods share one execution
+    of the handler, optionally caching the serialized response for a short time.
+
+    Only successful responses are shared. When the leading execution fails,
+    each waiting request runs the handler itself. Requests answered from a
+    shared execution or the cache do not see any metadata the handler sets.
+    They still go through start_request() and finish_request() of the
+    ServerLifetime, so they are counted in its stats like any other.
+    """
+
+    def __init__(self, policies: Dict[str, SingleFlightPolicy],
+                 max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+                 lifetime=None):
+        """
+        Constructor
+
+        :param policies: A dictionary of full method names,
+                    like "/package.Service/Method", to the SingleFlightPolicy
+                    for that method. Methods not listed are left alone.
+        :param max_cache_bytes: The maximum number of bytes of responses
+                    to cache across all methods. Default is 64MB.
+        :param lifetime: The ServerLifetime counting requests answered without
+                    running the handler. Default of None means the ServerLifetime
+                    this interceptor is given to.
+        """
+        self.policies: Dict[str, SingleFlightPolicy] = policies
+        self.cache = ResponseCache(max_cache_bytes)
+        self.lifetime = lifetime
+
+        self._lock = Lock()
+        self._flights: Dict[Tuple[str, bytes], _Flight] = {}
+        self._metrics: Dict[str, Dict[str, int]] = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        """
+        :param continuation: Function returning the next RpcMethodHandler
+        :param handler_call_details: Describes the method being called
+        :return: The RpcMethodHandler to use for the call
+        """
+        handler = continuation(handler_call_details)
+        method = handler_call_details.method
+        policy = self.policies.get(method, None)
+        if handler is None or policy is None \
+                or handler.request_streaming or handler.response_streaming \
+                or handler.unary_unary is None:
+            return handler
+
+        def shared_behavior(request_bytes: bytes, context) -> bytes:
+            return self._handle(method, policy, handler, request_bytes, context)
+
+        # Receive and return raw bytes so requests can be compared and
+        # responses shared without being parsed more than once
+        return grpc.unary_unary_rpc_method_handler(shared_behavior)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary of per-method counts of handler executions,
+                coalesced requests and cache hits, along with the size
+                of the response cache
+        """
+        with self._lock:
+            metrics = {method: dict(counts) for method, counts in self._metrics.items()}
+        metrics["cache"] = self.cache.get_metrics()
+        return metrics
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def _handle(self, method: str, policy: SingleFlightPolicy, handler,
+                request_bytes: bytes, context) -> bytes:
+        """
+        :return: The serialized response for the request
+        """
+        key = (self._get_scope(method, policy, context), request_bytes)
+        if policy.cache_ttl_seconds > 0.0:
+            response = self.cache.get(key)
+            if response is not None:
+                self._count(method, "cache_hits")
+                self._record_request(method, policy, context)
+                return response
+
+        if not policy.coalesce:
+            response, _ = self._execute(method, policy, handler, key, context)
+            return response
+
+        with self._lock:
+            flight = self._flights.get(key, None)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if is_leader:
+            try:
+                response, succeeded = self._execute(method, policy, handler, key, context)
+                if succeeded:
+                    flight.response = response
+                return response
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+                flight.done.set()
+
+        # Follow the leader, but no longer than our own deadline allows
+        if flight.done.wait(get_client_time_remaining(context)) and flight.response is not None:
+            self._count(method, "coalesced")
+            self._record_request(method, policy, context)
+            return flight.response
+
+        # The leader failed or we ran out of time waiting. Do it ourselves.
+        response, _ = self._execute(method, policy, handler, key, context)
+        return response
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def _execute(self, method: str, policy: SingleFlightPolicy, handler,
+                 key: Tuple[str, bytes], context) -> Tuple[bytes, bool]:
+        """
+        Runs the real handler on the request.
+
+        :return: A tuple of the serialized response and whether or not
+                the handler succeeded, meaning the response can be shared.
+                Raises whatever the handler raises.
+        """
+        self._count(method, "executions")
+        request = key[1]
+        if handler.request_deserializer is not None:
+            request = handler.request_deserializer(request)
+
+        response = handler.unary_unary(request, context)
+        if handler.response_serializer is not None:
+            response = handler.response_serializer(response)
+
+        # A handler can fail by setting a status code without raising
+        code = context.code() if hasattr(context, "code") else None
+        if code not in (None, grpc.StatusCode.OK) or response is None:
+            return response, False
+
+        if policy.cache_ttl_seconds > 0.0 and len(response) <= policy.max_response_bytes:
+            self.cache.put(key, response, policy.cache_ttl_seconds)
+        return response, True
+
+    @staticmethod
+    def _get_scope(method: str, policy: SingleFlightPolicy, context) -> str:
+        """
+        :return: The part of the key for a request besides the request itself:
+                the method, along with the values of the policy's key metadata
+        """
+        if not policy.key_metadata:
+            return method
+        metadata = dict(context.invocation_metadata() or ())
+        values = [str(metadata.get(key, "")) for key in policy.key_metadata]
+        # Metadata values cannot contain NUL characters
+        return "\0".join([method] + values)
+
+    def _record_request(self, method: str, policy: SingleFlightPolicy, context):
+        """
+        Counts a request answered without running the handler in the
+        ServerLifetime stats, as the handler would have
+        """
+        if self.lifetime is None:
+            return
+        caller = policy.caller
+        if caller is None:
+            caller = method.rsplit("/", 1)[-1]
+        request_log = self.lifetime.start_request(caller, context.peer(), context)
+        self.lifetime.finish_request(caller, context.peer(), request_log)
+
+    def _count(self, method: str, name: str):
+        """
+        Increments a per-method metric
+        """
+        with self._lock:
+            counts = self._metrics.setdefault(method, {"executions": 0, "coalesced": 0, "cache_hits": 0})
+            counts[name] += 1
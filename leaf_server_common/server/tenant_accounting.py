@@ -0,0 +1,281 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from threading import Lock
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import time
+
+# Default number of tenants whose usage is tracked individually
+DEFAULT_MAX_TRACKED_TENANTS = 100
+
+# Default number of idle tenants' rate buckets kept around before
+# full buckets are forgotten
+DEFAULT_MAX_RATE_BUCKETS = 10000
+
+
+class SpaceSavingCounter():
+    """
+    Keeps approximate totals for the heaviest keys out of an unbounded
+    number of keys in bounded memory, using the Space-Saving algorithm of
+    Metwally, Agrawal and El Abbadi.
+
+    At most capacity keys are kept. A key not already kept takes over the
+    slot of the key with the smallest total, inheriting that total as its
+    possible overcount. Any key whose true total is more than the sum of
+    all amounts divided by capacity is guaranteed to be kept, and no
+    total is ever undercounted.
+
+    Not thread-safe on its own.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_MAX_TRACKED_TENANTS):
+        """
+        Constructor
+
+        :param capacity: The number of keys kept
+        """
+        self.capacity: int = capacity
+        # Maps key -> [total, possible overcount]
+        self._totals: Dict[str, List[float]] = {}
+
+    def add(self, key: str, amount: float = 1.0):
+        """
+        :param key: The key to add to
+        :param amount: The amount to add
+        """
+        entry = self._totals.get(key)
+        if entry is not None:
+            entry[0] += amount
+            return
+        if len(self._totals) < self.capacity:
+            self._totals[key] = [amount, 0.0]
+            return
+
+        # Take over the slot of the smallest. Capacities are small,
+        # so a scan is cheaper than keeping a heap up to date.
+        smallest_key = min(self._totals, key=lambda some_key: self._totals[some_key][0])
+        smallest_total = self._totals.pop(smallest_key)[0]
+        self._totals[key] = [smallest_total + amount, smallest_total]
+
+    def get(self, key: str) -> Tuple[float, float]:
+        """
+        :param key: The key to look up
+        :return: A tuple of the estimated total for the key and how much
+                of that might be overcount. (0.0, 0.0) if the key is not kept.
+        """
+        entry = self._totals.get(key)
+        if entry is None:
+            return (0.0, 0.0)
+        return (entry[0], entry[1])
+
+    def get_top(self, num: int = None) -> List[Tuple[str, float, float]]:
+        """
+        :param num: The number of keys wanted. Default of None means all kept.
+        :return: A list of (key, estimated total, possible overcount) tuples,
+                largest total first
+        """
+        ordered = sorted(self._totals.items(), key=lambda item: item[1][0], reverse=True)
+        if num is not None:
+            ordered = ordered[:num]
+        return [(key, total, error) for key, (total, error) in ordered]
+
+
+class TenantAccounting():
+    """
+    Thread-safe bounded-cardinality accounting of requests and handler time
+    per tenant, where a tenant is one of the structured logging fields
+    taken from request metadata, like user_id.
+    """
+
+    def __init__(self, max_tracked_tenants: int = DEFAULT_MAX_TRACKED_TENANTS):
+        """
+        Constructor
+
+        :param max_tracked_tenants: The number of heaviest tenants tracked
+                    individually for each measure
+        """
+        self._lock = Lock()
+        self._requests = SpaceSavingCounter(max_tracked_tenants)
+        self._handler_seconds = SpaceSavingCounter(max_tracked_tenants)
+
+    def record(self, tenant: str, handler_seconds: float):
+        """
+        :param tenant: The tenant the request was for
+        :param handler_seconds: Time spent handling the request
+        """
+        with self._lock:
+            self._requests.add(tenant, 1.0)
+            self._handler_seconds.add(tenant, handler_seconds)
+
+    def get_top(self, num: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        :param num: The number of tenants wanted for each measure
+        :return: A dictionary with the heaviest tenants by "requests" and by
+                "handler_seconds", each a list of dictionaries with the tenant,
+                its estimated total and how much of that might be overcount
+        """
+        with self._lock:
+            by_requests = self._requests.get_top(num)
+            by_seconds = self._handler_seconds.get_top(num)
+        return {
+            "requests": [{"tenant": tenant, "total": int(total), "error": int(error)}
+                         for tenant, total, error in by_requests],
+            "handler_seconds": [{"tenant": tenant, "total": round(total, 3), "error": round(error, 3)}
+                                for tenant, total, error in by_seconds]
+        }
+
+
+# pylint: disable=too-few-public-methods
+class TenantQuota():
+    """
+    Limits on the requests of a single tenant
+    """
+
+    def __init__(self, max_concurrent: int = None, rate_per_second: float = None,
+                 burst: float = None):
+        """
+        Constructor
+
+        :param max_concurrent: The most requests for the tenant handled
+                    at the same time. Default of None means no limit.
+        :param rate_per_second: The sustained rate of requests allowed for
+                    the tenant. Default of None means no limit.
+        :param burst: The number of requests allowed at once above the
+                    sustained rate. Default of None means the rate per second,
+                    or 1 if that is less.
+        """
+        self.max_concurrent: int = max_concurrent
+        self.rate_per_second: float = rate_per_second
+        self.burst: float = burst
+        if self.burst is None and self.rate_per_second is not None:
+            self.burst = max(1.0, self.rate_per_second)
+
+
+class TenantQuotas():
+    """
+    Thread-safe enforcement of per-tenant concurrency limits and
+    token-bucket rate limits.
+
+    Only tenants with requests in progress, and tenants whose rate bucket
+    is not full, take any memory beyond a bounded number of idle buckets.
+    """
+
+    def __init__(self, default_quota: TenantQuota = None, quotas: Dict[str, TenantQuota] = None,
+                 max_rate_buckets: int = DEFAULT_MAX_RATE_BUCKETS):
+        """
+        Constructor
+
+        :param default_quota: The TenantQuota for tenants not in quotas.
+                    Default of None means such tenants are not limited.
+        :param quotas: An optional dictionary of tenant to its own TenantQuota
+        :param max_rate_buckets: The number of rate buckets kept before
+                    the buckets of idle tenants are forgotten
+        """
+        self.default_quota: TenantQuota = default_quota
+        self.quotas: Dict[str, TenantQuota] = dict(quotas or {})
+        self.max_rate_buckets: int = max_rate_buckets
+
+        self._lock = Lock()
+        self._concurrent: Dict[str, int] = {}
+        # Maps tenant -> [tokens, time.monotonic() of last refill]
+        self._buckets: Dict[str, List[float]] = {}
+
+    def get_quota(self, tenant: str) -> TenantQuota:
+        """
+        :param tenant: The tenant
+        :return: The TenantQuota that applies to the tenant, or None
+        """
+        return self.quotas.get(tenant, self.default_quota)
+
+    def try_acquire(self, tenant: str) -> str:
+        """
+        Called when a request for the tenant starts. A successful call must
+        be matched by a call to release() when the request is done.
+
+        :param tenant: The tenant
+        :return: None if the request may go ahead, otherwise a string
+                saying which quota it would exceed
+        """
+        quota = self.get_quota(tenant)
+        if quota is None:
+            return None
+
+        with self._lock:
+            concurrent = self._concurrent.get(tenant, 0)
+            if quota.max_concurrent is not None and concurrent >= quota.max_concurrent:
+                return f"concurrency quota of {quota.max_concurrent}"
+
+            if quota.rate_per_second is not None and not self._take_token(tenant, quota):
+                return f"rate quota of {quota.rate_per_second}/s"
+
+            self._concurrent[tenant] = concurrent + 1
+        return None
+
+    def release(self, tenant: str):
+        """
+        Called when a request allowed by try_acquire() is done
+
+        :param tenant: The tenant
+        """
+        with self._lock:
+            concurrent = self._concurrent.get(tenant, 0) - 1
+            if concurrent > 0:
+                self._concurrent[tenant] = concurrent
+            else:
+                self._concurrent.pop(tenant, None)
+
+    def get_concurrent(self) -> Dict[str, int]:
+        """
+        :return: A dictionary of tenant to its number of requests in progress
+                for tenants with quotas
+        """
+        with self._lock:
+            return dict(self._concurrent)
+
+    def _take_token(self, tenant: str, quota: TenantQuota) -> bool:
+        """
+        Called with the lock held.
+        :return: True if the tenant's bucket had a token to take
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(tenant)
+        if bucket is None:
+            if len(self._buckets) >= self.max_rate_buckets:
+                self._forget_full_buckets(now)
+            bucket = [quota.burst, now]
+            self._buckets[tenant] = bucket
+
+        bucket[0] = min(quota.burst, bucket[0] + (now - bucket[1]) * quota.rate_per_second)
+        bucket[1] = now
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
+
+    def _forget_full_buckets(self, now: float):
+        """
+        A bucket that would be full by now is the same as no bucket at all.
+        Called with the lock held.
+        """
+        for tenant, (tokens, last_time) in list(self._buckets.items()):
+            quota = self.get_quota(tenant)
+            if quota is None or quota.rate_per_second is None \
+                    or tokens + (now - last_time) * quota.rate_per_second >= quota.burst:
+                del self._buckets[tenant]
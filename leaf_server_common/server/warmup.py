@@ -0,0 +1,272 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import base64
+import hmac
+import json
+import logging
+import os
+import random
+import secrets
+import time
+
+import grpc
+
+# Metadata sent along with replayed requests so handlers can tell them apart.
+# Its value is the token of the ServerWarmup replaying them.
+WARMUP_METADATA_KEY = "x-leaf-warmup"
+
+# Length in bytes of the random token replayed requests carry
+WARMUP_TOKEN_BYTES = 16
+
+# Default bounds on what a RequestRecorder keeps
+DEFAULT_MAX_SAMPLES_PER_METHOD = 32
+DEFAULT_MAX_SAMPLE_BYTES = 1024 * 1024
+
+
+class RequestRecorder(grpc.ServerInterceptor):
+    """
+    gRPC server interceptor keeping a uniform random sample of the serialized
+    requests to unary methods, so they can be saved and replayed to warm up
+    the next instance of the service.
+    """
+
+    def __init__(self, methods: List[str] = None,
+                 max_samples_per_method: int = DEFAULT_MAX_SAMPLES_PER_METHOD,
+                 max_sample_bytes: int = DEFAULT_MAX_SAMPLE_BYTES):
+        """
+        Constructor
+
+        :param methods: An optional list of full method names,
+                    like "/package.Service/Method", to record.
+                    Default of None means all unary methods.
+        :param max_samples_per_method: The number of requests to keep per method
+        :param max_sample_bytes: Requests larger than this are not kept
+        """
+        self.methods: List[str] = methods
+        self.max_samples_per_method: int = max_samples_per_method
+        self.max_sample_bytes: int = max_sample_bytes
+
+        self._lock = Lock()
+        self._samples: Dict[str, List[bytes]] = {}
+        self._num_seen: Dict[str, int] = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        """
+        :param continuation: Function returning the next RpcMethodHandler
+        :param handler_call_details: Describes the method being called
+        :return: The RpcMethodHandler to use for the call
+        """
+        handler = continuation(handler_call_details)
+        method = handler_call_details.method
+        if self.methods is not None and method not in self.methods:
+            return handler
+        if handler is None or handler.request_streaming or handler.response_streaming \
+                or handler.unary_unary is None:
+            return handler
+
+        def recording_behavior(request_bytes: bytes, context):
+            self.record(method, request_bytes)
+            request = request_bytes
+            if handler.request_deserializer is not None:
+                request = handler.request_deserializer(request_bytes)
+            return handler.unary_unary(request, context)
+
+        return grpc.unary_unary_rpc_method_handler(recording_behavior,
+                                                   response_serializer=handler.response_serializer)
+
+    def record(self, method: str, request_bytes: bytes):
+        """
+        Offers a request to the sample. Uses reservoir sampling so that
+        every request seen has the same chance of being kept.
+
+        :param method: The full method name
+        :param request_bytes: The serialized request
+        """
+        if len(request_bytes) > self.max_sample_bytes:
+            return
+        with self._lock:
+            num_seen = self._num_seen.get(method, 0) + 1
+            self._num_seen[method] = num_seen
+            samples = self._samples.setdefault(method, [])
+            if len(samples) < self.max_samples_per_method:
+                samples.append(request_bytes)
+            else:
+                index = random.randrange(num_seen)
+                if index < self.max_samples_per_method:
+                    samples[index] = request_bytes
+
+    def get_samples(self) -> List[Tuple[str, bytes]]:
+        """
+        :return: A list of (method, serialized request) tuples
+        """
+        with self._lock:
+            return [(method, request_bytes)
+                    for method, samples in self._samples.items()
+                    for request_bytes in samples]
+
+    def save(self, file_name: str):
+        """
+        Writes the sample to a file, replacing it atomically
+
+        :param file_name: The file to write to
+        """
+        samples = [{"method": method, "request": base64.b64encode(request_bytes).decode("ascii")}
+                   for method, request_bytes in self.get_samples()]
+        temp_file_name = f"{file_name}.tmp"
+        with open(temp_file_name, "w", encoding="utf-8") as samples_file:
+            json.dump(samples, samples_file)
+        os.replace(temp_file_name, file_name)
+
+    @staticmethod
+    def load(file_name: str) -> List[Tuple[str, bytes]]:
+        """
+        :param file_name: A file written by save()
+        :return: A list of (method, serialized request) tuples.
+                Empty if the file does not exist.
+        """
+        if not os.path.exists(file_name):
+            return []
+        with open(file_name, "r", encoding="utf-8") as samples_file:
+            samples = json.load(samples_file)
+        return [(sample.get("method"), base64.b64decode(sample.get("request")))
+                for sample in samples]
+
+
+class ServerWarmup():
+    """
+    Runs service-provided warmup tasks and replays sample requests against
+    a freshly started server before it reports itself as SERVING,
+    so the first real requests do not pay for cold caches and lazy loading.
+    """
+
+    def __init__(self, logger: logging.Logger, timeout_seconds: float = 60.0,
+                 parallelism: int = 1):
+        """
+        Constructor
+
+        :param logger: The logger to report progress to
+        :param timeout_seconds: The longest time to spend warming up overall
+        :param parallelism: The number of warmup tasks and replayed
+                    requests run at the same time. Default is 1.
+        """
+        self.logger: logging.Logger = logger
+        self.timeout_seconds: float = timeout_seconds
+        self.parallelism: int = parallelism
+        self.tasks: Dict[str, Callable[[], Any]] = {}
+        self.requests: List[Tuple[str, bytes]] = []
+
+        # Clients could send WARMUP_METADATA_KEY themselves to skip quotas and stats,
+        # so only requests carrying this process's token while run() is going count.
+        self.token: str = secrets.token_hex(WARMUP_TOKEN_BYTES)
+        self.running: bool = False
+
+    def add_task(self, name: str, function: Callable[[], Any]):
+        """
+        :param name: The name of the task for logs
+        :param function: A function taking no arguments, like one that
+                    loads a model or fills a cache
+        """
+        self.tasks[name] = function
+
+    def add_requests(self, requests: List[Tuple[str, bytes]]):
+        """
+        :param requests: A list of (full method name, serialized request)
+                    tuples to replay, like those from RequestRecorder.load()
+        """
+        self.requests.extend(requests)
+
+    def is_warmup_request(self, metadata_dict: Dict[str, Any]) -> bool:
+        """
+        :param metadata_dict: The request metadata as a dictionary. Can be None.
+        :return: True if the request is one replayed by run() while it is running
+        """
+        if not self.running or metadata_dict is None:
+            return False
+        token = metadata_dict.get(WARMUP_METADATA_KEY)
+        return isinstance(token, str) and hmac.compare_digest(token, self.token)
+
+    def run(self, port: int) -> Dict[str, Any]:
+        """
+        Runs all warmup tasks, then replays all requests against the
+        server listening on the given local port, within the timeout.
+        Failures are logged and counted, never raised.
+
+        :param port: The port the server is listening on
+        :return: A dictionary of warmup metrics
+        """
+        metrics = {
+            "WarmupSeconds": 0.0,
+            "TasksRun": 0,
+            "TasksFailed": 0,
+            "RequestsReplayed": 0,
+            "RequestsFailed": 0,
+            "TimedOut": False
+        }
+        if not self.tasks and not self.requests:
+            return metrics
+
+        start_time = time.monotonic()
+        deadline = start_time + self.timeout_seconds
+        pool = futures.ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="warmup")
+        self.running = True
+        try:
+            task_futures = {pool.submit(function): name for name, function in self.tasks.items()}
+            self._wait(task_futures, deadline, metrics, "Tasks")
+
+            if self.requests and time.monotonic() < deadline:
+                with grpc.insecure_channel(f"localhost:{port}") as channel:
+                    request_futures = {pool.submit(self._replay, channel, method, request_bytes, deadline): method
+                                       for method, request_bytes in self.requests}
+                    self._wait(request_futures, deadline, metrics, "Requests")
+        finally:
+            # Anything still going is abandoned
+            self.running = False
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        metrics["WarmupSeconds"] = time.monotonic() - start_time
+        return metrics
+
+    def _replay(self, channel: grpc.Channel, method: str, request_bytes: bytes, deadline: float):
+        """
+        Sends one recorded request to the server
+        """
+        call = channel.unary_unary(method)
+        return call(request_bytes, timeout=max(0.001, deadline - time.monotonic()),
+                    metadata=((WARMUP_METADATA_KEY, self.token),), wait_for_ready=True)
+
+    def _wait(self, pending: Dict[futures.Future, str], deadline: float,
+              metrics: Dict[str, Any], kind: str):
+        """
+        Waits for warmup work to finish and counts the outcomes
+        """
+        done, not_done = futures.wait(pending, timeout=max(0.0, deadline - time.monotonic()))
+        for future in done:
+            if future.exception() is not None:
+                metrics[f"{kind}Failed"] += 1
+                self.logger.warning("Warmup of %s failed: %s", pending.get(future), str(future.exception()))
+        metrics["TasksRun" if kind == "Tasks" else "RequestsReplayed"] += len(done)
+        if not_done:
+            metrics["TimedOut"] = True
+            self.logger.warning("Warmup timed out with %d %s not done", len(not_done), kind.lower())
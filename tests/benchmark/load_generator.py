@@ -0,0 +1,199 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import math
+import threading
+import time
+
+import grpc
+
+# Percentiles of latency reported in results
+PERCENTILES = (50, 90, 99)
+
+
+class LoadGenerator():
+    """
+    Drives a gRPC method over a single channel and measures how it holds up.
+
+    * Closed loop: a fixed number of callers each send a request,
+      wait for the response and immediately send the next. This finds
+      the throughput the server can sustain at that concurrency.
+    * Open loop: requests are sent at a fixed rate whether or not earlier
+      ones have come back. Latency is measured from when each request was
+      due to be sent, so a server falling behind shows up as latency
+      instead of quietly slowing the load down (coordinated omission).
+
+    The CPU time reported covers this whole process, so with an in-process
+    server it includes the load generator as well as the server.
+    """
+
+    def __init__(self, target: str, method: str, streaming: bool = False):
+        """
+        Constructor
+
+        :param target: The host:port of the server
+        :param method: The full method name, like "/package.Service/Method"
+        :param streaming: True if the method streams its responses
+        """
+        self.target: str = target
+        self.method: str = method
+        self.streaming: bool = streaming
+
+    # pylint: disable=too-many-locals
+    def run_closed_loop(self, payload: bytes, concurrency: int, duration_seconds: float) -> Dict[str, Any]:
+        """
+        :param payload: The request to send
+        :param concurrency: The number of callers sending requests
+        :param duration_seconds: How long to keep sending
+        :return: A results dictionary. See summarize().
+        """
+        latencies: List[float] = []
+        errors: List[int] = [0]
+        lock = threading.Lock()
+
+        with grpc.insecure_channel(self.target) as channel:
+            call = self._create_call(channel)
+            call(payload)
+            start_time = time.perf_counter()
+            start_cpu = time.process_time()
+            end_time = start_time + duration_seconds
+
+            def caller():
+                my_latencies = []
+                my_errors = 0
+                while time.perf_counter() < end_time:
+                    send_time = time.perf_counter()
+                    try:
+                        call(payload)
+                        my_latencies.append(time.perf_counter() - send_time)
+                    except grpc.RpcError:
+                        my_errors += 1
+                with lock:
+                    latencies.extend(my_latencies)
+                    errors[0] += my_errors
+
+            threads = [threading.Thread(target=caller, daemon=True) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start_time
+            cpu_seconds = time.process_time() - start_cpu
+
+        return summarize(latencies, errors[0], elapsed, cpu_seconds)
+
+    # pylint: disable=too-many-locals
+    def run_open_loop(self, payload: bytes, rate_per_second: float, duration_seconds: float,
+                      max_outstanding: int = 64) -> Dict[str, Any]:
+        """
+        :param payload: The request to send
+        :param rate_per_second: The rate at which requests are sent
+        :param duration_seconds: How long to keep sending
+        :param max_outstanding: The most requests waiting for responses at once.
+                    Requests due while this many are outstanding are sent late,
+                    and their lateness counts towards their latency.
+        :return: A results dictionary. See summarize().
+        """
+        latencies: List[float] = []
+        errors: List[int] = [0]
+        lock = threading.Lock()
+        interval = 1.0 / rate_per_second
+        num_requests = max(1, int(rate_per_second * duration_seconds))
+
+        with grpc.insecure_channel(self.target) as channel:
+            call = self._create_call(channel)
+            call(payload)
+
+            def send(due_time: float):
+                try:
+                    call(payload)
+                    latency = time.perf_counter() - due_time
+                    with lock:
+                        latencies.append(latency)
+                except grpc.RpcError:
+                    with lock:
+                        errors[0] += 1
+
+            start_time = time.perf_counter()
+            start_cpu = time.process_time()
+            with futures.ThreadPoolExecutor(max_workers=max_outstanding) as pool:
+                for index in range(num_requests):
+                    due_time = start_time + index * interval
+                    delay = due_time - time.perf_counter()
+                    if delay > 0.0:
+                        time.sleep(delay)
+                    pool.submit(send, due_time)
+            elapsed = time.perf_counter() - start_time
+            cpu_seconds = time.process_time() - start_cpu
+
+        return summarize(latencies, errors[0], elapsed, cpu_seconds)
+
+    def _create_call(self, channel: grpc.Channel) -> Callable[[bytes], Any]:
+        """
+        :return: A function making one call and receiving the whole response
+        """
+        if not self.streaming:
+            unary = channel.unary_unary(self.method)
+            return lambda payload: unary(payload, timeout=30)
+
+        stream = channel.unary_stream(self.method)
+
+        def call_and_drain(payload: bytes) -> int:
+            return sum(1 for _ in stream(payload, timeout=30))
+        return call_and_drain
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    :param sorted_values: Values in ascending order
+    :param percent: The percentile wanted, 0 to 100
+    :return: The nearest-rank percentile of the values, or 0.0 if there are none
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], num_errors: int, elapsed_seconds: float,
+              cpu_seconds: float) -> Dict[str, Any]:
+    """
+    :param latencies: Latency in seconds of each successful request
+    :param num_errors: The number of failed requests
+    :param elapsed_seconds: Wall-clock time the load ran for
+    :param cpu_seconds: CPU time used by this process while the load ran
+    :return: A dictionary of requests, errors, throughput per second,
+            latency percentiles and maximum in milliseconds,
+            and CPU milliseconds per request
+    """
+    ordered = sorted(latencies)
+    num_requests = len(ordered)
+    results = {
+        "requests": num_requests,
+        "errors": num_errors,
+        "throughput": num_requests / elapsed_seconds if elapsed_seconds > 0.0 else 0.0,
+    }
+    for percent in PERCENTILES:
+        results[f"p{percent}_ms"] = percentile(ordered, percent) * 1000.0
+    results["max_ms"] = ordered[-1] * 1000.0 if ordered else 0.0
+    results["cpu_ms_per_request"] = cpu_seconds * 1000.0 / num_requests if num_requests else 0.0
+    return results
@@ -0,0 +1,190 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+"""
+Runs the benchmark scenarios against the sample service and compares
+the results to the stored baselines:
+
+    python -m tests.benchmark.run_benchmark [--duration 5] [--update-baselines]
+
+Exits non-zero when any scenario regressed.
+"""
+
+from typing import Any
+from typing import Dict
+from typing import List
+
+import argparse
+import json
+import os
+import sys
+
+from tests.benchmark.load_generator import LoadGenerator
+from tests.benchmark.sample_service import SampleService
+from tests.benchmark.sample_service import STREAMING_METHOD
+from tests.benchmark.sample_service import UNARY_METHOD
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Fraction by which a result may be worse than its baseline before
+# it counts as a regression. Generous, as shared machines are noisy.
+DEFAULT_TOLERANCE = 0.5
+
+# Metrics compared against baselines, whether bigger is better, and how many
+# times the tolerance applies. Tail latency over a short run rests on a handful
+# of samples, so it is given more room than the rest.
+BASELINE_METRICS = {
+    "throughput": (True, 1.0),
+    "p50_ms": (False, 1.0),
+    "p99_ms": (False, 4.0),
+    "cpu_ms_per_request": (False, 1.0),
+}
+
+# Each scenario is a combination of method, payload size, and either
+# closed-loop concurrency or open-loop rate
+SCENARIOS: List[Dict[str, Any]] = [
+    {"name": "unary_small_closed_c1", "streaming": False, "payload_bytes": 64, "concurrency": 1},
+    {"name": "unary_small_closed_c16", "streaming": False, "payload_bytes": 64, "concurrency": 16},
+    {"name": "unary_large_closed_c8", "streaming": False, "payload_bytes": 256 * 1024, "concurrency": 8},
+    {"name": "unary_small_open_200rps", "streaming": False, "payload_bytes": 64, "rate": 200},
+    {"name": "stream_small_closed_c8", "streaming": True, "payload_bytes": 64, "concurrency": 8},
+    {"name": "stream_large_open_50rps", "streaming": True, "payload_bytes": 64 * 1024, "rate": 50},
+]
+
+
+def run_scenario(service: SampleService, scenario: Dict[str, Any], duration_seconds: float) -> Dict[str, Any]:
+    """
+    :param service: The started SampleService to run against
+    :param scenario: One of the SCENARIOS
+    :param duration_seconds: How long to run the load for
+    :return: The results dictionary from the LoadGenerator
+    """
+    method = STREAMING_METHOD if scenario.get("streaming") else UNARY_METHOD
+    generator = LoadGenerator(f"localhost:{service.port}", method, streaming=scenario.get("streaming"))
+    payload = b"x" * scenario.get("payload_bytes")
+    if "rate" in scenario:
+        return generator.run_open_loop(payload, scenario.get("rate"), duration_seconds)
+    return generator.run_closed_loop(payload, scenario.get("concurrency"), duration_seconds)
+
+
+def run_scenarios(duration_seconds: float, scenarios: List[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs scenarios one after the other against a single sample service
+
+    :param duration_seconds: How long to run each scenario for
+    :param scenarios: The scenarios to run. Default of None means all SCENARIOS.
+    :return: A dictionary of scenario name to results
+    """
+    if scenarios is None:
+        scenarios = SCENARIOS
+    service = SampleService()
+    service.start()
+    try:
+        return {scenario.get("name"): run_scenario(service, scenario, duration_seconds)
+                for scenario in scenarios}
+    finally:
+        service.stop()
+
+
+def load_baselines(file_name: str = BASELINES_FILE) -> Dict[str, Dict[str, float]]:
+    """
+    :return: A dictionary of scenario name to baseline metrics.
+            Empty if there is no baselines file.
+    """
+    if not os.path.exists(file_name):
+        return {}
+    with open(file_name, "r", encoding="utf-8") as baselines_file:
+        return json.load(baselines_file)
+
+
+def save_baselines(results: Dict[str, Dict[str, Any]], file_name: str = BASELINES_FILE):
+    """
+    Stores the baseline metrics of the given results
+    """
+    baselines = {name: {metric: round(result.get(metric), 3) for metric in BASELINE_METRICS}
+                 for name, result in results.items()}
+    with open(file_name, "w", encoding="utf-8") as baselines_file:
+        json.dump(baselines, baselines_file, indent=4, sort_keys=True)
+        baselines_file.write("\n")
+
+
+def compare_to_baselines(results: Dict[str, Dict[str, Any]], baselines: Dict[str, Dict[str, float]],
+                         tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    :param results: A dictionary of scenario name to results
+    :param baselines: A dictionary of scenario name to baseline metrics
+    :param tolerance: Fraction by which a result may be worse than its baseline
+    :return: A list of descriptions of regressions. Empty if there are none.
+            Scenarios without baselines are not compared.
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name, {})
+        for metric, (bigger_is_better, scale) in BASELINE_METRICS.items():
+            expected = baseline.get(metric)
+            actual = result.get(metric)
+            if expected is None or actual is None:
+                continue
+            if bigger_is_better:
+                regressed = actual < expected * (1.0 - tolerance * scale)
+            else:
+                regressed = actual > expected * (1.0 + tolerance * scale)
+            if regressed:
+                regressions.append(f"{name}: {metric} {actual:.3f} vs baseline {expected:.3f}")
+    return regressions
+
+
+def format_results(results: Dict[str, Dict[str, Any]]) -> str:
+    """
+    :return: A table of the results for humans
+    """
+    lines = [f"{'scenario':<28} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+             f"{'max ms':>8} {'cpu ms/req':>10} {'errors':>6}"]
+    for name, result in results.items():
+        lines.append(f"{name:<28} {result.get('throughput'):>9.1f} {result.get('p50_ms'):>8.2f} "
+                     f"{result.get('p90_ms'):>8.2f} {result.get('p99_ms'):>8.2f} {result.get('max_ms'):>8.2f} "
+                     f"{result.get('cpu_ms_per_request'):>10.3f} {result.get('errors'):>6d}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    """
+    Command line entry point
+    :return: The process exit code
+    """
+    parser = argparse.ArgumentParser(description="Benchmark ServerLifetime-based services")
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="Seconds to run each scenario for")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Fraction by which results may be worse than baselines")
+    parser.add_argument("--update-baselines", action="store_true",
+                        help="Store these results as the new baselines")
+    args = parser.parse_args()
+
+    results = run_scenarios(args.duration)
+    print(format_results(results))
+    if args.update_baselines:
+        save_baselines(results)
+        print(f"Baselines written to {BASELINES_FILE}")
+        return 0
+
+    regressions = compare_to_baselines(results, load_baselines(), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Iterator
+
+import logging
+import os
+import socket
+import threading
+
+import grpc
+
+from grpc_health.v1 import health_pb2
+from grpc_health.v1 import health_pb2_grpc
+
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+SERVICE_NAME = "benchmark.Sample"
+UNARY_METHOD = f"/{SERVICE_NAME}/Echo"
+STREAMING_METHOD = f"/{SERVICE_NAME}/Stream"
+
+# Number of messages the streaming method sends back for each request
+STREAM_MESSAGES = 8
+
+
+def find_free_port() -> int:
+    """
+    :return: A port nothing is listening on right now
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class SampleService():
+    """
+    A minimal service run on ServerLifetime over localhost, so that
+    benchmarks measure the per-request cost of the library itself:
+    start_request()/finish_request(), the RequestLoggerAdapter and
+    the formatting and output of its log records.
+
+    Requests and responses are raw bytes so no time goes to protobuf.
+    """
+
+    def __init__(self, max_workers: int = 16, min_workers: int = None,
+                 log_file_name: str = os.devnull):
+        """
+        Constructor
+
+        :param max_workers: The number of threads handling requests
+        :param min_workers: When set, use the adaptive worker pool
+        :param log_file_name: Where the request logs go. Default throws them
+                    away, but only after they have been formatted and written.
+        """
+        self.port: int = find_free_port()
+
+        # A logger of our own so that benchmark output does not depend
+        # on whatever logging the test runner has set up
+        self.logger = logging.getLogger(f"benchmark-{self.port}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        # pylint: disable=consider-using-with
+        self.log_stream = open(log_file_name, "w", encoding="utf-8")
+        handler = logging.StreamHandler(self.log_stream)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        self.logger.addHandler(handler)
+
+        self.lifetime = ServerLifetime("benchmark", "benchmark", self.port, self.logger,
+                                       max_workers=max_workers, min_workers=min_workers,
+                                       shutdown_propagation_seconds=0.0,
+                                       stop_grace_seconds=1.0)
+        server = self.lifetime.create_server()
+        handlers = {
+            "Echo": grpc.unary_unary_rpc_method_handler(self.echo),
+            "Stream": grpc.unary_stream_rpc_method_handler(self.stream),
+        }
+        server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(SERVICE_NAME, handlers),))
+        self.run_thread: threading.Thread = None
+
+    def echo(self, request: bytes, context) -> bytes:
+        """
+        Unary method returning the request as the response
+        """
+        request_log = self.lifetime.start_request("Echo", "benchmark", context)
+        self.lifetime.finish_request("Echo", "benchmark", request_log)
+        return request
+
+    def stream(self, request: bytes, context) -> Iterator[bytes]:
+        """
+        Server-streaming method returning the request STREAM_MESSAGES times
+        """
+        request_log = self.lifetime.start_request("Stream", "benchmark", context)
+        for _ in range(STREAM_MESSAGES):
+            yield request
+        self.lifetime.finish_request("Stream", "benchmark", request_log)
+
+    def start(self, timeout_seconds: float = 10.0):
+        """
+        Starts the service and waits for it to report SERVING
+        """
+        self.run_thread = threading.Thread(target=self.lifetime.run, daemon=True, name="benchmark-server")
+        self.run_thread.start()
+        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+            # pylint: disable=no-member
+            health_stub = health_pb2_grpc.HealthStub(channel)
+            health_stub.Check(health_pb2.HealthCheckRequest(service="benchmark"),
+                              timeout=timeout_seconds, wait_for_ready=True)
+
+    def stop(self, timeout_seconds: float = 10.0):
+        """
+        Shuts the service down and waits for it to finish
+        """
+        self.lifetime.request_shutdown("benchmark done")
+        if self.run_thread is not None:
+            self.run_thread.join(timeout_seconds)
+        self.lifetime.thread_pool.shutdown(wait=True)
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        self.log_stream.close()
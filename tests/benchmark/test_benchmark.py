@@ -0,0 +1,84 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import os
+
+import pytest
+
+from tests.benchmark.load_generator import percentile
+from tests.benchmark.run_benchmark import compare_to_baselines
+from tests.benchmark.run_benchmark import format_results
+from tests.benchmark.run_benchmark import load_baselines
+from tests.benchmark.run_benchmark import run_scenarios
+from tests.benchmark.run_benchmark import SCENARIOS
+
+# Seconds each scenario runs for in the test.
+# Set LEAF_BENCHMARK_SECONDS to run longer.
+DURATION_SECONDS = float(os.environ.get("LEAF_BENCHMARK_SECONDS", "0.5"))
+
+# Set LEAF_BENCHMARK_ENFORCE=1 to fail the test on regressions against
+# the stored baselines. Off by default, as results depend on the machine.
+ENFORCE_BASELINES = os.environ.get("LEAF_BENCHMARK_ENFORCE", "0") == "1"
+
+
+class TestBenchmark(TestCase):
+    """
+    Runs every benchmark scenario briefly against the sample service
+    """
+
+    def test_percentile(self):
+        """
+        Tests nearest-rank percentiles
+        """
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(50.0, percentile(values, 50))
+        self.assertEqual(99.0, percentile(values, 99))
+        self.assertEqual(1.0, percentile(values, 0))
+        self.assertEqual(0.0, percentile([], 50))
+
+    def test_compare_to_baselines(self):
+        """
+        Tests that only results worse than tolerated are regressions
+        """
+        baselines = {"scenario": {"throughput": 100.0, "p99_ms": 10.0}}
+        good = {"scenario": {"throughput": 80.0, "p99_ms": 12.0, "cpu_ms_per_request": 9.0}}
+        bad = {"scenario": {"throughput": 40.0, "p99_ms": 40.0}}
+        self.assertEqual([], compare_to_baselines(good, baselines, tolerance=0.5))
+        self.assertEqual(2, len(compare_to_baselines(bad, baselines, tolerance=0.5)))
+
+    @pytest.mark.integration
+    @pytest.mark.benchmark
+    def test_scenarios(self):
+        """
+        Tests that every scenario completes without errors and
+        reports its results, and optionally that none regressed
+        """
+        results = run_scenarios(DURATION_SECONDS)
+        logging.getLogger(__name__).info("Benchmark results:\n%s", format_results(results))
+
+        self.assertEqual(len(SCENARIOS), len(results))
+        for name, result in results.items():
+            self.assertGreater(result.get("requests"), 0, name)
+            self.assertEqual(0, result.get("errors"), name)
+            self.assertLessEqual(result.get("p50_ms"), result.get("p99_ms"), name)
+
+        baselines = load_baselines()
+        self.assertEqual(set(results.keys()), set(baselines.keys()))
+        if ENFORCE_BASELINES:
+            self.assertEqual([], compare_to_baselines(results, baselines))
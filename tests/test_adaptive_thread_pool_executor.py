@@ -0,0 +1,124 @@
+
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from unittest import TestCase
+
+import logging
+import time
+
+import grpc
+
+from leaf_server_common.server.adaptive_thread_pool_executor import AdaptiveThreadPoolExecutor
+from leaf_server_common.server.adaptive_thread_pool_executor import _WorkItem
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+SERVICE_NAME = "test.Sleeper"
+METHOD_NAME = "Sleep"
+HANDLER_SECONDS = 0.02
+
+
+class TestAdaptiveThreadPoolExecutor(TestCase):
+    """
+    Tests the adaptive worker pool on its own and behind a local ServerLifetime server
+    under bursty load.
+    """
+
+    def test_grows_and_shrinks(self):
+        """
+        Tests that the pool grows under a backlog and shrinks back when idle
+        """
+        pool = AdaptiveThreadPoolExecutor(min_workers=1, max_workers=8, idle_timeout_seconds=0.2)
+        results = [pool.submit(time.sleep, 0.05) for _ in range(16)]
+        futures.wait(results)
+        self.assertGreater(pool.get_metrics().get("peak_workers"), 1)
+        self.assertLessEqual(pool.get_metrics().get("peak_workers"), 8)
+
+        time.sleep(0.6)
+        self.assertEqual(1, pool.get_metrics().get("workers"))
+
+        self.assertEqual(4, pool.submit(pow, 2, 2).result())
+        with self.assertRaises(ZeroDivisionError):
+            pool.submit(divmod, 1, 0).result()
+
+        pool.shutdown(wait=True)
+        with self.assertRaises(RuntimeError):
+            pool.submit(pow, 2, 2)
+
+    # pylint: disable=protected-access
+    def test_work_queued_as_idle_thread_exits(self):
+        """
+        Tests that work queued between the idle timeout of the last thread
+        and that thread exiting still gets run
+        """
+        pool = AdaptiveThreadPoolExecutor(min_workers=0, max_workers=1, idle_timeout_seconds=0.1)
+        self.assertEqual(4, pool.submit(pow, 2, 2).result())
+
+        # Let the idle timeout go by while the thread cannot exit,
+        # then queue work as submit() does
+        future = futures.Future()
+        with pool._lock:
+            time.sleep(0.3)
+            pool._queue.put(_WorkItem(future, pow, (2, 3), {}))
+            self.assertFalse(pool._should_grow())
+
+        self.assertEqual(8, future.result(timeout=5.0))
+        pool.shutdown(wait=True)
+
+    def test_bursty_load(self):
+        """
+        Drives bursts of concurrent requests at a local server and checks
+        that the pool grows for them and times every request.
+        """
+        logger = logging.getLogger(self.__class__.__name__)
+        lifetime = ServerLifetime("test", "test", 0, logger,
+                                  max_workers=16, min_workers=2,
+                                  worker_idle_timeout_seconds=0.5)
+        server = lifetime.create_server()
+
+        def sleep(request: bytes, context) -> bytes:
+            request_log = lifetime.start_request(METHOD_NAME, "test", context)
+            time.sleep(HANDLER_SECONDS)
+            lifetime.finish_request(METHOD_NAME, "test", request_log)
+            return request
+
+        handler = grpc.method_handlers_generic_handler(
+            SERVICE_NAME, {METHOD_NAME: grpc.unary_unary_rpc_method_handler(sleep)})
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                call = channel.unary_unary(f"/{SERVICE_NAME}/{METHOD_NAME}")
+                # Alternate bursts with quiet periods
+                for burst_size in (32, 4, 32, 4):
+                    calls = [call.future(b"x", timeout=10) for _ in range(burst_size)]
+                    for one_call in calls:
+                        self.assertEqual(b"x", one_call.result())
+                    time.sleep(0.1)
+        finally:
+            server.stop(None)
+
+        snapshot = lifetime.get_latency_snapshot()
+        pool_metrics = snapshot.get("worker_pool")
+        self.assertGreater(pool_metrics.get("peak_workers"), 2)
+        self.assertLessEqual(pool_metrics.get("peak_workers"), 16)
+        self.assertEqual(72, snapshot.get("handler").get("count"))
+        self.assertEqual(72, snapshot.get("queue_wait").get("count"))
+        pool = lifetime.thread_pool
+        pool.shutdown(wait=True)
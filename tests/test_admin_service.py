@@ -0,0 +1,119 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+from unittest import TestCase
+
+import logging
+import socket
+import threading
+
+import grpc
+
+from google.protobuf.json_format import MessageToDict
+from google.protobuf.struct_pb2 import Struct     # pylint: disable=no-name-in-module
+
+from leaf_server_common.server.admin_service import ADMIN_SERVICE_NAME
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+
+def find_free_port() -> int:
+    """
+    :return: A port nothing is listening on right now
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class TestAdminService(TestCase):
+    """
+    Tests looking inside and adjusting a running server through the admin service
+    """
+
+    def setUp(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.port = find_free_port()
+        self.lifetime = ServerLifetime("test", "test", self.port, self.logger, max_workers=4,
+                                       shutdown_propagation_seconds=0.0,
+                                       stop_grace_seconds=1.0,
+                                       enable_admin_service=True)
+        self.lifetime.create_server()
+        self.run_thread = threading.Thread(target=self.lifetime.run)
+        self.run_thread.start()
+        self.channel = grpc.insecure_channel(f"localhost:{self.port}")
+
+    def tearDown(self):
+        self.channel.close()
+        self.lifetime.request_shutdown("test over")
+        self.run_thread.join(10.0)
+        self.lifetime.thread_pool.shutdown(wait=True)
+
+    def call(self, method: str, request: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        :return: The response of an admin method as a dictionary
+        """
+        stub = self.channel.unary_unary(f"/{ADMIN_SERVICE_NAME}/{method}",
+                                        request_serializer=Struct.SerializeToString,
+                                        response_deserializer=Struct.FromString)
+        message = Struct()
+        message.update(request or {})
+        return MessageToDict(stub(message, timeout=5, wait_for_ready=True))
+
+    def test_status(self):
+        """
+        Tests that status is reported, and reused until something changes
+        """
+        status = self.call("GetStatus")
+        self.assertEqual("test", status.get("service_info").get("name"))
+        self.assertIn("Total", status.get("stats"))
+        self.assertGreater(status.get("threads").get("count"), 0)
+        self.assertIn("counts", status.get("gc"))
+        self.assertFalse(status.get("log_request_metadata"))
+        self.assertEqual([], status.get("in_flight"))
+
+        # Cached
+        self.lifetime.log_request_metadata = True
+        self.assertFalse(self.call("GetStatus").get("log_request_metadata"))
+
+        # Controls refresh the snapshot
+        response = self.call("SetLogRequestMetadata", {"enabled": False})
+        self.assertEqual({"previous": True, "enabled": False}, response)
+        self.assertFalse(self.lifetime.log_request_metadata)
+
+    def test_set_log_level(self):
+        """
+        Tests changing logger levels, and refusing unknown levels
+        """
+        logger = logging.getLogger("admin.test")
+        logger.setLevel(logging.INFO)
+        response = self.call("SetLogLevel", {"logger": "admin.test", "level": "debug"})
+        self.assertEqual("INFO", response.get("previous"))
+        self.assertEqual(logging.DEBUG, logger.level)
+
+        with self.assertRaises(grpc.RpcError) as raised:
+            self.call("SetLogLevel", {"logger": "admin.test", "level": "LOUD"})
+        self.assertEqual(grpc.StatusCode.INVALID_ARGUMENT, raised.exception.code())
+
+    def test_recycle(self):
+        """
+        Tests that a recycle starts a graceful shutdown
+        """
+        self.call("Recycle", {"reason": "testing"})
+        self.run_thread.join(10.0)
+        self.assertFalse(self.run_thread.is_alive())
+        self.assertEqual("admin recycle: testing", self.lifetime.shutdown_reason)
@@ -0,0 +1,164 @@
+
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Callable
+from typing import List
+from unittest import TestCase
+
+import logging
+import sysconfig
+import threading
+import time
+
+import pytest
+
+from leaf_server_common.server.atomic_counter import AtomicCounter
+from leaf_server_common.server.sharded_counter import ShardedCounter
+
+# Thread counts for the contention test
+THREAD_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+
+# Total number of increments spread across all threads per run
+TOTAL_INCREMENTS = 64000
+
+
+def run_threads(num_threads: int, target: Callable[[], None]) -> float:
+    """
+    :param num_threads: The number of threads to run the target on at once
+    :param target: The function each thread runs
+    :return: The wall-clock seconds it took for all threads to finish
+    """
+    barrier = threading.Barrier(num_threads + 1)
+
+    def wait_then_run():
+        barrier.wait()
+        target()
+
+    threads: List[threading.Thread] = [threading.Thread(target=wait_then_run)
+                                       for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start_time
+
+
+class TestAtomicCounter(TestCase):
+    """
+    Tests AtomicCounter and ShardedCounter, and benchmarks them under contention.
+    """
+
+    def test_read_modify_write(self):
+        """
+        Tests the atomic read-modify-write operations
+        """
+        counter = AtomicCounter(5)
+        self.assertEqual(5, counter.get_and_add(3))
+        self.assertEqual(10, counter.add_and_get(2))
+        self.assertFalse(counter.compare_and_set(9, 0))
+        self.assertTrue(counter.compare_and_set(10, 1))
+        self.assertTrue(counter.add_if_below(1, 3))
+        self.assertFalse(counter.add_if_below(1, 3))
+        self.assertEqual(2, counter.get_count())
+
+    def test_snapshot(self):
+        """
+        Tests that a snapshot of counters sharing a lock sees paired updates together
+        """
+        lock = threading.Lock()
+        started = AtomicCounter(lock=lock)
+        finished = AtomicCounter(lock=lock)
+        other = AtomicCounter()
+        stop = threading.Event()
+
+        def update_pair():
+            while not stop.is_set():
+                with lock:
+                    # pylint: disable=protected-access
+                    started._value += 1
+                    finished._value += 1
+
+        updater = threading.Thread(target=update_pair)
+        updater.start()
+        try:
+            for _ in range(1000):
+                num_started, num_finished, num_other = AtomicCounter.snapshot([started, finished, other])
+                self.assertEqual(num_started, num_finished)
+                self.assertEqual(0, num_other)
+        finally:
+            stop.set()
+            updater.join()
+
+    def test_sharded_counter_survives_thread_churn(self):
+        """
+        Tests that counts from threads that have gone away are kept
+        and that their cells are folded away.
+        """
+        counter = ShardedCounter(10)
+        for _ in range(20):
+            run_threads(4, lambda: [counter.increment() for _ in range(100)])
+        counter.decrement(10)
+        self.assertEqual(8000, counter.get_count())
+
+        # Only cells from the last batch of threads (at most) remain
+        # pylint: disable=protected-access
+        self.assertLessEqual(len(counter._cells), 4)
+
+    def run_contention(self) -> List[List[float]]:
+        """
+        Runs locked and sharded increments at increasing thread counts,
+        checking the counts come out right along the way.
+        :return: A row per thread count of AtomicCounter and ShardedCounter increments per second
+        """
+        rows: List[List[float]] = []
+        for num_threads in THREAD_COUNTS:
+            per_thread = TOTAL_INCREMENTS // num_threads
+            rates: List[float] = []
+            for counter in (AtomicCounter(), ShardedCounter()):
+
+                def increment_many(counter=counter, per_thread=per_thread):
+                    increment = counter.increment
+                    for _ in range(per_thread):
+                        increment()
+
+                elapsed = run_threads(num_threads, increment_many)
+                self.assertEqual(per_thread * num_threads, counter.get_count())
+                rates.append(per_thread * num_threads / elapsed)
+            rows.append(rates)
+        return rows
+
+    def test_counts_under_contention(self):
+        """
+        Tests that locked and sharded increments at increasing thread counts
+        come out right.
+        """
+        self.assertEqual(len(THREAD_COUNTS), len(self.run_contention()))
+
+    @pytest.mark.integration
+    @pytest.mark.benchmark
+    def test_contention_benchmark(self):
+        """
+        Benchmarks locked vs sharded increments at increasing thread counts
+        """
+        gil_disabled = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+        lines = [f"Counter contention benchmark (free-threaded build: {gil_disabled})",
+                 f"{'threads':>8} {'AtomicCounter ops/s':>20} {'ShardedCounter ops/s':>21}"]
+        for num_threads, rates in zip(THREAD_COUNTS, self.run_contention()):
+            lines.append(f"{num_threads:>8} {rates[0]:>20,.0f} {rates[1]:>21,.0f}")
+        logging.getLogger(__name__).info("\n".join(lines))
@@ -0,0 +1,115 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from unittest import TestCase
+
+import os
+
+import grpc
+
+from leaf_server_common.server.chunked_stream import CHUNK_HEADER
+from leaf_server_common.server.chunked_stream import ChunkAssembler
+from leaf_server_common.server.chunked_stream import call_chunked
+from leaf_server_common.server.chunked_stream import chunked_unary_stream_rpc_method_handler
+from leaf_server_common.server.chunked_stream import decode_request
+from leaf_server_common.server.chunked_stream import encode_chunks
+
+SERVICE_NAME = "test.Chunked"
+CHUNK_SIZE = 64 * 1024
+
+
+class TestChunkedStream(TestCase):
+    """
+    Tests sending large responses in chunks
+    """
+
+    def test_assembler(self):
+        """
+        Tests reassembly, integrity checks and resuming from an offset
+        """
+        payload = os.urandom(10 * 1000 + 7)
+        frames = list(encode_chunks(payload, chunk_size=1000))
+        self.assertEqual(11, len(frames))
+
+        assembler = ChunkAssembler()
+        for frame in frames[:4]:
+            self.assertFalse(assembler.add(frame))
+        self.assertEqual(4000, assembler.offset)
+
+        # A corrupt chunk is refused and leaves the offset alone
+        corrupt = bytearray(frames[4])
+        corrupt[CHUNK_HEADER.size + 10] ^= 0xFF
+        with self.assertRaises(ValueError):
+            assembler.add(bytes(corrupt))
+        # So is a chunk out of place
+        with self.assertRaises(ValueError):
+            assembler.add(frames[5])
+        with self.assertRaises(ValueError):
+            assembler.get_payload()
+
+        # Pick up where it left off
+        resumed = list(encode_chunks(payload, offset=assembler.offset, chunk_size=1000))
+        self.assertEqual(frames[4:], resumed)
+        for frame in resumed:
+            assembler.add(frame)
+        self.assertTrue(assembler.done)
+        self.assertEqual(payload, assembler.get_payload())
+
+        empty = ChunkAssembler()
+        self.assertTrue(empty.add(next(encode_chunks(b""))))
+        self.assertEqual(bytearray(), empty.get_payload())
+
+        with self.assertRaises(ValueError):
+            ChunkAssembler(max_total_size=100).add(frames[0])
+
+    def test_call(self):
+        """
+        Tests a call whose stream breaks off part way through the first time
+        """
+        payload = os.urandom(20 * CHUNK_SIZE + 123)
+        offsets = []
+        chunked = chunked_unary_stream_rpc_method_handler(lambda request, _context: payload * int(request),
+                                                          request_deserializer=lambda data: data.decode(),
+                                                          chunk_size=CHUNK_SIZE)
+
+        def flaky(frame: bytes, context):
+            offsets.append(decode_request(frame)[0])
+            for index, chunk in enumerate(chunked.unary_stream(frame, context)):
+                if len(offsets) == 1 and index == 5:
+                    context.abort(grpc.StatusCode.UNAVAILABLE, "pretend the connection went away")
+                yield chunk
+
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        handler = grpc.method_handlers_generic_handler(SERVICE_NAME, {
+            "Get": grpc.unary_stream_rpc_method_handler(flaky),
+            "Refuse": chunked_unary_stream_rpc_method_handler(lambda _request, _context: payload)
+        })
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                response = call_chunked(channel, f"/{SERVICE_NAME}/Get", b"2",
+                                        response_deserializer=bytes, timeout=30)
+                self.assertEqual(payload * 2, response)
+                self.assertEqual([0, 5 * CHUNK_SIZE], offsets)
+
+                # Too big to take is not retried
+                with self.assertRaises(ValueError):
+                    call_chunked(channel, f"/{SERVICE_NAME}/Refuse", b"", max_total_size=CHUNK_SIZE, timeout=30)
+        finally:
+            server.stop(None)
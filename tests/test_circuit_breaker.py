@@ -0,0 +1,90 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import time
+
+from leaf_server_common.logging.circuit_breaker import CircuitBreaker
+from leaf_server_common.logging.circuit_breaker import CLOSED
+from leaf_server_common.logging.circuit_breaker import HALF_OPEN
+from leaf_server_common.logging.circuit_breaker import OPEN
+
+
+class TestCircuitBreaker(TestCase):
+    """
+    Tests the states of the CircuitBreaker guarding OTLP exports
+    """
+
+    def test_state_transitions(self):
+        """
+        Tests opening at the threshold, the single half-open probe,
+        and closing again on success
+        """
+        breaker = CircuitBreaker(failure_threshold=3, initial_backoff_seconds=0.05, jitter_fraction=0.0)
+        self.assertFalse(breaker.record_failure())
+        self.assertFalse(breaker.record_failure())
+        self.assertEqual(CLOSED, breaker.get_state())
+        self.assertTrue(breaker.allow_request())
+
+        self.assertTrue(breaker.record_failure())
+        self.assertEqual(OPEN, breaker.get_state())
+        self.assertFalse(breaker.allow_request())
+        self.assertGreater(breaker.get_seconds_until_probe(), 0.0)
+
+        # Only one caller gets to probe
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(HALF_OPEN, breaker.get_state())
+        self.assertFalse(breaker.allow_request())
+
+        self.assertTrue(breaker.record_success())
+        self.assertEqual(CLOSED, breaker.get_state())
+        self.assertEqual(0, breaker.get_fail_count())
+        self.assertFalse(breaker.record_success())
+
+    def test_failures_while_open(self):
+        """
+        Tests that failures of calls let through before the circuit opened
+        neither re-open it nor lengthen the backoff
+        """
+        breaker = CircuitBreaker(failure_threshold=1, initial_backoff_seconds=10.0, jitter_fraction=0.0)
+        self.assertTrue(breaker.record_failure())
+        until_probe = breaker.get_seconds_until_probe()
+        for _ in range(5):
+            self.assertFalse(breaker.record_failure())
+        self.assertEqual(OPEN, breaker.get_state())
+        self.assertLessEqual(breaker.get_seconds_until_probe(), until_probe)
+
+    def test_backoff_doubles_up_to_max(self):
+        """
+        Tests that each failed probe doubles the backoff until the maximum
+        """
+        breaker = CircuitBreaker(failure_threshold=1, initial_backoff_seconds=0.01,
+                                 max_backoff_seconds=0.04, jitter_fraction=0.0)
+        self.assertTrue(breaker.record_failure())
+        backoffs = []
+        for _ in range(4):
+            # Skip the wait for the probe
+            breaker._next_probe_time = 0.0     # pylint: disable=protected-access
+            self.assertTrue(breaker.allow_request())
+            self.assertTrue(breaker.record_failure())
+            backoffs.append(breaker.get_seconds_until_probe())
+
+        self.assertAlmostEqual(0.02, backoffs[0], delta=0.005)
+        self.assertAlmostEqual(0.04, backoffs[1], delta=0.005)
+        self.assertAlmostEqual(0.04, backoffs[2], delta=0.005)
+        self.assertAlmostEqual(0.04, backoffs[3], delta=0.005)
@@ -0,0 +1,103 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import gc
+import logging
+
+from leaf_server_common.server.gc_policy import GcPolicy
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+
+def make_garbage(num: int):
+    """
+    Leaves behind reference cycles only the collector can free
+    """
+    for _ in range(num):
+        cycle = []
+        cycle.append(cycle)
+
+
+class TestGcPolicy(TestCase):
+    """
+    Tests the garbage collection policy for serving
+    """
+
+    def setUp(self):
+        self.thresholds = gc.get_threshold()
+        self.policy = None
+
+    def tearDown(self):
+        if self.policy is not None:
+            self.policy.uninstall()
+        gc.unfreeze()
+        gc.set_threshold(*self.thresholds)
+
+    def test_after_warmup(self):
+        """
+        Tests freezing, thresholds and the recording of pauses
+        """
+        self.policy = GcPolicy(thresholds=(20000, 20, 20))
+        self.policy.install()
+        make_garbage(100)
+        gc.collect(0)
+        self.policy.after_warmup()
+
+        self.assertEqual((20000, 20, 20), gc.get_threshold())
+        self.assertGreater(gc.get_freeze_count(), 0)
+        metrics = self.policy.get_metrics()
+        self.assertEqual(gc.get_freeze_count(), metrics.get("frozen"))
+        self.assertGreaterEqual(metrics.get("pauses").get("0").get("count"), 1)
+        self.assertEqual(1, metrics.get("pauses").get("idle").get("count"))
+        self.assertGreaterEqual(metrics.get("collected"), 100)
+
+        # Pauses are no longer recorded once uninstalled
+        self.policy.uninstall()
+        gc.collect(0)
+        self.assertEqual(metrics.get("pauses").get("0").get("count"),
+                         self.policy.get_metrics().get("pauses").get("0").get("count"))
+
+    def test_idle_collection(self):
+        """
+        Tests that the oldest generation is collected only when idle
+        and not too soon after the last time
+        """
+        self.policy = GcPolicy(freeze_after_warmup=False, idle_max_in_flight=1, min_idle_collect_seconds=0.0)
+        self.policy.install()
+        self.assertFalse(self.policy.maybe_collect(True, 0))
+        self.assertFalse(self.policy.maybe_collect(False, 2))
+        self.assertTrue(self.policy.maybe_collect(False, 1))
+
+        self.policy.min_idle_collect_seconds = 3600.0
+        self.assertFalse(self.policy.maybe_collect(False, 0))
+        self.assertEqual(1, self.policy.get_metrics().get("pauses").get("idle").get("count"))
+
+    def test_server_loop(self):
+        """
+        Tests that the server loop collects when the server is idle
+        """
+        self.policy = GcPolicy(min_idle_collect_seconds=0.0)
+        lifetime = ServerLifetime("test", "test", 0, logging.getLogger(self.__class__.__name__),
+                                  gc_policy=self.policy)
+        # pylint: disable=protected-access
+        lifetime._call_loop_callback()
+        self.assertEqual(1, self.policy.get_metrics().get("pauses").get("idle").get("count"))
+
+        with lifetime.lock:
+            lifetime.stats['NumProcessing'] = 1
+        lifetime._call_loop_callback()
+        self.assertEqual(1, self.policy.get_metrics().get("pauses").get("idle").get("count"))
@@ -0,0 +1,130 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import List
+from unittest import TestCase
+
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+# Heavy modules that importing the key to each entry must not load.
+# Checking what gets loaded, rather than timing it, keeps this from
+# depending on how fast the machine is.
+DEFERRED_MODULES = {
+    "leaf_server_common.server.server_lifetime": [
+        "grpc_health.v1.health_pb2",
+        "grpc_reflection.v1alpha",
+        "multiprocessing.shared_memory",
+        "leaf_common.config.config_handler",
+        "opentelemetry",
+        "leaf_server_common.server.gc_policy",
+        "leaf_server_common.server.periodic_task_scheduler",
+        "leaf_server_common.server.profiler",
+        "leaf_server_common.server.request_watchdog",
+        "leaf_server_common.server.single_flight",
+        "leaf_server_common.server.tenant_accounting",
+        "leaf_server_common.server.warmup",
+    ],
+    "leaf_server_common.logging.open_telemetry_logging_handler": [
+        "opentelemetry",
+        "grpc",
+    ],
+    "leaf_server_common.logging.logging_setup": [
+        "opentelemetry",
+    ],
+    "leaf_server_common.server.probe": [
+        "google.protobuf.json_format",
+    ],
+}
+
+# Longest cumulative -X importtime of server_lifetime, as a multiple of the
+# grpc import it includes. Relative to grpc so it holds on slow machines too.
+MAX_IMPORT_TIME_RATIO_TO_GRPC = 1.7
+
+# Number of fresh interpreters timed. The median ratio is the one checked.
+NUM_IMPORT_TIME_RUNS = 5
+
+# Set LEAF_BENCHMARK_ENFORCE=1 to fail the import time benchmark when over
+# the ratio, like the other benchmarks.
+ENFORCE_BASELINES = os.environ.get("LEAF_BENCHMARK_ENFORCE", "0") == "1"
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    """
+    :return: The result of running a fresh interpreter with the given arguments
+    """
+    return subprocess.run([sys.executable] + args, cwd=REPO_DIR, capture_output=True,
+                          text=True, check=True)
+
+
+def get_cumulative_import_us(importtime_output: str, module_name: str) -> int:
+    """
+    :param importtime_output: The stderr of a python -X importtime run
+    :param module_name: The name of a module imported in that run
+    :return: The cumulative microseconds importing the module took
+    """
+    for line in importtime_output.splitlines():
+        # Lines look like "import time:   self [us] | cumulative | imported package"
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module_name:
+            return int(fields[1])
+    raise ValueError(f"{module_name} not in -X importtime output")
+
+
+class TestImportTime(TestCase):
+    """
+    Guards the cold-start cost of importing leaf_server_common
+    """
+
+    def test_heavy_modules_are_deferred(self):
+        """
+        Tests that optional subsystems are not loaded just by importing
+        """
+        for module_name, deferred in DEFERRED_MODULES.items():
+            code = f"import json, sys, {module_name}; print(json.dumps(sorted(sys.modules)))"
+            loaded = json.loads(run_python(["-c", code]).stdout)
+            self.assertIn(module_name, loaded)
+            for deferred_name in deferred:
+                offenders = [name for name in loaded
+                             if name == deferred_name or name.startswith(f"{deferred_name}.")]
+                self.assertEqual([], offenders, f"import {module_name} loads {deferred_name}")
+
+    @pytest.mark.integration
+    @pytest.mark.benchmark
+    def test_import_time_ratio_to_grpc(self):
+        """
+        Measures the cold import of server_lifetime against that of the grpc
+        it cannot do without, and optionally checks it stays within the ratio
+        """
+        module_name = "leaf_server_common.server.server_lifetime"
+        ratios = []
+        for _ in range(NUM_IMPORT_TIME_RUNS):
+            output = run_python(["-X", "importtime", "-c", f"import {module_name}"]).stderr
+            ratios.append(get_cumulative_import_us(output, module_name) /
+                          get_cumulative_import_us(output, "grpc"))
+        ratio = statistics.median(ratios)
+        logging.getLogger(__name__).info("import %s takes %.2f times as long as import grpc",
+                                         module_name, ratio)
+        if ENFORCE_BASELINES:
+            self.assertLessEqual(ratio, MAX_IMPORT_TIME_RATIO_TO_GRPC)
@@ -0,0 +1,114 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import List
+from unittest import TestCase
+
+import json
+import logging
+import tempfile
+import tracemalloc
+
+from leaf_server_common.server.leak_diagnostics import LeakDiagnostics
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+
+# pylint: disable=too-few-public-methods
+class Leaked():
+    """
+    Something a pretend request handler forgets to let go of
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.payload = bytearray(1000)
+
+
+def leak(leaks: List[Leaked], num: int):
+    """
+    Pretends to handle requests that leak
+    """
+    for _ in range(num):
+        leaks.append(Leaked())
+
+
+class TestLeakDiagnostics(TestCase):
+    """
+    Tests finding what grows between snapshots
+    """
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.temp_dir.cleanup()
+
+    def test_report(self):
+        """
+        Tests that the leaking site and type top the report
+        and grow in every interval
+        """
+        leaks = []
+        diagnostics = LeakDiagnostics([10, 20], self.temp_dir.name, top_growers=5)
+        self.assertFalse(diagnostics.check(10))
+        diagnostics.take_snapshot("warmup", 0)
+
+        leak(leaks, 100)
+        self.assertTrue(diagnostics.check(12))
+        leak(leaks, 100)
+        self.assertFalse(diagnostics.check(15))
+        self.assertTrue(diagnostics.check(40))
+        self.assertFalse(diagnostics.check(50))
+        leak(leaks, 100)
+
+        file_name = diagnostics.write_report("shutdown", 60)
+        self.assertFalse(tracemalloc.is_tracing())
+        with open(file_name, "r", encoding="utf-8") as report_file:
+            report = json.load(report_file)
+
+        self.assertEqual(["warmup", "requests_12", "requests_40", "shutdown"],
+                         [snapshot.get("name") for snapshot in report.get("snapshots")])
+        self.assertEqual(3, len(report.get("intervals")))
+
+        overall = report.get("overall")
+        self.assertEqual(60, overall.get("requests"))
+        self.assertGreater(overall.get("size_diff"), 300 * 1000)
+        self.assertGreater(overall.get("bytes_per_request"), 5000)
+        top_site = overall.get("allocation_sites")[0]
+        self.assertIn("test_leak_diagnostics.py", top_site.get("site"))
+        self.assertEqual(3, top_site.get("grew_in_intervals"))
+        object_types = {item.get("type"): item.get("count_diff") for item in overall.get("object_types")}
+        self.assertEqual(300, object_types.get(f"{__name__}.Leaked"))
+
+    def test_server_milestones(self):
+        """
+        Tests that milestones are taken as fractions of the request limit
+        or numbers of requests
+        """
+        lifetime = ServerLifetime("test", "test", 0, logging.getLogger(self.__class__.__name__),
+                                  request_limit=1000, profile_dir=self.temp_dir.name,
+                                  leak_diagnostics_milestones=[0.9, 0.5, 2000])
+        diagnostics = lifetime.leak_diagnostics
+        self.assertTrue(tracemalloc.is_tracing())
+        self.assertEqual([round(0.5 * lifetime.shutdown_at), round(0.9 * lifetime.shutdown_at), 2000],
+                         diagnostics.milestones)
+        self.assertIsNone(diagnostics.write_report())
+        self.assertFalse(tracemalloc.is_tracing())
@@ -0,0 +1,111 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+import os
+import tempfile
+
+from unittest import TestCase
+
+from leaf_server_common.logging.log_spool import FSYNC_NEVER
+from leaf_server_common.logging.log_spool import LogSpool
+from leaf_server_common.logging.log_spool import LogSpoolShipper
+
+
+class TestLogSpool(TestCase):
+    """
+    Tests the durable on-disk log spool
+    """
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spool_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resume_after_restart(self):
+        """
+        Tests that a new process picks up from the last acknowledged record,
+        including past a partially written line, and that acknowledged
+        segments are deleted.
+        """
+        spool = LogSpool(self.spool_dir, max_segment_bytes=100, fsync_policy=FSYNC_NEVER)
+        for index in range(20):
+            self.assertTrue(spool.append({"index": index}))
+
+        records, position = spool.read_batch(5)
+        self.assertEqual(list(range(5)), [record["index"] for record in records])
+        spool.acknowledge(position)
+        spool.close()
+
+        # Simulate dying in the middle of a write
+        segments = sorted(name for name in os.listdir(self.spool_dir) if name.startswith("segment"))
+        with open(os.path.join(self.spool_dir, segments[-1]), "ab") as segment:
+            segment.write(b'{"index": 9')
+
+        restarted = LogSpool(self.spool_dir, max_segment_bytes=100, fsync_policy=FSYNC_NEVER)
+        restarted.append({"index": 100})
+
+        shipped = []
+        shipper = LogSpoolShipper(restarted, shipped.extend, batch_size=3)
+        while shipper.ship_once() > 0:
+            pass
+
+        self.assertEqual(list(range(5, 20)) + [100], [record["index"] for record in shipped])
+        remaining = [name for name in os.listdir(self.spool_dir) if name.startswith("segment")]
+        self.assertEqual(1, len(remaining))
+
+    def test_failed_export_is_not_acknowledged(self):
+        """
+        Tests that records from a failed export are read again
+        """
+        spool = LogSpool(self.spool_dir, fsync_policy=FSYNC_NEVER)
+        spool.append({"index": 0})
+
+        def fail(batch):
+            raise ConnectionError(str(batch))
+
+        with self.assertRaises(ConnectionError):
+            LogSpoolShipper(spool, fail).ship_once()
+
+        records, _ = spool.read_batch(10)
+        self.assertEqual([{"index": 0}], records)
+        spool.close()
+
+    def test_record_bigger_than_a_read(self):
+        """
+        Tests that a record bigger than what is read from a segment at once
+        is read whole, both from the segment being written and an older one
+        """
+        big = "x" * (3 * 1024 * 1024)
+        spool = LogSpool(self.spool_dir, max_segment_bytes=1024, fsync_policy=FSYNC_NEVER)
+        spool.append({"big": big})
+        spool.append({"index": 1})
+
+        records, position = spool.read_batch(1)
+        self.assertEqual([{"big": big}], records)
+        records, position = spool.read_batch(10)
+        self.assertEqual([{"big": big}, {"index": 1}], records)
+        spool.acknowledge(position)
+        spool.close()
+
+        restarted = LogSpool(self.spool_dir, fsync_policy=FSYNC_NEVER)
+        restarted.append({"big": big})
+        restarted.append({"index": 2})
+        records, _ = restarted.read_batch(10)
+        self.assertEqual([{"big": big}, {"index": 2}], records)
+        restarted.close()
@@ -0,0 +1,130 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from typing import Any
+from typing import Dict
+from unittest import TestCase
+
+import json
+import logging
+import os
+import tempfile
+
+from leaf_common.logging.logging_setup import LoggingSetup
+
+from leaf_server_common.logging.logging_config_watcher import LoggingConfigWatcher
+
+LOGGER_NAME = "watcher.test"
+
+
+class TestLoggingConfigWatcher(TestCase):
+    """
+    Tests applying changes to the logging config file at runtime
+    """
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "logging.json")
+        self.mtime_ns = 1_000_000_000_000_000_000
+        self.record_factory = logging.getLogRecordFactory()
+        self.root_handlers = list(logging.getLogger().handlers)
+
+    def tearDown(self):
+        logger = logging.getLogger(LOGGER_NAME)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        logging.setLogRecordFactory(self.record_factory)
+        for handler in self.root_handlers:
+            if handler not in logging.getLogger().handlers:
+                logging.getLogger().addHandler(handler)
+        self.temp_dir.cleanup()
+
+    def write_config(self, level: str, log_file_name: str):
+        """
+        Writes a config sending the test logger to a file at the given level
+        """
+        config: Dict[str, Any] = {
+            "version": 1,
+            "formatters": {"plain": {"format": "%(levelname)s %(message)s"}},
+            "handlers": {
+                "file": {
+                    "class": "logging.FileHandler",
+                    "formatter": "plain",
+                    "filename": os.path.join(self.temp_dir.name, log_file_name)
+                }
+            },
+            "loggers": {LOGGER_NAME: {"level": level, "handlers": ["file"], "propagate": False}}
+        }
+        with open(self.config_file, "w", encoding="utf-8") as config_file:
+            json.dump(config, config_file)
+        # Make sure every version looks changed, however quickly they are written
+        self.mtime_ns += 1_000_000_000
+        os.utime(self.config_file, ns=(self.mtime_ns, self.mtime_ns))
+
+    def read_log(self, log_file_name: str) -> str:
+        """
+        :return: What was logged to the given file
+        """
+        with open(os.path.join(self.temp_dir.name, log_file_name), "r", encoding="utf-8") as log_file:
+            return log_file.read()
+
+    def test_reload(self):
+        """
+        Tests that changes are applied, old handlers are flushed and closed,
+        bad configs are refused and the record factory stays put
+        """
+        self.write_config("INFO", "first.log")
+        watcher = LoggingConfigWatcher(LoggingSetup(logging_config=self.config_file))
+        self.assertFalse(watcher.check())
+        self.assertTrue(watcher.reload())
+
+        def record_factory(*args, **kwargs):
+            return self.record_factory(*args, **kwargs)
+        logging.setLogRecordFactory(record_factory)
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.debug("hidden")
+        logger.info("first info")
+        old_handler = logger.handlers[0]
+
+        self.write_config("DEBUG", "second.log")
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+        logger.debug("second debug")
+
+        self.assertEqual("INFO first info\n", self.read_log("first.log"))
+        self.assertIsNone(old_handler.stream)
+        self.assertEqual("DEBUG second debug\n", self.read_log("second.log"))
+        self.assertIs(record_factory, logging.getLogRecordFactory())
+
+        # Mistakes leave logging as it was
+        self.write_config("LOUD", "third.log")
+        with self.assertLogs("leaf_server_common.logging.logging_config_watcher", level=logging.ERROR):
+            self.assertFalse(watcher.check())
+        logger.debug("still second")
+        self.assertIn("still second", self.read_log("second.log"))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "third.log")))
+        self.assertEqual(2, watcher.num_reloads)
+
+    def test_no_config_file(self):
+        """
+        Tests that a config given as a dictionary is never reloaded
+        """
+        watcher = LoggingConfigWatcher(LoggingSetup(logging_config={"version": 1}))
+        self.assertIsNone(watcher.config_file_path)
+        self.assertFalse(watcher.check())
@@ -0,0 +1,365 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest import TestCase
+
+import gzip
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import grpc
+import pytest
+
+from opentelemetry._logs.severity import SeverityNumber
+# pylint: disable=no-name-in-module
+from opentelemetry.proto.collector.logs.v1.logs_service_pb2 import ExportLogsServiceRequest
+from opentelemetry.proto.collector.logs.v1.logs_service_pb2 import ExportLogsServiceResponse
+from opentelemetry.proto.collector.logs.v1.logs_service_pb2_grpc import LogsServiceServicer
+from opentelemetry.proto.collector.logs.v1.logs_service_pb2_grpc import add_LogsServiceServicer_to_server
+
+from leaf_server_common.logging.message_types import API
+from leaf_server_common.logging.message_types import METRICS
+from leaf_server_common.logging.open_telemetry_logging_handler import OpenTelemetryLoggingHandler
+
+NUM_RECORDS = 200
+
+# Records sent per combination when comparing transport throughput.
+# Set LEAF_BENCHMARK_RECORDS to send more.
+NUM_BENCHMARK_RECORDS = int(os.environ.get("LEAF_BENCHMARK_RECORDS", "2000"))
+
+
+class StandInCollector(LogsServiceServicer):
+    """
+    In-process stand-in for an OpenTelemetry collector which just counts
+    the log records it receives over either OTLP transport.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.num_records = 0
+        self.bodies = []
+
+    def receive(self, request: ExportLogsServiceRequest):
+        """
+        :param request: An export request from either transport
+        """
+        with self.lock:
+            for resource_logs in request.resource_logs:
+                for scope_logs in resource_logs.scope_logs:
+                    for log_record in scope_logs.log_records:
+                        self.num_records += 1
+                        self.bodies.append(log_record.body.string_value)
+
+    def Export(self, request, context):
+        self.receive(request)
+        return ExportLogsServiceResponse()
+
+
+def create_http_handler_class(collector: StandInCollector):
+    """
+    :return: A BaseHTTPRequestHandler class feeding the given collector
+    """
+
+    class OtlpHttpHandler(BaseHTTPRequestHandler):
+        """
+        Handles OTLP/HTTP protobuf posts
+        """
+
+        # pylint: disable=invalid-name
+        def do_POST(self):
+            """
+            Handle an export
+            """
+            data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.headers.get("Content-Encoding", "") == "gzip":
+                data = gzip.decompress(data)
+            collector.receive(ExportLogsServiceRequest.FromString(data))
+
+            response = ExportLogsServiceResponse().SerializeToString()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-protobuf")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, format, *args):     # pylint: disable=redefined-builtin
+            # Quiet please
+            return
+
+    return OtlpHttpHandler
+
+
+class FlakyExporter():
+    """
+    Wraps a real exporter so that tests can take the collector down and up
+    """
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self.down = False
+
+    def export(self, batch):
+        """
+        :param batch: The records to export
+        :return: The result of the real export
+        """
+        if self.down:
+            raise ConnectionError("collector is down")
+        return self.exporter.export(batch)
+
+    def shutdown(self):
+        """
+        Shuts down the real exporter
+        """
+        self.exporter.shutdown()
+
+
+class TestOpenTelemetryLoggingHandler(TestCase):
+    """
+    Tests the OTLP transports of OpenTelemetryLoggingHandler against a local
+    stand-in collector.
+    """
+
+    def setUp(self):
+        self.collector = StandInCollector()
+
+        # pylint: disable=consider-using-with
+        self.grpc_server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        add_LogsServiceServicer_to_server(self.collector, self.grpc_server)
+        self.grpc_port = self.grpc_server.add_insecure_port("localhost:0")
+        self.grpc_server.start()
+
+        self.http_server = ThreadingHTTPServer(("localhost", 0), create_http_handler_class(self.collector))
+        self.http_port = self.http_server.server_address[1]
+        self.http_thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
+        self.http_thread.start()
+
+    def tearDown(self):
+        self.grpc_server.stop(None)
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+    def send_records(self, protocol: str, compression: str, num_records: int = NUM_RECORDS) -> float:
+        """
+        Sends records with the given settings and checks they all arrive
+        :param protocol: The OTLP transport to use
+        :param compression: The compression to use
+        :param num_records: The number of records to send
+        :return: The number of records per second delivered, including the final flush
+        """
+        endpoint = f"http://localhost:{self.http_port}/v1/logs"
+        if protocol == "grpc":
+            endpoint = f"http://localhost:{self.grpc_port}"
+
+        handler = OpenTelemetryLoggingHandler(endpoint=endpoint, protocol=protocol,
+                                              compression=compression, timeout=5,
+                                              service_name="test")
+        start_num_records = self.collector.num_records
+        start_time = time.perf_counter()
+        for index in range(num_records):
+            record = logging.LogRecord("test", logging.INFO, __file__, 0,
+                                       "record %d", (index,), None)
+            handler.emit(record)
+        handler.close()
+        elapsed = time.perf_counter() - start_time
+
+        self.assertEqual(num_records, self.collector.num_records - start_num_records)
+        self.assertEqual(f"record {num_records - 1}", self.collector.bodies[-1])
+        return num_records / elapsed
+
+    def test_transports(self):
+        """
+        Tests that every protocol/compression combination delivers all records
+        """
+        for protocol in ("http", "grpc"):
+            for compression in ("none", "gzip"):
+                self.send_records(protocol, compression)
+
+    @pytest.mark.integration
+    @pytest.mark.benchmark
+    def test_transport_throughput(self):
+        """
+        Compares the throughput of every protocol/compression combination
+        """
+        results = {}
+        for protocol in ("http", "grpc"):
+            for compression in ("none", "gzip"):
+                results[(protocol, compression)] = self.send_records(protocol, compression,
+                                                                     NUM_BENCHMARK_RECORDS)
+
+        lines = [f"OTLP/{protocol} compression={compression}: {rate:.0f} records/sec"
+                 for (protocol, compression), rate in results.items()]
+        for protocol in ("http", "grpc"):
+            gzip_ratio = results[(protocol, "gzip")] / results[(protocol, "none")]
+            lines.append(f"OTLP/{protocol} gzip/none throughput ratio: {gzip_ratio:.2f}")
+        grpc_ratio = results[("grpc", "none")] / results[("http", "none")]
+        lines.append(f"OTLP grpc/http throughput ratio: {grpc_ratio:.2f}")
+        logging.getLogger(__name__).info("Transport throughput:\n%s", "\n".join(lines))
+
+    def create_flaky_handler(self, **kwargs) -> OpenTelemetryLoggingHandler:
+        """
+        :return: An OTLP/HTTP handler whose exporter starts out down
+        """
+        handler = OpenTelemetryLoggingHandler(endpoint=f"http://localhost:{self.http_port}/v1/logs",
+                                              protocol="http", timeout=5, service_name="test",
+                                              failure_threshold=1, initial_backoff_seconds=0.05,
+                                              **kwargs)
+        handler.exporter = FlakyExporter(handler.exporter)
+        handler.exporter.down = True
+        return handler
+
+    def test_spill_buffer(self):
+        """
+        Tests that records kept while the collector is down are sent in order
+        once it comes back, and that the oldest go when the buffer is full
+        """
+        handler = self.create_flaky_handler(spill_buffer_size=5)
+        for index in range(8):
+            handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, "spilled %d", (index,), None))
+        self.assertEqual(0, self.collector.num_records)
+        self.assertEqual(5, len(handler.spill_buffer))
+        self.assertEqual(0, handler.dropped_count)
+
+        handler.exporter.down = False
+        time.sleep(0.1)
+        handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, "recovered", (), None))
+        handler.close()
+
+        self.assertEqual(0, len(handler.spill_buffer))
+        self.assertEqual(["recovered"] + [f"spilled {index}" for index in range(3, 8)],
+                         self.collector.bodies)
+
+    def test_spill_file(self):
+        """
+        Tests that records are appended to the spill file while the collector
+        is down, and dropped once the file is as big as allowed
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spill_file = os.path.join(temp_dir, "spill.log")
+            handler = self.create_flaky_handler(spill_file=spill_file, spill_file_max_bytes=40)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            for index in range(5):
+                handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, "spilled %d", (index,), None))
+            handler.close()
+
+            with open(spill_file, encoding="utf-8") as spilled:
+                lines = spilled.read().splitlines()
+        self.assertEqual(["spilled 0", "spilled 1", "spilled 2", "spilled 3"], lines)
+        self.assertEqual(1, handler.dropped_count)
+        self.assertEqual(0, self.collector.num_records)
+
+    def test_spool_mode(self):
+        """
+        Tests that spooled records are shipped as each batch fills up,
+        and that the rest go out on close
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            handler = OpenTelemetryLoggingHandler(endpoint=f"http://localhost:{self.grpc_port}",
+                                                  protocol="grpc", timeout=5, service_name="test",
+                                                  spool_dir=temp_dir, spool_fsync="never",
+                                                  spool_batch_size=10)
+            for index in range(25):
+                handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, "spooled %d", (index,), None))
+
+            deadline = time.monotonic() + 5.0
+            while self.collector.num_records < 20 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertGreaterEqual(self.collector.num_records, 20)
+
+            handler.close()
+
+        self.assertEqual([f"spooled {index}" for index in range(25)], self.collector.bodies)
+        self.assertEqual(0, handler.dropped_count)
+
+    def test_unknown_protocol_disables_handler(self):
+        """
+        Tests that bad configuration does not raise out of logging setup
+        """
+        handler = OpenTelemetryLoggingHandler(endpoint="http://localhost:1", protocol="carrier-pigeon")
+        self.assertIsNone(handler.exporter)
+        handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, "dropped", (), None))
+
+
+class TestOpenTelemetryIds(TestCase):
+    """
+    Tests how OpenTelemetryLoggingHandler derives trace ids, span ids
+    and severities from what is in a LogRecord
+    """
+
+    # pylint: disable=protected-access
+    def test_trace_id(self):
+        """
+        Tests that hex, UUID and integer trace ids are used as-is,
+        and that anything else is hashed to a stable non-zero id
+        """
+        to_trace_id = OpenTelemetryLoggingHandler._to_trace_id
+        self.assertEqual(0x0123456789abcdef0123456789abcdef,
+                         to_trace_id("0123456789abcdef0123456789ABCDEF"))
+        value = uuid.uuid4()
+        self.assertEqual(value.int, to_trace_id(str(value)))
+        self.assertEqual(12345, to_trace_id(" 12345 "))
+
+        for value in ("request-1", "z" * 32, "0" * 32, "-5", str(1 << 128)):
+            trace_id = to_trace_id(value)
+            self.assertGreater(trace_id, 0, value)
+            self.assertLess(trace_id, 1 << 128, value)
+            self.assertEqual(trace_id, to_trace_id(value))
+        self.assertNotEqual(to_trace_id("request-1"), to_trace_id("request-2"))
+
+    # pylint: disable=protected-access
+    def test_span_id(self):
+        """
+        Tests that hex and integer span ids are used as-is,
+        and that anything else is hashed to a stable non-zero id
+        """
+        to_span_id = OpenTelemetryLoggingHandler._to_span_id
+        self.assertEqual(0x0123456789abcdef, to_span_id("0123456789ABCDEF"))
+        self.assertEqual(42, to_span_id("42"))
+
+        for value in ("span-1", "g" * 16, "0" * 16, str(1 << 64)):
+            span_id = to_span_id(value)
+            self.assertGreater(span_id, 0, value)
+            self.assertLess(span_id, 1 << 64, value)
+            self.assertEqual(span_id, to_span_id(value))
+        self.assertNotEqual(to_span_id("span-1"), to_span_id("span-2"))
+
+    # pylint: disable=protected-access
+    def test_severity_number(self):
+        """
+        Tests the severities of the standard and custom log levels
+        """
+        get_severity_number = OpenTelemetryLoggingHandler._get_severity_number
+        self.assertEqual(SeverityNumber.INFO2, get_severity_number(METRICS))
+        self.assertEqual(SeverityNumber.INFO3, get_severity_number(API))
+
+        expected = {
+            5: SeverityNumber.TRACE,
+            logging.DEBUG: SeverityNumber.DEBUG,
+            logging.INFO: SeverityNumber.INFO,
+            logging.INFO + 1: SeverityNumber.INFO,
+            logging.WARNING: SeverityNumber.WARN,
+            logging.ERROR: SeverityNumber.ERROR,
+            logging.CRITICAL: SeverityNumber.FATAL,
+        }
+        for levelno, severity in expected.items():
+            self.assertEqual(severity, get_severity_number(levelno), levelno)
@@ -0,0 +1,110 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import socket
+import threading
+
+import grpc
+
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto     # pylint: disable=no-name-in-module
+from google.protobuf.wrappers_pb2 import DoubleValue                # pylint: disable=no-name-in-module
+from google.protobuf.wrappers_pb2 import FloatValue                 # pylint: disable=no-name-in-module
+
+from leaf_server_common.server.passthrough import WireMessage
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+SERVICE_NAME = "test.Relay"
+
+
+def find_free_port() -> int:
+    """
+    :return: A port nothing is listening on right now
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class TestPassthrough(TestCase):
+    """
+    Tests handling requests as raw serialized messages
+    """
+
+    def test_wire_message(self):
+        """
+        Tests pulling fields out of serialized messages
+        """
+        # pylint: disable=no-member
+        field = FieldDescriptorProto(name="answer", number=-42, json_name="theAnswer",
+                                     proto3_optional=True)
+        field.options.deprecated = True
+        message = WireMessage(field.SerializeToString())
+
+        self.assertEqual("answer", message.get_string(1))
+        self.assertEqual(-42, message.get_int(3))
+        self.assertEqual("theAnswer", message.get_string(10))
+        self.assertTrue(message.get_bool(17))
+        self.assertTrue(message.get_message(8).get_bool(3))
+        self.assertFalse(message.has(2))
+        self.assertEqual("default", message.get_string(2, "default"))
+        self.assertIsNone(message.get_message(9))
+        with self.assertRaises(ValueError):
+            message.get_string(3)
+
+        self.assertEqual(2.5, WireMessage(DoubleValue(value=2.5).SerializeToString()).get_double(1))
+        self.assertEqual(0.5, WireMessage(FloatValue(value=0.5).SerializeToString()).get_float(1))
+
+        with self.assertRaises(ValueError):
+            WireMessage(field.SerializeToString()[:4]).get_string(1)
+
+    def test_relay(self):
+        """
+        Tests that passthrough requests are accounted for like any other
+        """
+        port = find_free_port()
+        lifetime = ServerLifetime("test", "test", port, logging.getLogger(self.__class__.__name__),
+                                  max_workers=2, shutdown_propagation_seconds=0.0, stop_grace_seconds=0.0)
+        lifetime.create_server()
+        seen = []
+
+        def relay(request: WireMessage, _context, request_log) -> bytes:
+            seen.append((request.get_string(1), request_log.tenant))
+            return request.data
+
+        lifetime.add_passthrough_methods(SERVICE_NAME, {"Relay": relay}, logging_fields={"user_id": 10})
+        run_thread = threading.Thread(target=lifetime.run)
+        run_thread.start()
+
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                call = channel.unary_unary(f"/{SERVICE_NAME}/Relay")
+                request = FieldDescriptorProto(name="relayed", json_name="tenant").SerializeToString()
+                self.assertEqual(request, call(request, timeout=5, wait_for_ready=True))
+
+                with self.assertRaises(grpc.RpcError) as raised:
+                    call(b"\x52\x05ab", timeout=5)
+                self.assertEqual(grpc.StatusCode.INVALID_ARGUMENT, raised.exception.code())
+        finally:
+            lifetime.request_shutdown("test over")
+            run_thread.join(10.0)
+            lifetime.thread_pool.shutdown(wait=True)
+
+        self.assertEqual([("relayed", "tenant")], seen)
+        self.assertEqual(1, lifetime.stats.get("Relay"))
+        self.assertEqual(0, lifetime.stats.get("NumProcessing"))
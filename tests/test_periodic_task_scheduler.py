@@ -0,0 +1,142 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import threading
+import time
+
+from leaf_server_common.server.periodic_task_scheduler import PeriodicTaskScheduler
+from leaf_server_common.server.server_lifetime import ServerLifetime
+from leaf_server_common.server.server_loop_callbacks import ServerLoopCallbacks
+
+
+class CountingCallbacks(ServerLoopCallbacks):
+    """
+    ServerLoopCallbacks which reports being active for the first few calls
+    """
+
+    def __init__(self, num_active: int):
+        self.num_active = num_active
+        self.num_calls = 0
+        self.shut_down = False
+
+    def loop_callback(self) -> bool:
+        self.num_calls += 1
+        return self.num_calls <= self.num_active
+
+    def shutdown_callback(self):
+        self.shut_down = True
+
+
+class TestPeriodicTaskScheduler(TestCase):
+    """
+    Tests PeriodicTaskScheduler on its own and as used by ServerLifetime
+    """
+
+    def test_tasks_run_on_their_own_schedules(self):
+        """
+        Tests intervals, failures, overruns, timeouts and stopping
+        """
+        scheduler = PeriodicTaskScheduler(max_workers=4)
+        fast = scheduler.schedule("fast", lambda: None, 0.05, run_immediately=True)
+        slow = scheduler.schedule("slow", lambda: None, 0.5)
+
+        def fail():
+            raise ValueError("expected")
+        scheduler.schedule("failing", fail, 0.05)
+
+        stuck = threading.Event()
+        scheduler.schedule("stuck", lambda: stuck.wait(5.0), 0.1, timeout_seconds=0.2, run_immediately=True)
+
+        scheduler.start()
+        time.sleep(0.7)
+        stuck.set()
+        self.assertTrue(scheduler.stop(timeout_seconds=2.0))
+
+        metrics = scheduler.get_metrics()
+        self.assertGreater(metrics.get("fast").get("runs"), 6)
+        self.assertEqual(1, metrics.get("slow").get("runs"))
+        self.assertEqual(metrics.get("failing").get("runs"), metrics.get("failing").get("failures"))
+        self.assertEqual(1, metrics.get("stuck").get("runs"))
+        self.assertGreater(metrics.get("stuck").get("overruns"), 2)
+        self.assertEqual(1, metrics.get("stuck").get("timeouts"))
+        self.assertIn("p99_ms", metrics.get("fast"))
+
+        # Nothing runs after stopping
+        runs = fast.counts.get("runs")
+        time.sleep(0.2)
+        self.assertEqual(runs, fast.counts.get("runs"))
+        self.assertIsNotNone(slow.next_run_time)
+
+    def test_fixed_delay(self):
+        """
+        Tests that a fixed-delay task running longer than its interval
+        waits an interval after each run and is never counted as overrun
+        """
+        scheduler = PeriodicTaskScheduler(max_workers=2)
+        starts = []
+
+        def slow():
+            starts.append(time.monotonic())
+            time.sleep(0.1)
+        task = scheduler.schedule("slow", slow, 0.05, jitter_fraction=0.0,
+                                  run_immediately=True, fixed_delay=True)
+
+        with self.assertNoLogs(scheduler.logger, level=logging.WARNING):
+            scheduler.start()
+            time.sleep(0.6)
+            self.assertTrue(scheduler.stop(timeout_seconds=2.0))
+
+        self.assertGreater(task.counts.get("runs"), 2)
+        self.assertEqual(0, task.counts.get("overruns"))
+        for previous, start in zip(starts, starts[1:]):
+            self.assertGreaterEqual(start - previous, 0.14)
+
+    def test_server_loop_callbacks_adapter(self):
+        """
+        Tests that ServerLoopCallbacks run off the main loop at the active
+        interval while active and the inactive one otherwise, and that
+        shutdown is not held up by the long inactive interval.
+        """
+        callbacks = CountingCallbacks(num_active=5)
+        logger = logging.getLogger(self.__class__.__name__)
+        lifetime = ServerLifetime("test", "test", 0, logger,
+                                  loop_sleep_seconds=60.0, active_sleep_seconds=0.02,
+                                  server_loop_callbacks=callbacks,
+                                  shutdown_propagation_seconds=0.0,
+                                  stop_grace_seconds=0.0)
+        lifetime.create_server()
+        ticks = []
+        lifetime.add_periodic_task("tick", lambda: ticks.append(time.monotonic()), 0.05)
+
+        run_thread = threading.Thread(target=lifetime.run)
+        run_thread.start()
+        time.sleep(0.5)
+
+        # 5 active calls, then one inactive call which waits a minute
+        self.assertEqual(6, callbacks.num_calls)
+        self.assertGreater(len(ticks), 4)
+
+        start_time = time.monotonic()
+        lifetime.request_shutdown("test")
+        run_thread.join(5.0)
+        self.assertFalse(run_thread.is_alive())
+        self.assertLess(time.monotonic() - start_time, 2.0)
+        self.assertTrue(callbacks.shut_down)
+        self.assertEqual(6, lifetime.get_periodic_task_metrics().get("loop_callback").get("runs"))
+        lifetime.thread_pool.shutdown(wait=True)
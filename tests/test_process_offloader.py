@@ -0,0 +1,152 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import threading
+import time
+
+from leaf_server_common.logging.service_log_record import ServiceLogRecord
+from leaf_server_common.server.atomic_counter import AtomicCounter
+from leaf_server_common.server.process_offloader import ProcessOffloader
+from leaf_server_common.server.process_offloader import SharedArray
+from leaf_server_common.server.process_offloader import is_offload_cancelled
+
+
+def sum_shared(shared: SharedArray, num_bytes: int):
+    """
+    Offloaded function reading request data without it being pickled
+    """
+    total = sum(shared.to_bytes()[:num_bytes])
+    return total, ServiceLogRecord.get_current_logging_fields().get("request_id")
+
+
+def wait_for_cancel():
+    """
+    Offloaded function which cooperatively checks for cancellation
+    """
+    for _ in range(500):
+        if is_offload_cancelled():
+            return "cancelled"
+        time.sleep(0.01)
+    return "finished"
+
+
+def wait_for_count(counter: AtomicCounter, expected: int, timeout_seconds: float = 5.0) -> int:
+    """
+    Futures run their done callbacks after waking up whoever waits on them,
+    so counts kept by those callbacks can lag a little behind.
+
+    :return: The count, once it is as expected or the time is up
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while counter.get_count() != expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return counter.get_count()
+
+
+class FakeContext():
+    """
+    Just enough of a grpc.ServicerContext to cancel a request
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def add_callback(self, callback):
+        """
+        :param callback: Called when the request terminates
+        """
+        self.callbacks.append(callback)
+        return True
+
+    def cancel(self):
+        """
+        Simulates the client going away
+        """
+        for callback in self.callbacks:
+            callback()
+
+
+class TestProcessOffloader(TestCase):
+    """
+    Tests ProcessOffloader with real worker processes
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.in_flight = AtomicCounter()
+        cls.offloader = ProcessOffloader(max_workers=2, in_flight_counter=cls.in_flight)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.offloader.shutdown()
+
+    def test_shared_memory_and_logging_fields(self):
+        """
+        Tests that offloaded work sees shared request data and
+        the logging context of the request that offloaded it.
+        """
+        # Logging fields are per-thread, so set them on a thread of our own
+        results = []
+
+        def handle_request():
+            ServiceLogRecord({"request_id": "offloaded-1"})
+            shared = SharedArray.from_buffer(bytes(range(100)))
+            try:
+                results.append(self.offloader.run(sum_shared, shared, 10))
+            finally:
+                shared.release()
+
+        thread = threading.Thread(target=handle_request)
+        thread.start()
+        thread.join()
+
+        self.assertEqual([(45, "offloaded-1")], results)
+        self.assertEqual(0, wait_for_count(self.in_flight, 0))
+
+    def test_cancellation(self):
+        """
+        Tests that cancelling the request signals the worker process
+        and that in-flight accounting follows the work.
+        """
+        context = FakeContext()
+        future = self.offloader.submit(wait_for_cancel, context=context)
+        time.sleep(0.2)
+        self.assertEqual(1, self.in_flight.get_count())
+
+        context.cancel()
+        self.assertEqual("cancelled", future.result(timeout=10))
+        self.assertEqual(0, wait_for_count(self.in_flight, 0))
+
+    # pylint: disable=protected-access
+    def test_late_cancel_of_reused_slot(self):
+        """
+        Tests that cancelling a task whose slot has since gone to
+        another task leaves the other task alone
+        """
+        offloader = self.offloader
+        slot, generation = offloader._acquire_slot()
+        offloader._release_slot(slot)
+        reused_slot, reused_generation = offloader._acquire_slot()
+        self.assertEqual(slot, reused_slot)
+        self.assertNotEqual(generation, reused_generation)
+
+        offloader._set_cancel_flag(slot, generation)
+        self.assertEqual(0, offloader._cancel_flags[slot])
+        offloader._set_cancel_flag(reused_slot, reused_generation)
+        self.assertEqual(1, offloader._cancel_flags[slot])
+        offloader._release_slot(reused_slot)
@@ -0,0 +1,157 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+
+import grpc
+
+from leaf_server_common.server.profiler import RequestProfiler
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+
+def spin_until(stop: threading.Event):
+    """
+    Keeps a thread busy so it shows up in samples
+    """
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestProfiler(TestCase):
+    """
+    Tests the sampling and per-request profilers
+    """
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sampling_profiler(self):
+        """
+        Tests that stacks of other threads are written in collapsed form
+        """
+        lifetime = ServerLifetime("test", "test", 0, self.logger, profile_dir=self.temp_dir.name)
+        stop = threading.Event()
+        busy_thread = threading.Thread(target=spin_until, args=(stop,), name="busy-thread")
+        busy_thread.start()
+        try:
+            file_name = lifetime.start_profiling(duration_seconds=0.3, interval_seconds=0.005)
+            self.assertIsNotNone(file_name)
+            # Only one at a time
+            self.assertIsNone(lifetime.start_profiling(duration_seconds=0.3))
+            self.assertTrue(lifetime.sampling_profiler.wait(5.0))
+        finally:
+            stop.set()
+            busy_thread.join()
+
+        with open(file_name, "r", encoding="utf-8") as profile_file:
+            lines = profile_file.read().splitlines()
+        busy_lines = [line for line in lines if line.startswith("busy-thread;")]
+        self.assertTrue(busy_lines)
+        self.assertTrue(any("spin_until (" in line for line in busy_lines))
+        stack, count = busy_lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertNotIn("sampling-profiler", stack)
+        self.assertGreater(lifetime.sampling_profiler.get_status().get("samples"), 10)
+
+    def test_profile_requests(self):
+        """
+        Tests that one in N requests for the named caller are profiled,
+        up to the maximum number of profiles
+        """
+        lifetime = ServerLifetime("test", "test", 0, self.logger, profile_dir=self.temp_dir.name)
+        lifetime.profile_requests("Work", 2, max_profiles=2)
+        for caller in ("Work", "Other", "Work", "Work", "Work", "Work", "Work"):
+            request_log = lifetime.start_request(caller, "test", None)
+            time.sleep(0.001)
+            lifetime.finish_request(caller, "test", request_log)
+            self.assertIsNone(request_log.profile)
+
+        file_names = sorted(os.listdir(self.temp_dir.name))
+        self.assertEqual(2, len(file_names))
+        self.assertTrue(all(file_name.startswith("request-Work-") for file_name in file_names))
+        stats = pstats.Stats(os.path.join(self.temp_dir.name, file_names[0]))
+        self.assertGreater(stats.total_calls, 0)
+        self.assertEqual({}, lifetime.request_profiler.get_status())
+
+    def test_abandoned_profile(self):
+        """
+        Tests that a profile left running by a handler that raised
+        is stopped the next time its thread is picked
+        """
+        profiler = RequestProfiler(self.temp_dir.name, self.logger)
+        profiler.profile_requests("Work", 1, max_profiles=3)
+        abandoned = profiler.maybe_start("Work")
+        self.assertIsNotNone(abandoned)
+
+        # Another thread cannot start one while it is active
+        other = []
+        thread = threading.Thread(target=lambda: other.append(profiler.maybe_start("Work")))
+        thread.start()
+        thread.join()
+        self.assertEqual([None], other)
+
+        profile = profiler.maybe_start("Work")
+        self.assertIsNotNone(profile)
+        self.assertIsNotNone(profiler.finish("Work", profile))
+
+    def test_profiled_handler_raising(self):
+        """
+        Tests that the profile of a handler that raised is stopped when the
+        handler is done, so requests on other threads can be profiled
+        """
+        lifetime = ServerLifetime("test", "test", 0, self.logger, max_workers=4,
+                                  profile_dir=self.temp_dir.name)
+        server = lifetime.create_server()
+
+        def fail(request: bytes, context) -> bytes:
+            lifetime.start_request("Work", "test", context)
+            raise ValueError(f"Handler that never gets to finish_request() for {request}")
+
+        handler = grpc.method_handlers_generic_handler(
+            "test.Failer", {"Fail": grpc.unary_unary_rpc_method_handler(fail)})
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        lifetime.profile_requests("Work", 1, max_profiles=2)
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                with self.assertRaises(grpc.RpcError) as raised:
+                    channel.unary_unary("/test.Failer/Fail")(b"x", timeout=5)
+                self.assertEqual(grpc.StatusCode.UNKNOWN, raised.exception.code())
+        finally:
+            server.stop(None)
+            lifetime.thread_pool.shutdown(wait=True)
+
+        # The abandoned profile was not written
+        self.assertEqual([], os.listdir(self.temp_dir.name))
+
+        # This thread gets the last profile
+        request_log = lifetime.start_request("Work", "test", None)
+        self.assertIsNotNone(request_log.profile)
+        lifetime.finish_request("Work", "test", request_log)
+        self.assertEqual(1, len(os.listdir(self.temp_dir.name)))
@@ -0,0 +1,263 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+import logging
+import threading
+import time
+
+from unittest import TestCase
+
+import grpc
+
+from leaf_server_common.logging.request_logger_adapter import RequestLoggerAdapter
+from leaf_server_common.logging.service_log_record import ServiceLogRecord
+from leaf_server_common.logging.trace_context import TraceContext
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+
+class ListHandler(logging.Handler):
+    """
+    Handler which just keeps the records it is given.
+    """
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestRequestLoggerAdapter(TestCase):
+    """
+    Tests trace context propagation and span timing in RequestLoggerAdapter
+    """
+
+    TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+    def setUp(self):
+        self.handler = ListHandler()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_traceparent_parsing(self):
+        """
+        Tests valid and invalid traceparent headers
+        """
+        trace_context = TraceContext.from_traceparent(self.TRACEPARENT)
+        self.assertEqual(0x4bf92f3577b34da6a3ce929d0e0e4736, trace_context.trace_id)
+        self.assertEqual(0x00f067aa0ba902b7, trace_context.parent_span_id)
+        self.assertNotEqual(trace_context.parent_span_id, trace_context.span_id)
+        self.assertEqual(1, trace_context.trace_flags)
+
+        invalid = [
+            None,
+            "",
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7",
+            "ff-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01",
+            "00-00000000000000000000000000000000-00f067aa0ba902b7-01",
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-0000000000000000-01",
+            "00-4bf92f3577b34da6a3ce929d0e0e473-00f067aa0ba902b7-01",
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01-extra",
+            "00-4bf92f3577b34da6a3ce929d0e0e473g-00f067aa0ba902b7-01",
+        ]
+        for traceparent in invalid:
+            self.assertIsNone(TraceContext.from_traceparent(traceparent), traceparent)
+
+        # Future versions may have extra fields
+        self.assertIsNotNone(TraceContext.from_traceparent(
+            "01-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01-extra"))
+
+        # Missing or invalid headers start a new trace
+        new_trace = TraceContext.from_metadata({"traceparent": "garbage"})
+        self.assertIsNone(new_trace.parent_span_id)
+        self.assertNotEqual(0, new_trace.trace_id)
+
+    def test_records_carry_trace_ids(self):
+        """
+        Tests that every record has the trace and span ids of the innermost span
+        """
+        trace_context = TraceContext.from_traceparent(self.TRACEPARENT)
+        request_log = RequestLoggerAdapter(self.logger, None, trace_context=trace_context)
+
+        request_log.api("outer")
+        with request_log.span("phase") as span_context:
+            request_log.info("inner")
+            outbound = request_log.get_outbound_metadata()
+
+        self.assertEqual(3, len(self.handler.records))
+        outer = self.handler.records[0]
+        inner = self.handler.records[1]
+        span_record = self.handler.records[2]
+        self.assertEqual("4bf92f3577b34da6a3ce929d0e0e4736", outer.trace_id)
+        self.assertEqual(trace_context.get_span_id_hex(), outer.span_id)
+        self.assertEqual("00f067aa0ba902b7", outer.parent_span_id)
+
+        self.assertEqual(outer.trace_id, inner.trace_id)
+        self.assertEqual(span_context.get_span_id_hex(), inner.span_id)
+        self.assertEqual(outer.span_id, inner.parent_span_id)
+
+        # One record for the span itself, carrying its own ids
+        self.assertEqual("phase", span_record.span_name)
+        self.assertEqual(inner.span_id, span_record.span_id)
+        self.assertGreaterEqual(span_record.span_duration_ms, 0.0)
+
+        self.assertEqual(span_context.to_traceparent(), outbound["traceparent"])
+
+        # After the span closes, records go back to the request span
+        request_log.info("after")
+        self.assertEqual(outer.span_id, self.handler.records[-1].span_id)
+
+    def test_service_fields_named_like_trace_fields(self):
+        """
+        Tests that logging still works when the service's own logging fields
+        already have the names of the trace fields
+        """
+        old_factory = logging.getLogRecordFactory()
+        default_fields = ServiceLogRecord.get_default_extra_logging_fields()
+        ServiceLogRecord.set_up_record_factory(default_fields)
+        errors = []
+
+        def log_on_request_thread():
+            ServiceLogRecord({"trace_id": "from-service", "user_id": "someone"})
+            request_log = RequestLoggerAdapter(self.logger, None)
+            try:
+                request_log.info("hello")
+            except KeyError as exception:
+                errors.append(exception)
+
+        try:
+            thread = threading.Thread(target=log_on_request_thread)
+            thread.start()
+            thread.join()
+        finally:
+            logging.setLogRecordFactory(old_factory)
+
+        self.assertEqual([], errors)
+        record = self.handler.records[0]
+        self.assertEqual("from-service", record.trace_id)
+        self.assertEqual("someone", record.user_id)
+        self.assertEqual(16, len(record.span_id))
+
+    def test_deadline_and_cancellation(self):
+        """
+        Tests the deadline budget and cancellation checks on their own
+        """
+        request_log = RequestLoggerAdapter(self.logger)
+        self.assertIsNone(request_log.time_remaining())
+        self.assertIsNone(request_log.get_outbound_timeout())
+        self.assertFalse(request_log.is_cancelled())
+
+        request_log.set_time_remaining(10.0)
+        self.assertAlmostEqual(9.0, request_log.get_outbound_timeout(reserve_seconds=1.0), places=1)
+        self.assertFalse(request_log.is_expired())
+
+        # Termination before the handler is done is a cancellation
+        request_log.on_terminated()
+        self.assertTrue(request_log.is_cancelled())
+        self.assertTrue(request_log.was_cancelled_by_client())
+
+        # Termination after the handler is done is not
+        finished_log = RequestLoggerAdapter(self.logger)
+        finished_log.finish()
+        finished_log.on_terminated()
+        self.assertFalse(finished_log.is_cancelled())
+
+        expired_log = RequestLoggerAdapter(self.logger)
+        expired_log.set_time_remaining(-1.0)
+        self.assertTrue(expired_log.is_expired())
+        self.assertTrue(expired_log.is_cancelled())
+        self.assertEqual(0.0, expired_log.get_outbound_timeout())
+
+    def test_handler_sees_client_deadline(self):
+        """
+        Tests that a handler behind ServerLifetime stops early when
+        the client deadline passes and that it is counted in stats.
+        """
+        lifetime = ServerLifetime("test", "test", 0, self.logger, max_workers=4)
+        server = lifetime.create_server()
+        handler_done = threading.Event()
+        seen = {}
+
+        def spin(request: bytes, context) -> bytes:
+            request_log = lifetime.start_request("Spin", "test", context)
+            seen["time_remaining"] = request_log.time_remaining()
+            start_time = time.monotonic()
+            while not request_log.is_cancelled() and time.monotonic() - start_time < 5.0:
+                time.sleep(0.01)
+            seen["stopped_after"] = time.monotonic() - start_time
+            lifetime.finish_request("Spin", "test", request_log)
+            handler_done.set()
+            if request_log.is_cancelled():
+                context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Gave up")
+            return request
+
+        handler = grpc.method_handlers_generic_handler(
+            "test.Spinner", {"Spin": grpc.unary_unary_rpc_method_handler(spin)})
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                call = channel.unary_unary("/test.Spinner/Spin")
+                with self.assertRaises(grpc.RpcError) as raised:
+                    call(b"x", timeout=0.3)
+                self.assertEqual(grpc.StatusCode.DEADLINE_EXCEEDED, raised.exception.code())
+            self.assertTrue(handler_done.wait(5.0))
+        finally:
+            server.stop(None)
+            lifetime.thread_pool.shutdown(wait=True)
+
+        self.assertLessEqual(seen.get("time_remaining"), 0.3)
+        self.assertLess(seen.get("stopped_after"), 1.0)
+        self.assertEqual(1, lifetime.stats.get("DeadlineExceeded"))
+        self.assertEqual(0, lifetime.stats.get("NumProcessing"))
+
+    def test_handler_sees_no_client_deadline(self):
+        """
+        Tests that a request without a client timeout has no deadline,
+        rather than the one gRPC reports in its place.
+        """
+        lifetime = ServerLifetime("test", "test", 0, self.logger, max_workers=4)
+        server = lifetime.create_server()
+        seen = {}
+
+        def echo(request: bytes, context) -> bytes:
+            request_log = lifetime.start_request("Echo", "test", context)
+            seen["time_remaining"] = request_log.time_remaining()
+            seen["outbound_timeout"] = request_log.get_outbound_timeout(0.5)
+            seen["expired"] = request_log.is_expired()
+            lifetime.finish_request("Echo", "test", request_log)
+            return request
+
+        handler = grpc.method_handlers_generic_handler(
+            "test.Echoer", {"Echo": grpc.unary_unary_rpc_method_handler(echo)})
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                self.assertEqual(b"x", channel.unary_unary("/test.Echoer/Echo")(b"x"))
+        finally:
+            server.stop(None)
+            lifetime.thread_pool.shutdown(wait=True)
+
+        self.assertEqual({"time_remaining": None, "outbound_timeout": None, "expired": False}, seen)
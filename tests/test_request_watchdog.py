@@ -0,0 +1,135 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import threading
+import time
+
+import grpc
+
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+
+class TestRequestWatchdog(TestCase):
+    """
+    Tests noticing and reporting requests that are taking too long
+    """
+
+    def setUp(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.lifetime = ServerLifetime("test", "test", 0, self.logger,
+                                       slow_request_seconds=60.0,
+                                       slow_request_thresholds={"Stuck": 0.05})
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def handle(self, caller: str):
+        """
+        A request handler which does not finish until released
+        """
+        request_log = self.lifetime.start_request(caller, "test", None)
+        self.started.release()
+        self.wait_for_release()
+        self.lifetime.finish_request(caller, "test", request_log)
+
+    def wait_for_release(self):
+        """
+        Where stuck requests are stuck
+        """
+        self.release.wait(10.0)
+
+    def test_slow_requests(self):
+        """
+        Tests that slow requests are logged once each with the stack of their
+        thread, rate-limited per caller, and listed while in flight
+        """
+        callers = ("Stuck", "Stuck", "Quick")
+        threads = [threading.Thread(target=self.handle, args=(caller,), name=f"handler-{index}")
+                   for index, caller in enumerate(callers)]
+        for thread in threads:
+            thread.start()
+        for _ in threads:
+            self.assertTrue(self.started.acquire(timeout=5.0))     # pylint: disable=consider-using-with
+        time.sleep(0.1)
+
+        try:
+            with self.assertLogs(self.logger, level=logging.WARNING) as logs:
+                self.lifetime.watchdog.check()
+                # Already reported requests are not reported again
+                self.lifetime.watchdog.check()
+                self.logger.warning("end of checks")
+
+            self.assertEqual(2, len(logs.records))
+            message = logs.records[0].getMessage()
+            self.assertIn("Slow Stuck request", message)
+            self.assertIn("wait_for_release", message)
+            self.assertEqual({"Stuck": 2}, self.lifetime.watchdog.get_metrics())
+
+            in_flight = self.lifetime.get_in_flight_requests()
+            self.assertEqual(3, len(in_flight))
+            slow = {request.get("thread"): request.get("slow") for request in in_flight}
+            self.assertEqual({"handler-0": True, "handler-1": True, "handler-2": False}, slow)
+        finally:
+            self.release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([], self.lifetime.get_in_flight_requests())
+
+    def test_handler_outliving_its_rpc(self):
+        """
+        Tests that a request is still watched while its handler keeps going
+        after the RPC terminated, and stops being watched once the handler
+        raises without getting to finish_request()
+        """
+        server = self.lifetime.create_server()
+
+        def stuck(request: bytes, context) -> bytes:
+            self.lifetime.start_request("Stuck", "test", context)
+            self.started.release()
+            self.wait_for_release()
+            raise ValueError(f"Handler that never gets to finish_request() for {request}")
+
+        handler = grpc.method_handlers_generic_handler(
+            "test.Stuck", {"Stuck": grpc.unary_unary_rpc_method_handler(stuck)})
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                with self.assertRaises(grpc.RpcError) as raised:
+                    channel.unary_unary("/test.Stuck/Stuck")(b"x", timeout=0.2)
+                self.assertEqual(grpc.StatusCode.DEADLINE_EXCEEDED, raised.exception.code())
+            self.assertTrue(self.started.acquire(timeout=5.0))     # pylint: disable=consider-using-with
+
+            in_flight = self.lifetime.get_in_flight_requests()
+            self.assertEqual(1, len(in_flight))
+            self.assertTrue(in_flight[0].get("cancelled"))
+            with self.assertLogs(self.logger, level=logging.WARNING) as logs:
+                self.lifetime.watchdog.check()
+            self.assertIn("wait_for_release", logs.records[0].getMessage())
+
+            self.release.set()
+            deadline = time.monotonic() + 5.0
+            while self.lifetime.get_in_flight_requests() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual([], self.lifetime.get_in_flight_requests())
+        finally:
+            self.release.set()
+            server.stop(None)
+            self.lifetime.thread_pool.shutdown(wait=True)
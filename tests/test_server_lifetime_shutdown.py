@@ -0,0 +1,218 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import grpc
+
+from grpc_health.v1 import health_pb2
+from grpc_health.v1 import health_pb2_grpc
+
+from leaf_server_common.server.server_lifetime import ServerLifetime
+
+SERVICE_NAME = "test.Sleeper"
+METHOD_NAME = "Sleep"
+
+
+def find_free_port() -> int:
+    """
+    :return: A port nothing is listening on right now
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def add_sleeper(lifetime: ServerLifetime, server):
+    """
+    Adds a handler to the server which sleeps for the number of
+    seconds given as an ASCII string in the request
+    """
+    def sleep(request: bytes, context) -> bytes:
+        request_log = lifetime.start_request(METHOD_NAME, "test", context)
+        time.sleep(float(request.decode("ascii")))
+        lifetime.finish_request(METHOD_NAME, "test", request_log)
+        return request
+
+    handler = grpc.method_handlers_generic_handler(
+        SERVICE_NAME, {METHOD_NAME: grpc.unary_unary_rpc_method_handler(sleep)})
+    server.add_generic_rpc_handlers((handler,))
+
+
+def run_server(port: int):
+    """
+    Runs a server in this process until it is signalled to stop.
+    Used by the subprocess test below.
+    """
+    logging.basicConfig(level=logging.INFO)
+    lifetime = ServerLifetime("test", "test", port, logging.getLogger("subprocess"),
+                              max_workers=8, loop_sleep_seconds=60.0,
+                              shutdown_propagation_seconds=0.5,
+                              shutdown_budget_seconds=10.0,
+                              stop_grace_seconds=1.0)
+    server = lifetime.create_server()
+    add_sleeper(lifetime, server)
+    lifetime.run()
+
+
+def wait_for_serving(channel, timeout_seconds: float = 10.0):
+    """
+    Waits for the health check of a server to report SERVING
+    """
+    # pylint: disable=no-member
+    health_stub = health_pb2_grpc.HealthStub(channel)
+    health_request = health_pb2.HealthCheckRequest(service="test")
+    response = health_stub.Check(health_request, timeout=timeout_seconds, wait_for_ready=True)
+    return response.status == health_pb2.HealthCheckResponse.ServingStatus.SERVING
+
+
+class TestServerLifetimeShutdown(TestCase):
+    """
+    Tests the staged shutdown of ServerLifetime
+    """
+
+    # pylint: disable=too-many-locals
+    def test_staged_shutdown(self):
+        """
+        Tests that the server announces NOT_SERVING while still accepting
+        requests, then refuses new requests while in-flight ones drain.
+        """
+        port = find_free_port()
+        logger = logging.getLogger(self.__class__.__name__)
+        lifetime = ServerLifetime("test", "test", port, logger, max_workers=8,
+                                  loop_sleep_seconds=60.0,
+                                  shutdown_propagation_seconds=0.5,
+                                  drain_timeout_seconds=10.0,
+                                  stop_grace_seconds=1.0)
+        server = lifetime.create_server()
+        add_sleeper(lifetime, server)
+
+        run_thread = threading.Thread(target=lifetime.run)
+        run_thread.start()
+
+        with grpc.insecure_channel(f"localhost:{port}") as channel:
+            # pylint: disable=no-member
+            health_stub = health_pb2_grpc.HealthStub(channel)
+            health_request = health_pb2.HealthCheckRequest(service="test")
+            serving = health_pb2.HealthCheckResponse.ServingStatus.SERVING
+            not_serving = health_pb2.HealthCheckResponse.ServingStatus.NOT_SERVING
+            self.assertEqual(serving, health_stub.Check(health_request, timeout=5, wait_for_ready=True).status)
+
+            call = channel.unary_unary(f"/{SERVICE_NAME}/{METHOD_NAME}")
+            in_flight = call.future(b"1.0", timeout=10)
+            time.sleep(0.1)
+
+            start_time = time.monotonic()
+            lifetime.request_shutdown("test")
+
+            # Announced, but still accepting for the propagation delay
+            time.sleep(0.1)
+            self.assertEqual(not_serving, health_stub.Check(health_request, timeout=5).status)
+            self.assertEqual(b"0", call(b"0", timeout=5))
+
+            # Then refusing new requests while the in-flight one drains
+            time.sleep(0.6)
+            with self.assertRaises(grpc.RpcError) as raised:
+                call(b"0", timeout=5)
+            self.assertEqual(grpc.StatusCode.UNAVAILABLE, raised.exception.code())
+            self.assertEqual(b"1.0", in_flight.result())
+
+        # Does not wait out the 60 second loop sleep
+        run_thread.join(10.0)
+        self.assertFalse(run_thread.is_alive())
+        self.assertLess(time.monotonic() - start_time, 5.0)
+
+        metrics = lifetime.shutdown_metrics
+        self.assertTrue(metrics.get("Drained"))
+        self.assertGreaterEqual(metrics.get("PropagationSeconds"), 0.5)
+        self.assertIn("DrainSeconds", metrics)
+        self.assertIn("StopSeconds", metrics)
+        lifetime.thread_pool.shutdown(wait=True)
+
+    def test_request_limit_keeps_propagation_delay(self):
+        """
+        Tests that requests over the request limit do not cut short
+        the time given to load balancers to notice NOT_SERVING
+        """
+        port = find_free_port()
+        lifetime = ServerLifetime("test", "test", port, logging.getLogger(self.__class__.__name__),
+                                  max_workers=4, shutdown_propagation_seconds=1.0,
+                                  stop_grace_seconds=0.0)
+        lifetime.shutdown_at = 2
+        server = lifetime.create_server()
+        add_sleeper(lifetime, server)
+
+        run_thread = threading.Thread(target=lifetime.run)
+        run_thread.start()
+        with grpc.insecure_channel(f"localhost:{port}") as channel:
+            call = channel.unary_unary(f"/{SERVICE_NAME}/{METHOD_NAME}")
+            for _ in range(5):
+                self.assertEqual(b"0", call(b"0", timeout=5, wait_for_ready=True))
+            # Asking again, like the admin Recycle might, does not hurry either
+            lifetime.request_shutdown("again")
+
+        run_thread.join(10.0)
+        self.assertFalse(run_thread.is_alive())
+        self.assertEqual("request limit reached", lifetime.shutdown_reason)
+        self.assertGreaterEqual(lifetime.shutdown_metrics.get("PropagationSeconds"), 1.0)
+        lifetime.thread_pool.shutdown(wait=True)
+
+    def test_signal_drains_subprocess_server(self):
+        """
+        Tests that SIGTERM wakes a server out of a long main loop sleep,
+        lets in-flight requests finish, and exits within its budget.
+        A second subprocess checks SIGINT the same way.
+        """
+        repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            port = find_free_port()
+            with subprocess.Popen([sys.executable, "-m", "tests.test_server_lifetime_shutdown", str(port)],
+                                  cwd=repo_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+                try:
+                    with grpc.insecure_channel(f"localhost:{port}") as channel:
+                        self.assertTrue(wait_for_serving(channel))
+                        call = channel.unary_unary(f"/{SERVICE_NAME}/{METHOD_NAME}")
+                        in_flight = call.future(b"1.5", timeout=10)
+                        time.sleep(0.2)
+
+                        start_time = time.monotonic()
+                        process.send_signal(signum)
+                        self.assertEqual(b"1.5", in_flight.result())
+
+                    exit_code = process.wait(timeout=10)
+                    elapsed = time.monotonic() - start_time
+                finally:
+                    if process.poll() is None:
+                        process.kill()
+                output = process.stdout.read().decode("utf-8", errors="replace")
+
+            self.assertEqual(0, exit_code, output)
+            self.assertLess(elapsed, 5.0, output)
+            self.assertIn(f"received {signal.Signals(signum).name}", output)
+            self.assertIn("'Drained': True", output)
+
+
+if __name__ == "__main__":
+    run_server(int(sys.argv[1]))
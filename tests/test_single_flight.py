@@ -0,0 +1,174 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import threading
+import time
+
+import grpc
+
+from leaf_server_common.server.server_lifetime import ServerLifetime
+from leaf_server_common.server.single_flight import ResponseCache
+from leaf_server_common.server.single_flight import SingleFlightInterceptor
+from leaf_server_common.server.single_flight import SingleFlightPolicy
+
+SERVICE_NAME = "test.Status"
+COALESCED_METHOD = f"/{SERVICE_NAME}/Get"
+CACHED_METHOD = f"/{SERVICE_NAME}/GetCached"
+FAILING_METHOD = f"/{SERVICE_NAME}/Fail"
+HANDLER_SECONDS = 0.2
+
+
+class TestSingleFlight(TestCase):
+    """
+    Tests request coalescing and response caching behind a local ServerLifetime server
+    """
+
+    def setUp(self):
+        self.executions = 0
+        self.execution_lock = threading.Lock()
+        self.interceptor = SingleFlightInterceptor({
+            COALESCED_METHOD: SingleFlightPolicy(),
+            CACHED_METHOD: SingleFlightPolicy(cache_ttl_seconds=0.5, caller="Get"),
+            FAILING_METHOD: SingleFlightPolicy()
+        })
+
+        logger = logging.getLogger(self.__class__.__name__)
+        self.lifetime = ServerLifetime("test", "test", 0, logger, max_workers=32,
+                                       interceptors=[self.interceptor])
+        server = self.lifetime.create_server()
+
+        def get(request: bytes, context) -> bytes:
+            request_log = self.lifetime.start_request("Get", "test", context)
+            with self.execution_lock:
+                self.executions += 1
+            time.sleep(HANDLER_SECONDS)
+            self.lifetime.finish_request("Get", "test", request_log)
+            return b"status of " + request
+
+        def fail(request: bytes, context) -> bytes:
+            with self.execution_lock:
+                self.executions += 1
+            time.sleep(HANDLER_SECONDS)
+            context.abort(grpc.StatusCode.INTERNAL, "nope")
+            return request
+
+        handler = grpc.method_handlers_generic_handler(SERVICE_NAME, {
+            "Get": grpc.unary_unary_rpc_method_handler(get),
+            "GetCached": grpc.unary_unary_rpc_method_handler(get),
+            "Fail": grpc.unary_unary_rpc_method_handler(fail)
+        })
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        self.server = server
+        self.channel = grpc.insecure_channel(f"localhost:{port}")
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(None)
+        self.lifetime.thread_pool.shutdown(wait=True)
+
+    def test_identical_requests_share_one_execution(self):
+        """
+        Tests that a burst of identical requests runs the handler once,
+        while different requests each run it.
+        """
+        call = self.channel.unary_unary(COALESCED_METHOD)
+        calls = [call.future(b"experiment-1", timeout=10) for _ in range(16)]
+        calls.append(call.future(b"experiment-2", timeout=10))
+        results = [one_call.result() for one_call in calls]
+
+        self.assertEqual([b"status of experiment-1"] * 16 + [b"status of experiment-2"], results)
+        self.assertEqual(2, self.executions)
+        metrics = self.interceptor.get_metrics().get(COALESCED_METHOD)
+        self.assertEqual(2, metrics.get("executions"))
+        self.assertEqual(15, metrics.get("coalesced"))
+        self.assertEqual(17, self.lifetime.stats.get("Total"))
+        self.assertEqual(17, self.lifetime.stats.get("Get"))
+        self.assertEqual(0, self.lifetime.stats.get("NumProcessing"))
+
+        # Nothing is cached for this method, so later requests run again
+        self.assertEqual(b"status of experiment-1", call(b"experiment-1", timeout=10))
+        self.assertEqual(3, self.executions)
+
+    def test_requests_without_timeout_share_one_execution(self):
+        """
+        Tests that requests whose clients set no timeout wait for the leader
+        rather than failing on the deadline gRPC reports in its place.
+        """
+        call = self.channel.unary_unary(COALESCED_METHOD)
+        calls = [call.future(b"experiment-1") for _ in range(8)]
+        results = [one_call.result() for one_call in calls]
+
+        self.assertEqual([b"status of experiment-1"] * 8, results)
+        self.assertEqual(1, self.executions)
+        self.assertEqual(7, self.interceptor.get_metrics().get(COALESCED_METHOD).get("coalesced"))
+
+    def test_cache_hits_and_expiry(self):
+        """
+        Tests that cached responses are served until they expire
+        """
+        call = self.channel.unary_unary(CACHED_METHOD)
+        for _ in range(3):
+            self.assertEqual(b"status of x", call(b"x", timeout=10))
+        self.assertEqual(1, self.executions)
+        self.assertEqual(2, self.interceptor.get_metrics().get(CACHED_METHOD).get("cache_hits"))
+        self.assertEqual(3, self.lifetime.stats.get("Get"))
+
+        time.sleep(0.6)
+        call(b"x", timeout=10)
+        self.assertEqual(2, self.executions)
+
+    def test_users_do_not_share_responses(self):
+        """
+        Tests that identical requests from different users are not answered
+        with each other's responses
+        """
+        call = self.channel.unary_unary(CACHED_METHOD)
+        for user_id in ("alice", "bob", "alice"):
+            self.assertEqual(b"status of x", call(b"x", timeout=10, metadata=(("user_id", user_id),)))
+        self.assertEqual(2, self.executions)
+        self.assertEqual(1, self.interceptor.get_metrics().get(CACHED_METHOD).get("cache_hits"))
+
+    def test_failures_are_not_shared(self):
+        """
+        Tests that requests waiting on a failed execution run the handler themselves
+        """
+        call = self.channel.unary_unary(FAILING_METHOD)
+        calls = [call.future(b"x", timeout=10) for _ in range(4)]
+        for one_call in calls:
+            self.assertEqual(grpc.StatusCode.INTERNAL, one_call.code())
+        self.assertGreater(self.executions, 1)
+
+    def test_cache_bounded_by_bytes(self):
+        """
+        Tests least recently used entries are evicted to stay within the byte limit
+        """
+        cache = ResponseCache(max_bytes=2000)
+        for index in range(10):
+            cache.put(("m", bytes([index])), b"r" * 500, 60.0)
+        metrics = cache.get_metrics()
+        self.assertLessEqual(metrics.get("bytes"), 2000)
+        self.assertEqual(3, metrics.get("entries"))
+        self.assertIsNone(cache.get(("m", bytes([0]))))
+        self.assertEqual(b"r" * 500, cache.get(("m", bytes([9]))))
+
+        # Entries bigger than the whole cache are never kept
+        cache.put(("m", b"big"), b"r" * 5000, 60.0)
+        self.assertIsNone(cache.get(("m", b"big")))
@@ -0,0 +1,172 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import random
+import socket
+import threading
+import time
+
+import grpc
+
+from leaf_server_common.server.server_lifetime import ServerLifetime
+from leaf_server_common.server.tenant_accounting import SpaceSavingCounter
+from leaf_server_common.server.tenant_accounting import TenantQuota
+from leaf_server_common.server.tenant_accounting import TenantQuotas
+
+SERVICE_NAME = "test.Tenants"
+METHOD = f"/{SERVICE_NAME}/Work"
+
+
+def find_free_port() -> int:
+    """
+    :return: A port nothing is listening on right now
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class TestTenantAccounting(TestCase):
+    """
+    Tests per-tenant accounting and quotas
+    """
+
+    def test_space_saving(self):
+        """
+        Tests that heavy hitters are found among many light ones in bounded space
+        """
+        counter = SpaceSavingCounter(capacity=10)
+        rng = random.Random(42)
+        for _ in range(5000):
+            if rng.random() < 0.3:
+                counter.add("heavy", 2.0)
+            elif rng.random() < 0.3:
+                counter.add("medium")
+            else:
+                counter.add(f"light-{rng.randrange(1000)}")
+
+        top = counter.get_top(2)
+        self.assertEqual(["heavy", "medium"], [key for key, _, _ in top])
+        total, error = counter.get("heavy")
+        self.assertLessEqual(total - error, 2.0 * 5000)
+        self.assertGreater(total, 2000.0)
+        self.assertEqual(10, len(counter.get_top()))
+
+    def test_quotas(self):
+        """
+        Tests concurrency and rate quotas, and per-tenant overrides
+        """
+        quotas = TenantQuotas(default_quota=TenantQuota(max_concurrent=2),
+                              quotas={"limited": TenantQuota(rate_per_second=1.0, burst=2.0),
+                                      "vip": None})
+        self.assertIsNone(quotas.try_acquire("someone"))
+        self.assertIsNone(quotas.try_acquire("someone"))
+        self.assertIn("concurrency", quotas.try_acquire("someone"))
+        quotas.release("someone")
+        self.assertIsNone(quotas.try_acquire("someone"))
+
+        self.assertIsNone(quotas.try_acquire("limited"))
+        self.assertIsNone(quotas.try_acquire("limited"))
+        self.assertIn("rate", quotas.try_acquire("limited"))
+
+        for _ in range(10):
+            self.assertIsNone(quotas.try_acquire("vip"))
+        self.assertEqual({"someone": 2, "limited": 2}, quotas.get_concurrent())
+
+    @staticmethod
+    def wait_for_release(quotas: TenantQuotas):
+        """
+        Waits a while for handlers still going to give back their quota slots
+        """
+        deadline = time.monotonic() + 5.0
+        while quotas.get_concurrent() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    # pylint: disable=too-many-locals
+    def test_server_quota(self):
+        """
+        Tests that a server refuses requests over a tenant's quota
+        and accounts for tenants' usage
+        """
+        port = find_free_port()
+        quotas = TenantQuotas(quotas={"noisy": TenantQuota(max_concurrent=1)})
+        lifetime = ServerLifetime("test", "test", port, logging.getLogger(self.__class__.__name__),
+                                  max_workers=4, shutdown_propagation_seconds=0.0,
+                                  drain_timeout_seconds=1.0, stop_grace_seconds=0.0, tenant_quotas=quotas)
+        server = lifetime.create_server()
+
+        def work(request: bytes, context) -> bytes:
+            request_log = lifetime.start_request("Work", "test", context,
+                                                 service_logging_dict={"user_id": "None"})
+            if request == b"raise":
+                raise ValueError("Handler that never gets to finish_request()")
+            time.sleep(float(request.decode("ascii")))
+            lifetime.finish_request("Work", "test", request_log)
+            return request
+
+        handler = grpc.method_handlers_generic_handler(SERVICE_NAME,
+                                                       {"Work": grpc.unary_unary_rpc_method_handler(work)})
+        server.add_generic_rpc_handlers((handler,))
+        run_thread = threading.Thread(target=lifetime.run)
+        run_thread.start()
+
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                call = channel.unary_unary(METHOD)
+                noisy = (("user_id", "noisy"),)
+                quiet = (("user_id", "quiet"),)
+                self.assertEqual(b"0", call(b"0", metadata=noisy, timeout=5, wait_for_ready=True))
+
+                slow = call.future(b"0.5", metadata=noisy, timeout=5)
+                time.sleep(0.2)
+                with self.assertRaises(grpc.RpcError) as raised:
+                    call(b"0", metadata=noisy, timeout=5)
+                self.assertEqual(grpc.StatusCode.RESOURCE_EXHAUSTED, raised.exception.code())
+
+                # Other tenants carry on
+                self.assertEqual(b"0", call(b"0", metadata=quiet, timeout=5))
+                self.assertEqual(b"0.5", slow.result())
+
+                # A handler still going after its client gave up keeps the slot until it is done
+                with self.assertRaises(grpc.RpcError) as raised:
+                    call(b"0.5", metadata=noisy, timeout=0.1)
+                self.assertEqual(grpc.StatusCode.DEADLINE_EXCEEDED, raised.exception.code())
+                with self.assertRaises(grpc.RpcError) as raised:
+                    call(b"0", metadata=noisy, timeout=5)
+                self.assertEqual(grpc.StatusCode.RESOURCE_EXHAUSTED, raised.exception.code())
+                self.wait_for_release(quotas)
+                self.assertEqual(b"0", call(b"0", metadata=noisy, timeout=5))
+
+                # A handler raising does not keep the slot for good
+                with self.assertRaises(grpc.RpcError) as raised:
+                    call(b"raise", metadata=noisy, timeout=5)
+                self.assertEqual(grpc.StatusCode.UNKNOWN, raised.exception.code())
+                self.wait_for_release(quotas)
+                self.assertEqual(b"0", call(b"0", metadata=noisy, timeout=5))
+        finally:
+            lifetime.request_shutdown("test over")
+            run_thread.join(10.0)
+            lifetime.thread_pool.shutdown(wait=True)
+
+        self.assertEqual(2, lifetime.stats.get("QuotaExceeded"))
+        usage = lifetime.get_tenant_usage()
+        requests = {entry.get("tenant"): entry.get("total") for entry in usage.get("requests")}
+        self.assertEqual({"noisy": 5, "quiet": 1}, requests)
+        self.assertEqual("noisy", usage.get("handler_seconds")[0].get("tenant"))
+        self.assertEqual({}, quotas.get_concurrent())
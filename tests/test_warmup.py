@@ -0,0 +1,161 @@
+# Copyright © 2019-2026 Cognizant Technology Solutions Corp, www.cognizant.com.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# END COPYRIGHT
+
+from unittest import TestCase
+
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import grpc
+
+from grpc_health.v1 import health_pb2
+from grpc_health.v1 import health_pb2_grpc
+
+from leaf_server_common.server.server_lifetime import ServerLifetime
+from leaf_server_common.server.warmup import RequestRecorder
+from leaf_server_common.server.warmup import WARMUP_METADATA_KEY
+
+SERVICE_NAME = "test.Echo"
+METHOD = f"/{SERVICE_NAME}/Echo"
+
+
+def find_free_port() -> int:
+    """
+    :return: A port nothing is listening on right now
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+class TestWarmup(TestCase):
+    """
+    Tests recording requests and replaying them to warm up the next server
+    """
+
+    def setUp(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.seen = []
+
+    def create_lifetime(self, port: int, interceptors=None) -> ServerLifetime:
+        """
+        :return: A ServerLifetime with an echo handler which notes whether
+                each request it sees was a warmup request
+        """
+        lifetime = ServerLifetime("test", "test", port, self.logger, max_workers=4,
+                                  interceptors=interceptors,
+                                  shutdown_propagation_seconds=0.0,
+                                  stop_grace_seconds=0.0,
+                                  warmup_parallelism=2)
+        server = lifetime.create_server()
+
+        def echo(request: bytes, context) -> bytes:
+            request_log = lifetime.start_request("Echo", "test", context)
+            self.seen.append((request, request_log.is_warmup))
+            lifetime.finish_request("Echo", "test", request_log)
+            return request
+
+        handler = grpc.method_handlers_generic_handler(
+            SERVICE_NAME, {"Echo": grpc.unary_unary_rpc_method_handler(echo)})
+        server.add_generic_rpc_handlers((handler,))
+        return lifetime
+
+    # pylint: disable=too-many-locals,too-many-statements
+    def test_record_and_replay(self):
+        """
+        Tests that recorded requests and warmup tasks run before
+        the next server reports SERVING
+        """
+        recorder = RequestRecorder(max_samples_per_method=4)
+        port = find_free_port()
+        lifetime = self.create_lifetime(port, interceptors=[recorder])
+        run_thread = threading.Thread(target=lifetime.run)
+        run_thread.start()
+        with grpc.insecure_channel(f"localhost:{port}") as channel:
+            call = channel.unary_unary(METHOD)
+            for index in range(10):
+                self.assertEqual(b"%d" % index, call(b"%d" % index, timeout=5, wait_for_ready=True))
+        lifetime.request_shutdown("test")
+        run_thread.join(10.0)
+        lifetime.thread_pool.shutdown(wait=True)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            samples_file = os.path.join(temp_dir, "samples.json")
+            recorder.save(samples_file)
+            samples = RequestRecorder.load(samples_file)
+        self.assertEqual(4, len(samples))
+        self.assertTrue(all(method == METHOD for method, _ in samples))
+
+        # Now warm up a new server with them
+        self.seen.clear()
+        port = find_free_port()
+        lifetime = self.create_lifetime(port)
+        lifetime.add_warmup_requests(samples)
+        health_during_warmup = []
+
+        def check_health():
+            time.sleep(0.2)
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                # pylint: disable=no-member
+                health_stub = health_pb2_grpc.HealthStub(channel)
+                response = health_stub.Check(health_pb2.HealthCheckRequest(service="test"), timeout=5)
+                health_during_warmup.append(response.status)
+
+        def fail():
+            raise ValueError("expected")
+
+        lifetime.add_warmup_task("health", check_health)
+        lifetime.add_warmup_task("failing", fail)
+
+        run_thread = threading.Thread(target=lifetime.run)
+        run_thread.start()
+        with grpc.insecure_channel(f"localhost:{port}") as channel:
+            call = channel.unary_unary(METHOD)
+            self.assertEqual(b"real", call(b"real", timeout=5, wait_for_ready=True))
+
+            # Clients without the token cannot pass their requests off as warmup
+            self.assertEqual(b"forged", call(b"forged", timeout=5, metadata=((WARMUP_METADATA_KEY, "1"),)))
+        lifetime.request_shutdown("test")
+        run_thread.join(10.0)
+        lifetime.thread_pool.shutdown(wait=True)
+
+        # pylint: disable=no-member
+        self.assertEqual([health_pb2.HealthCheckResponse.ServingStatus.NOT_SERVING], health_during_warmup)
+        self.assertEqual(sorted(request for _, request in samples),
+                         sorted(request for request, warmup in self.seen if warmup))
+
+        metrics = lifetime.warmup_metrics
+        self.assertEqual(2, metrics.get("TasksRun"))
+        self.assertEqual(1, metrics.get("TasksFailed"))
+        self.assertEqual(4, metrics.get("RequestsReplayed"))
+        self.assertEqual(0, metrics.get("RequestsFailed"))
+        self.assertGreater(metrics.get("WarmupSeconds"), 0.2)
+        self.assertEqual(1, lifetime.get_latency_snapshot().get("warmup").get("count"))
+
+        # Not even with the token once warmup is over
+        self.assertFalse(lifetime.warmup.is_warmup_request({WARMUP_METADATA_KEY: lifetime.warmup.token}))
+
+        # Only the real requests count
+        self.assertEqual(2, lifetime.stats.get("Total"))
+        self.assertEqual(2, lifetime.stats.get("Echo"))
+        self.assertEqual(0, lifetime.stats.get("NumProcessing"))
+        self.assertEqual(2, lifetime.get_latency_snapshot().get("handler").get("count"))
+        self.assertEqual([{"tenant": "None", "total": 2, "error": 0}],
+                         lifetime.get_tenant_usage().get("requests"))